@@ -0,0 +1,87 @@
+"""
+Benchmark assembling a spatially enabled dataframe from a stream of record batches.
+
+A synthetic stream of record batches resembling Overture `place` data is assembled both by converting each batch
+and concatenating it onto the dataframe so far, as `get_spatially_enabled_dataframe` did before, and by collecting
+the batches, combining these at the Arrow level and converting once. Each is timed for increasing numbers of
+batches, so the time per batch shows concatenating in the loop growing with the number of batches, while
+collecting then converting stays flat. The outputs are checked to be identical.
+
+    python scripts/benchmarks/benchmark_assembly.py --batches 500 --rows 1000
+"""
+from argparse import ArgumentParser
+import json
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from overture_to_arcgis.__main__ import _batches_to_spatially_enabled_dataframe
+from overture_to_arcgis.utils import table_to_spatially_enabled_dataframe
+
+
+def make_batches(batch_count: int, row_count: int) -> list[pa.RecordBatch]:
+    """Create record batches resembling Overture place data, with GeoArrow metadata on the geometry column."""
+    rng = np.random.default_rng(42)
+    names_type = pa.struct([("primary", pa.string()), ("common", pa.map_(pa.string(), pa.string()))])
+    geo = {"version": "1.1.0", "primary_column": "geometry", "columns": {"geometry": {"encoding": "WKB"}}}
+
+    batches = []
+    for batch_idx in range(batch_count):
+        x = rng.uniform(-123, -122, row_count)
+        y = rng.uniform(47, 48, row_count)
+        ids = [f"{batch_idx:04d}{idx:08d}" for idx in range(row_count)]
+        batch = pa.RecordBatch.from_pydict(
+            {
+                "id": ids,
+                "geometry": [struct.pack("<bIdd", 1, 1, px, py) for px, py in zip(x.tolist(), y.tolist())],
+                "names": pa.array([{"primary": f"Place {idx}", "common": None} for idx in ids], names_type),
+                "categories": [["cafe", "restaurant", "park"][idx % 3] for idx in range(row_count)],
+                "confidence": rng.uniform(0, 1, row_count),
+            }
+        )
+        batches.append(batch.replace_schema_metadata({b"geo": json.dumps(geo).encode("utf-8")}))
+
+    return batches
+
+
+def concat_per_batch(batches: list[pa.RecordBatch]) -> pd.DataFrame:
+    """Convert each batch and concatenate it onto the dataframe so far, as before."""
+    df = None
+    for batch in batches:
+        batch_df = table_to_spatially_enabled_dataframe(batch)
+        df = batch_df if df is None else pd.concat([df, batch_df], ignore_index=True)
+    geom_col = df.spatial.name
+    df.spatial.set_geometry(geom_col, sr=4326, inplace=True)
+    return df
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batches", type=int, default=500, help="Record batches in the full stream.")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows in each record batch.")
+    args = parser.parse_args()
+
+    batches = make_batches(args.batches, args.rows)
+    assemblers = {"concat per batch": concat_per_batch, "collect then convert": _batches_to_spatially_enabled_dataframe}
+
+    # time each assembly for an increasing share of the stream
+    for batch_count in sorted({max(1, args.batches // 4), max(1, args.batches // 2), args.batches}):
+        results = {}
+        for name, assemble in assemblers.items():
+            start = time.perf_counter()
+            results[name] = assemble(batches[:batch_count])
+            elapsed = time.perf_counter() - start
+            print(
+                f"{batch_count:>5} batches, {name:>20}: {elapsed:7.3f} s, {elapsed / batch_count * 1000:7.2f} ms/batch"
+            )
+
+        # check the outputs match, comparing the geometries by their JSON
+        expected, actual = results["concat per batch"], results["collect then convert"]
+        geom_col = expected.spatial.name
+        pd.testing.assert_frame_equal(expected.drop(columns=geom_col), actual.drop(columns=geom_col))
+        assert expected[geom_col].map(str).equals(actual[geom_col].map(str)), "Geometries differ."
+
+    print("Outputs identical.")
@@ -0,0 +1,69 @@
+"""
+Benchmark release and type discovery with serial versus concurrent directory listing.
+
+A synthetic Overture release tree is created in a temporary directory, and listed through a filesystem adding a
+fixed latency to every listing. With serial listing, wall clock time grows with the number of releases and themes.
+With concurrent listing, each discovery step takes roughly a single round trip.
+
+    python scripts/benchmarks/benchmark_discovery.py --releases 24 --latency 0.05
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+import tempfile
+import time
+
+from latency_filesystem import latency_filesystem
+
+from overture_to_arcgis.utils import ReleaseCatalog
+
+THEME_TYPES = {
+    "addresses": ["address"],
+    "base": ["bathymetry", "infrastructure", "land", "land_cover", "land_use", "water"],
+    "buildings": ["building", "building_part"],
+    "divisions": ["division", "division_area", "division_boundary"],
+    "places": ["place"],
+    "transportation": ["connector", "segment"],
+}
+
+
+def make_release_tree(base_dir: Path, release_count: int) -> None:
+    """Create empty type directories for a number of releases."""
+    for idx in range(release_count):
+        release = f"2024-{idx // 28 + 1:02d}-{idx % 28 + 1:02d}.0"
+        for theme, types in THEME_TYPES.items():
+            for overture_type in types:
+                (base_dir / release / f"theme={theme}" / f"type={overture_type}").mkdir(parents=True)
+
+
+def time_discovery(base_dir: Path, latency: float, max_workers: int) -> tuple[float, int]:
+    """Time a cold discovery of the current release and its type theme map."""
+    filesystem = latency_filesystem(latency)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        catalog = ReleaseCatalog(
+            filesystem=filesystem, base_dir=str(base_dir), cache_dir=cache_dir, max_workers=max_workers
+        )
+        start = time.perf_counter()
+        release = catalog.get_current_release()
+        catalog.get_type_theme_map(release)
+        elapsed = time.perf_counter() - start
+    return elapsed, filesystem.handler.list_count
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--releases", type=int, default=24, help="Number of synthetic releases.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every listing.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_dir = Path(tmp_dir) / "release"
+        make_release_tree(base_dir, args.releases)
+
+        print(f"{args.releases} releases, {len(THEME_TYPES)} themes, {args.latency * 1000:.0f} ms per listing")
+        for max_workers in [1, 4, 16, 64]:
+            elapsed, list_count = time_discovery(base_dir, args.latency, max_workers)
+            round_trips = elapsed / args.latency
+            print(
+                f"max_workers={max_workers:>3}: {elapsed:6.2f} s for {list_count} listings "
+                f"(~{round_trips:.1f} round trips)"
+            )
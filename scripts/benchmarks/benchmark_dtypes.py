@@ -0,0 +1,124 @@
+"""
+Benchmark the memory used by the dataframe columns converted from an Overture `segment` extract.
+
+A synthetic extract resembling Overture `segment` data, with the low cardinality `subtype`, `class` and `subclass`
+columns, names, sources and linestring geometries, is converted to a spatially enabled dataframe with the default
+NumPy and Python object columns, with the low cardinality string columns converted to categoricals, with Arrow backed
+columns, and with both. The memory of the attribute columns, including the Python strings, and the conversion time
+are reported for each, and the values checked to be identical.
+
+    python scripts/benchmarks/benchmark_dtypes.py --rows 200000
+"""
+from argparse import ArgumentParser
+import json
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from overture_to_arcgis.utils import table_to_spatially_enabled_dataframe
+
+# road classes and their approximate share of Overture road segments
+ROAD_CLASSES = {
+    "residential": 0.35,
+    "service": 0.2,
+    "footway": 0.12,
+    "unclassified": 0.08,
+    "track": 0.07,
+    "tertiary": 0.05,
+    "secondary": 0.04,
+    "path": 0.03,
+    "primary": 0.02,
+    "cycleway": 0.015,
+    "steps": 0.01,
+    "trunk": 0.008,
+    "motorway": 0.007,
+}
+
+
+def make_segment_table(row_count: int) -> pa.Table:
+    """Create a table resembling an Overture segment extract, with GeoParquet metadata."""
+    rng = np.random.default_rng(42)
+
+    # mostly roads, with a few rail and water segments
+    subtypes = rng.choice(["road", "rail", "water"], row_count, p=[0.94, 0.04, 0.02])
+    classes = np.where(
+        subtypes == "road",
+        rng.choice(list(ROAD_CLASSES), row_count, p=np.array(list(ROAD_CLASSES.values())) / sum(ROAD_CLASSES.values())),
+        np.where(subtypes == "rail", "standard_gauge", None),
+    )
+    subclasses = np.where(classes == "footway", rng.choice(["sidewalk", "crosswalk", None], row_count), None)
+
+    # short linestrings, most unnamed
+    geometries = []
+    for x, y, vertex_count in zip(
+        rng.uniform(-123, -122, row_count).tolist(),
+        rng.uniform(47, 48, row_count).tolist(),
+        rng.integers(2, 12, row_count).tolist(),
+    ):
+        coords = (rng.normal(0, 0.0002, (vertex_count, 2)).cumsum(axis=0) + [x, y]).ravel().tolist()
+        geometries.append(struct.pack(f"<bII{len(coords)}d", 1, 2, vertex_count, *coords))
+    names = [
+        {"primary": f"{idx % 5000} Street", "common": None} if idx % 3 == 0 else None for idx in range(row_count)
+    ]
+
+    table = pa.table(
+        {
+            "id": [f"08b28d{idx:010x}" for idx in range(row_count)],
+            "geometry": pa.array(geometries, pa.binary()),
+            "version": pa.array(rng.integers(0, 3, row_count), pa.int32()),
+            "subtype": subtypes.tolist(),
+            "class": classes.tolist(),
+            "subclass": subclasses.tolist(),
+            "names": pa.array(
+                names, pa.struct([("primary", pa.string()), ("common", pa.map_(pa.string(), pa.string()))])
+            ),
+            "sources": pa.array(
+                [[{"dataset": "OpenStreetMap", "record_id": f"w{idx}@3"}] for idx in range(row_count)],
+                pa.list_(pa.struct([("dataset", pa.string()), ("record_id", pa.string())])),
+            ),
+        }
+    )
+    geo = {"version": "1.1.0", "primary_column": "geometry", "columns": {"geometry": {"encoding": "WKB"}}}
+    return table.replace_schema_metadata({b"geo": json.dumps(geo).encode("utf-8")})
+
+
+def get_attribute_memory(df: pd.DataFrame) -> int:
+    """Get the memory used by the attribute columns, including the Python strings."""
+    return int(df.drop(columns=df.spatial.name).memory_usage(deep=True, index=False).sum())
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Segments in the extract.")
+    parser.add_argument("--threshold", type=float, default=0.05, help="Categorical threshold.")
+    args = parser.parse_args()
+
+    table = make_segment_table(args.rows)
+    print(f"{args.rows:,} segments, {table.nbytes / 1024**2:,.1f} MB in Arrow")
+
+    options = {
+        "default": {},
+        "categoricals": {"categorical_threshold": args.threshold},
+        "arrow dtypes": {"arrow_dtypes": True},
+        "arrow + categoricals": {"arrow_dtypes": True, "categorical_threshold": args.threshold},
+    }
+
+    frames = {}
+    for name, kwargs in options.items():
+        start = time.perf_counter()
+        frames[name] = table_to_spatially_enabled_dataframe(table, **kwargs)
+        elapsed = time.perf_counter() - start
+        columns = frames[name].drop(columns=frames[name].spatial.name)
+        print(f"{name:>20}: {get_attribute_memory(frames[name]) / 1024**2:8.1f} MB, {elapsed:6.2f} s")
+        for col in ["subtype", "class", "subclass"]:
+            print(f"{'':>22}{col:>9}: {columns[col].memory_usage(deep=True, index=False) / 1024**2:6.2f} MB")
+
+    # check the values match the default conversion
+    expected = frames["default"].drop(columns="geometry").astype(object).where(lambda df: df.notna(), None)
+    for name, df in frames.items():
+        actual = df.drop(columns="geometry").astype(object).where(lambda df: df.notna(), None)
+        assert expected.equals(actual), f"Values differ for {name}."
+    print("Values identical.")
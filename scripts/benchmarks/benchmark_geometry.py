@@ -0,0 +1,79 @@
+"""
+Benchmark snapping and simplifying WKB geometries for building and water polygons.
+
+Synthetic little endian WKB resembling Overture `building` footprints, small rectangles with redundant vertices
+along their edges, and `water` polygons, large polygons with dense, noisy boundaries, is processed using `process_wkb` with a precision, a
+tolerance and both. The vertex counts and WKB size before and after, and the geometries per second, are reported
+for each.
+
+    python scripts/benchmarks/benchmark_geometry.py --rows 100000
+"""
+from argparse import ArgumentParser
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from overture_to_arcgis.utils import GeometryProcessing
+from overture_to_arcgis.utils._geometry import process_wkb
+
+from wkb_writer import dumps_wkb
+
+
+def make_buildings(row_count: int) -> pa.Array:
+    """Create a binary array of WKB rotated rectangles, with redundant, slightly offset vertices along the edges."""
+    rng = np.random.default_rng(42)
+    buildings = []
+    for x, y, angle in np.column_stack(
+        [rng.uniform(-123, -122, row_count), rng.uniform(47, 48, row_count), rng.uniform(0, np.pi, row_count)]
+    ).tolist():
+        corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1], [-1, -1]]) * rng.uniform(0.00005, 0.0002, 2)
+        ring = [corners[0]]
+        for start, end in zip(corners[:-1], corners[1:]):
+            steps = np.sort(rng.uniform(0, 1, int(rng.integers(0, 4))))
+            ring.extend(start + steps[:, None] * (end - start) + rng.normal(0, 0.0000002, (len(steps), 2)))
+            ring.append(end)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        ring = (np.array(ring) @ rotation.T + [x, y]).tolist()
+        buildings.append(dumps_wkb({"type": "Polygon", "coordinates": [ring]}))
+    return pa.array(buildings, pa.binary())
+
+
+def make_polygons(row_count: int, size: float, vertices: tuple[int, int], noise: float) -> pa.Array:
+    """Create a binary array of WKB polygons with noisy boundaries around random centers."""
+    rng = np.random.default_rng(42)
+    polygons = []
+    for x, y in np.column_stack([rng.uniform(-123, -122, row_count), rng.uniform(47, 48, row_count)]).tolist():
+        angles = np.linspace(0, 2 * np.pi, int(rng.integers(*vertices)), endpoint=False)
+        radii = size * (1 + rng.normal(0, noise, len(angles)))
+        ring = np.column_stack([x + radii * np.cos(angles), y + radii * np.sin(angles)]).tolist()
+        polygons.append(dumps_wkb({"type": "Polygon", "coordinates": [ring + [ring[0]]]}))
+    return pa.array(polygons, pa.binary())
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Polygons of each type.")
+    args = parser.parse_args()
+
+    datasets = {
+        "building": make_buildings(args.rows),
+        "water": make_polygons(max(1, args.rows // 20), 0.01, (200, 2000), 0.002),
+    }
+    options = {
+        "precision 1e-6": GeometryProcessing(precision=0.000001),
+        "tolerance 1e-5": GeometryProcessing(tolerance=0.00001),
+        "both": GeometryProcessing(precision=0.000001, tolerance=0.00001),
+    }
+
+    for name, values in datasets.items():
+        print(f"{name}: {len(values):,} polygons, {values.nbytes / 1024**2:,.1f} MB of WKB")
+        for option_name, processing in options.items():
+            start = time.perf_counter()
+            processed, before_count, after_count = process_wkb(values, processing)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{option_name:>16}: {before_count:>11,} -> {after_count:>11,} vertices "
+                f"({1 - after_count / before_count:6.1%} fewer), {processed.nbytes / 1024**2:7.1f} MB, "
+                f"{len(values) / elapsed:>10,.0f} geometries/s"
+            )
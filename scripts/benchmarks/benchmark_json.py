@@ -0,0 +1,100 @@
+"""
+Benchmark converting the nested columns of Overture data to JSON strings.
+
+A synthetic batch resembling Overture `place` data, with names, sources, categories, addresses and websites, is
+converted both one value at a time using `json.dumps(value.as_py())`, as before the columnar encoder, and using
+`convert_complex_columns_to_strings`. The outputs are checked to be identical and the rows per second reported.
+
+    python scripts/benchmarks/benchmark_json.py --rows 100000
+"""
+from argparse import ArgumentParser
+import json
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from overture_to_arcgis.utils.__main__ import convert_complex_columns_to_strings
+
+
+def make_batch(row_count: int) -> pa.Table:
+    """Create a table with the nested columns of Overture place data."""
+    rng = np.random.default_rng(42)
+    categories = ["cafe", "restaurant", "park", "school", "hospital", "bank"]
+    names, sources, category_values, addresses, websites, bbox = [], [], [], [], [], []
+    for idx in range(row_count):
+        names.append(
+            {
+                "primary": f"Place {idx} Café",
+                "common": [("en", f"Place {idx}"), ("fr", f"Lieu {idx}")] if idx % 5 == 0 else None,
+                "rules": None,
+            }
+        )
+        sources.append(
+            [
+                {"property": "", "dataset": "meta", "record_id": str(idx), "update_time": "2024-06-01T00:00:00Z",
+                 "confidence": float(rng.uniform())}
+            ]
+        )
+        category_values.append(
+            {"primary": categories[idx % 6], "alternate": [categories[(idx + 1) % 6], categories[(idx + 2) % 6]]}
+        )
+        addresses.append([{"freeform": f"{idx} Main St", "locality": "Olympia", "postcode": "98501",
+                           "region": "WA", "country": "US"}])
+        websites.append([f"https://example.com/{idx}"] if idx % 2 == 0 else None)
+        x, y = float(rng.uniform(-123, -122)), float(rng.uniform(47, 48))
+        bbox.append({"xmin": x, "xmax": x, "ymin": y, "ymax": y})
+
+    return pa.table(
+        {
+            "id": [f"{idx:016d}" for idx in range(row_count)],
+            "names": pa.array(
+                names,
+                pa.struct(
+                    [
+                        ("primary", pa.string()),
+                        ("common", pa.map_(pa.string(), pa.string())),
+                        ("rules", pa.list_(pa.struct([("variant", pa.string()), ("value", pa.string())]))),
+                    ]
+                ),
+            ),
+            "sources": sources,
+            "categories": category_values,
+            "addresses": addresses,
+            "websites": pa.array(websites, pa.list_(pa.string())),
+            "bbox": pa.array(bbox, pa.struct([(name, pa.float32()) for name in ["xmin", "xmax", "ymin", "ymax"]])),
+        }
+    )
+
+
+def convert_per_value(table: pa.Table) -> pa.Table:
+    """Convert the nested columns one value at a time, as before the columnar encoder."""
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_struct(field.type) or pa.types.is_list(field.type) or pa.types.is_map(field.type):
+            columns.append(pa.array([json.dumps(value.as_py()) for value in column]))
+        else:
+            columns.append(column)
+    return pa.table(columns, names=table.schema.names)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the batch.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs, reporting the fastest.")
+    args = parser.parse_args()
+
+    table = make_batch(args.rows)
+
+    results = {}
+    for name, convert in {"per value": convert_per_value, "columnar": convert_complex_columns_to_strings}.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[name] = convert(table)
+            timings.append(time.perf_counter() - start)
+        elapsed = min(timings)
+        print(f"{name:>10}: {elapsed:6.3f} s, {args.rows / elapsed:>12,.0f} rows/s")
+
+    assert results["columnar"].equals(results["per value"]), "Columnar output differs from per value output."
+    print("Outputs identical.")
@@ -0,0 +1,96 @@
+"""
+Benchmark scan throughput for different scan options.
+
+A synthetic dataset resembling Overture data, with many files and row groups, is created in a temporary directory
+and scanned through a filesystem adding a fixed latency to every read, approximating S3. The rows per second are
+reported for each combination of read ahead, batch size and thread settings.
+
+    python scripts/benchmarks/benchmark_scan.py --files 64 --latency 0.05
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+import struct
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from latency_filesystem import latency_filesystem
+
+from overture_to_arcgis.utils import OvertureClient, ReleaseCatalog, ScanOptions, get_record_batches
+
+RELEASE = "2025-01-22.0"
+THEMES = ["addresses", "base", "buildings", "divisions", "transportation"]
+
+
+def make_dataset(base_dir: Path, file_count: int, rows_per_file: int, row_group_size: int) -> None:
+    """Create a synthetic release with a segment dataset split over multiple files."""
+    for theme in THEMES:
+        (base_dir / RELEASE / f"theme={theme}").mkdir(parents=True)
+    type_dir = base_dir / RELEASE / "theme=transportation" / "type=segment"
+    type_dir.mkdir()
+
+    rng = np.random.default_rng(42)
+    for file_idx in range(file_count):
+        xs = rng.uniform(-123.0, -122.0, rows_per_file)
+        ys = rng.uniform(47.0, 48.0, rows_per_file)
+        table = pa.table(
+            {
+                "id": [f"{file_idx:04d}{idx:08d}" for idx in range(rows_per_file)],
+                "geometry": [struct.pack("<bIIdddd", 1, 2, 2, x, y, x + 0.001, y + 0.001) for x, y in zip(xs, ys)],
+                "bbox": pa.StructArray.from_arrays(
+                    [pa.array(values, pa.float32()) for values in [xs, xs + 0.001, ys, ys + 0.001]],
+                    names=["xmin", "xmax", "ymin", "ymax"],
+                ),
+                "class": rng.choice(["primary", "secondary", "residential", "footway"], rows_per_file),
+            }
+        )
+        geo = b'{"version": "1.1.0", "primary_column": "geometry", "columns": {"geometry": {"encoding": "WKB"}}}'
+        table = table.replace_schema_metadata({b"geo": geo})
+        pq.write_table(table, type_dir / f"part-{file_idx:05d}.parquet", row_group_size=row_group_size)
+
+
+def time_scan(base_dir: Path, cache_dir: str, latency: float, scan_options: ScanOptions) -> tuple[float, int]:
+    """Time a full scan of the segment dataset through the latency filesystem."""
+    filesystem = latency_filesystem(latency)
+    catalog = ReleaseCatalog(filesystem, base_dir=str(base_dir), cache_dir=cache_dir)
+    client = OvertureClient(filesystem=filesystem, catalog=catalog, scan_options=scan_options)
+    client.get_dataset("segment")
+
+    # build the fragment index before timing, so no configuration pays for building it
+    client.get_fragment_index("segment")
+
+    start = time.perf_counter()
+    row_count = sum(
+        batch.num_rows for batch in get_record_batches("segment", (-123.0, 47.0, -122.0, 48.0), client=client)
+    )
+    return time.perf_counter() - start, row_count
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=64, help="Number of Parquet files.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per file.")
+    parser.add_argument("--row-group-size", type=int, default=2_500, help="Rows per row group.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every read.")
+    args = parser.parse_args()
+
+    configurations = {
+        "serial": ScanOptions(fragment_readahead=1, batch_readahead=1, use_threads=False, io_thread_count=1),
+        "pyarrow defaults": ScanOptions(fragment_readahead=4, batch_readahead=16, io_thread_count=8),
+        "tuned defaults": ScanOptions(io_thread_count=32),
+        "tuned, no pre-buffer": ScanOptions(pre_buffer=False, io_thread_count=32),
+        "tuned, small batches": ScanOptions(batch_size=8_192, io_thread_count=32),
+        "aggressive": ScanOptions(fragment_readahead=32, batch_readahead=64, io_thread_count=64),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_dir = Path(tmp_dir) / "release"
+        make_dataset(base_dir, args.files, args.rows, args.row_group_size)
+
+        print(f"{args.files} files x {args.rows:,} rows, {args.latency * 1000:.0f} ms per read")
+        for name, scan_options in configurations.items():
+            elapsed, row_count = time_scan(base_dir, str(Path(tmp_dir) / "cache"), args.latency, scan_options)
+            print(f"{name:>22}: {elapsed:6.2f} s, {row_count / elapsed:>12,.0f} rows/s")
@@ -0,0 +1,123 @@
+"""
+Benchmark decoding WKB geometries for points, linestrings and multipolygons.
+
+Synthetic little endian WKB, as found in Overture data, is decoded one value at a time using `geomet.wkb.loads`, as
+before the batched decoder, if geomet is installed, one value at a time using the scalar WKB reader, and all at
+once using `read_wkb_coordinates`. Building the Esri JSON from the batched coordinates is timed separately, since it is only
+done when geometry objects are needed. The batched coordinates are checked to match the scalar reader and the
+geometries per second reported.
+
+    python scripts/benchmarks/benchmark_wkb.py --rows 100000
+"""
+from argparse import ArgumentParser
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from overture_to_arcgis.utils._wkb import _read_geometry, read_wkb_coordinates
+
+from wkb_writer import dumps_wkb
+
+# geomet is no longer a dependency, so only compare against decoding with it if installed
+try:
+    from geomet import wkb
+except ImportError:
+    wkb = None
+
+
+def make_ring(rng: np.random.Generator, x: float, y: float, size: float, vertices: int) -> list:
+    """Create a closed ring around a center."""
+    angles = np.sort(rng.uniform(0, 2 * np.pi, vertices))
+    ring = np.column_stack([x + size * np.cos(angles), y + size * np.sin(angles)]).tolist()
+    return ring + [ring[0]]
+
+
+def make_geometries(geometry_type: str, row_count: int) -> pa.Array:
+    """Create a binary array of WKB geometries of a type."""
+    rng = np.random.default_rng(42)
+    centers = np.column_stack([rng.uniform(-123, -122, row_count), rng.uniform(47, 48, row_count)])
+
+    geometries = []
+    for x, y in centers.tolist():
+        if geometry_type == "point":
+            geometry = {"type": "Point", "coordinates": [x, y]}
+        elif geometry_type == "linestring":
+            steps = rng.normal(0, 0.0005, (int(rng.integers(2, 20)), 2)).cumsum(axis=0)
+            geometry = {"type": "LineString", "coordinates": (steps + [x, y]).tolist()}
+        else:
+            polygons = []
+            for part_idx in range(int(rng.integers(1, 4))):
+                px, py = x + part_idx * 0.01, y
+                rings = [make_ring(rng, px, py, 0.002, int(rng.integers(4, 30)))]
+                if rng.uniform() < 0.3:
+                    rings.append(make_ring(rng, px, py, 0.0005, 5)[::-1])
+                polygons.append(rings)
+            geometry = {"type": "MultiPolygon", "coordinates": polygons}
+        geometries.append(dumps_wkb(geometry))
+
+    return pa.array(geometries, pa.binary())
+
+
+def decode_geomet(values: pa.Array) -> list:
+    """Decode one value at a time to GeoJSON using geomet."""
+    return [wkb.loads(value) for value in values.to_pylist()]
+
+
+def decode_scalar(values: pa.Array) -> list:
+    """Decode one value at a time to coordinate arrays using the scalar reader."""
+    decoded = []
+    for value in values.to_pylist():
+        coords, kinds, exterior = [], [], []
+        _read_geometry(value, 0, coords, kinds, exterior)
+        decoded.append(coords)
+    return decoded
+
+
+def decode_batched(values: pa.Array):
+    """Decode all the values at once."""
+    return read_wkb_coordinates(values)
+
+
+def decode_batched_esri_json(values: pa.Array) -> list:
+    """Decode all the values at once, then build the Esri JSON of each geometry."""
+    return list(read_wkb_coordinates(values).iter_esri_json(spatial_reference={"wkid": 4326}))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Geometries of each type.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs, reporting the fastest.")
+    args = parser.parse_args()
+
+    decoders = {
+        "geomet": decode_geomet,
+        "scalar": decode_scalar,
+        "batched": decode_batched,
+        "batched + Esri JSON": decode_batched_esri_json,
+    }
+    if wkb is None:
+        del decoders["geomet"]
+
+    for geometry_type in ["point", "linestring", "multipolygon"]:
+        values = make_geometries(geometry_type, args.rows)
+        print(f"{geometry_type} ({values.nbytes / 1024**2:,.1f} MB of WKB)")
+
+        results = {}
+        for name, decode in decoders.items():
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results[name] = decode(values)
+                timings.append(time.perf_counter() - start)
+            elapsed = min(timings)
+            print(f"{name:>20}: {elapsed:6.3f} s, {args.rows / elapsed:>12,.0f} geometries/s")
+
+        # check the batched coordinates match the scalar reader
+        batched = results["batched"]
+        scalar_coords = np.concatenate([part for parts in results["scalar"] for part in parts])
+        scalar_counts = [len(part) for parts in results["scalar"] for part in parts]
+        assert np.array_equal(batched.coords, scalar_coords), "Batched coordinates differ from the scalar reader."
+        assert np.array_equal(np.diff(batched.part_offsets), scalar_counts), "Batched parts differ."
+        assert batched.malformed_count == 0
+        print("Coordinates identical.")
@@ -0,0 +1,123 @@
+"""
+Local filesystem wrapper adding a fixed latency to every round trip, used by the benchmarks to approximate the
+behavior of high latency object storage such as S3 without needing network access.
+"""
+from pathlib import Path
+import importlib.util
+import sys
+import time
+
+# if the project package is not installed in the environment, add the source directory to the path
+dir_prj = Path(__file__).parent.parent.parent
+if importlib.util.find_spec("overture_to_arcgis") is None:
+    sys.path.insert(0, str(dir_prj / "src"))
+
+import pyarrow as pa
+import pyarrow.fs as fs
+
+
+class LatencyFile:
+    """Readable file object sleeping for the latency on every read, mimicking a ranged GET request."""
+
+    def __init__(self, handle: pa.NativeFile, latency: float):
+        self.handle = handle
+        self.latency = latency
+        self.closed = False
+
+    def read(self, nbytes: int = -1) -> bytes:
+        time.sleep(self.latency)
+        return self.handle.read(None if nbytes < 0 else nbytes)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, position: int, whence: int = 0) -> int:
+        return self.handle.seek(position, whence)
+
+    def tell(self) -> int:
+        return self.handle.tell()
+
+    def size(self) -> int:
+        return self.handle.size()
+
+    def close(self) -> None:
+        self.closed = True
+        self.handle.close()
+
+
+class LatencyHandler(fs.FileSystemHandler):
+    """
+    Filesystem handler delegating to the local filesystem, while sleeping for the latency on every listing and
+    read. Use with `pyarrow.fs.PyFileSystem(LatencyHandler(latency))`.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.local = fs.LocalFileSystem()
+        self.latency = latency
+        self.list_count = 0
+        self.read_count = 0
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def get_type_name(self):
+        return "latency"
+
+    def normalize_path(self, path):
+        return path
+
+    def get_file_info(self, paths):
+        time.sleep(self.latency)
+        return self.local.get_file_info(paths)
+
+    def get_file_info_selector(self, selector):
+        self.list_count += 1
+        time.sleep(self.latency)
+        return self.local.get_file_info(selector)
+
+    def create_dir(self, path, recursive):
+        self.local.create_dir(path, recursive=recursive)
+
+    def delete_dir(self, path):
+        self.local.delete_dir(path)
+
+    def delete_dir_contents(self, path, missing_dir_ok=False):
+        self.local.delete_dir_contents(path, missing_dir_ok=missing_dir_ok)
+
+    def delete_root_dir_contents(self):
+        # the wrapped local filesystem is rooted at the machine root, so never delete through it
+        raise PermissionError("The latency benchmark filesystem refuses to delete the contents of the root directory.")
+
+    def delete_file(self, path):
+        self.local.delete_file(path)
+
+    def move(self, src, dest):
+        self.local.move(src, dest)
+
+    def copy_file(self, src, dest):
+        self.local.copy_file(src, dest)
+
+    def open_input_stream(self, path):
+        self.read_count += 1
+        return pa.PythonFile(LatencyFile(self.local.open_input_file(path), self.latency), mode="r")
+
+    def open_input_file(self, path):
+        self.read_count += 1
+        return pa.PythonFile(LatencyFile(self.local.open_input_file(path), self.latency), mode="r")
+
+    def open_output_stream(self, path, metadata):
+        return self.local.open_output_stream(path, metadata=metadata)
+
+    def open_append_stream(self, path, metadata):
+        return self.local.open_append_stream(path, metadata=metadata)
+
+
+def latency_filesystem(latency: float = 0.05) -> fs.PyFileSystem:
+    """Create a local PyArrow filesystem adding the latency to every round trip."""
+    return fs.PyFileSystem(LatencyHandler(latency))
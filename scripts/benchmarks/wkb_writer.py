@@ -0,0 +1,46 @@
+"""
+Minimal writer encoding GeoJSON geometries as little endian 2D WKB, used by the benchmarks to create synthetic
+Overture like geometries without needing a geometry library.
+"""
+import struct
+
+# WKB geometry type code of each GeoJSON geometry type
+WKB_TYPE_CODES: dict[str, int] = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+
+
+def _pack_points(points: list) -> bytes:
+    """Pack a count followed by the x and y coordinates of the points."""
+    return struct.pack("<I", len(points)) + b"".join(struct.pack("<2d", *point[:2]) for point in points)
+
+
+def dumps_wkb(geometry: dict) -> bytes:
+    """
+    Encode a GeoJSON Point, LineString, Polygon, MultiPoint, MultiLineString or MultiPolygon as WKB.
+
+    Args:
+        geometry: GeoJSON geometry dictionary.
+
+    Returns:
+        Little endian 2D WKB.
+    """
+    geometry_type, coordinates = geometry["type"], geometry["coordinates"]
+    header = struct.pack("<BI", 1, WKB_TYPE_CODES[geometry_type])
+
+    if geometry_type == "Point":
+        return header + struct.pack("<2d", *coordinates[:2])
+    if geometry_type == "LineString":
+        return header + _pack_points(coordinates)
+    if geometry_type == "Polygon":
+        return header + struct.pack("<I", len(coordinates)) + b"".join(_pack_points(ring) for ring in coordinates)
+
+    # multipart geometries are a count followed by each part as a complete geometry
+    part_type = geometry_type[len("Multi"):]
+    parts = [dumps_wkb({"type": part_type, "coordinates": part}) for part in coordinates]
+    return header + struct.pack("<I", len(parts)) + b"".join(parts)
@@ -4,8 +4,26 @@ __author__ = "Joel McCune (https://github.com/knu2xs)"
 __license__ = "Apache 2.0"
 __copyright__ = "Copyright 2025 by Joel McCune (https://github.com/knu2xs)"
 
-from .__main__ import get_spatially_enabled_dataframe, get_features
+from .__main__ import (
+    get_spatially_enabled_dataframe,
+    iter_spatially_enabled_dataframes,
+    get_features,
+    get_features_many,
+    update_features,
+)
 from . import utils
+from .utils import OvertureClient, estimate_extract, get_arrow_table, get_record_batch_reader
 
-__all__ = ["get_spatially_enabled_dataframe", "get_features", "utils"]
+__all__ = [
+    "get_spatially_enabled_dataframe",
+    "iter_spatially_enabled_dataframes",
+    "get_features",
+    "get_features_many",
+    "update_features",
+    "estimate_extract",
+    "get_arrow_table",
+    "get_record_batch_reader",
+    "OvertureClient",
+    "utils",
+]
 
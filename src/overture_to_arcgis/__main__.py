@@ -1,21 +1,41 @@
+from collections import deque
 from importlib.util import find_spec
 import json
 import logging
 from pathlib import Path
 import shutil
-from typing import Union
+from typing import Iterable, Iterator, Optional, Union
 
 import arcpy
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from overture_to_arcgis.utils.__main__ import convert_complex_columns_to_strings
+from overture_to_arcgis.utils._aoi import resolve_aoi
+from overture_to_arcgis.utils._diff import DEFAULT_FINGERPRINT
+from overture_to_arcgis.utils._memory import DEFAULT_MAX_MEMORY, DEFAULT_ROW_BYTES
+from overture_to_arcgis.utils._query import resolve_where
 
 from .utils import (
-    get_all_overture_types,
+    AreaOfInterest,
+    BatchPrefetcher,
+    CheckpointJournal,
+    diff_releases,
+    estimate_extract,
+    FlattenField,
+    GeometryProcessing,
+    iter_table_chunks,
+    MemoryBudget,
+    OvertureClient,
+    ReleaseDiff,
+    Sample,
+    ScanOptions,
     get_logger,
     validate_bounding_box,
     get_temp_gdb,
     get_record_batches,
+    retry_with_backoff,
     table_to_features,
     table_to_spatially_enabled_dataframe,
     get_geometry_column,
@@ -27,11 +47,102 @@ logger = get_logger(
 )
 
 
-def get_spatially_enabled_dataframe(
+def _get_memory_budget(
     overture_type: str,
     bbox: tuple[float, float, float, float],
+    client: OvertureClient,
+    max_memory: Union[int, str],
+) -> MemoryBudget:
+    """
+    Get a memory budget for an extract, sizing the batches from the average row size in the fragment index.
+
+    Args:
+        overture_type: Overture feature type of the extract.
+        bbox: Bounding box of the extract.
+        client: Client to use for the estimate.
+        max_memory: Memory budget in bytes or as a string such as `2GB`.
+
+    Returns:
+        Memory budget for the extract.
+    """
+    estimate = estimate_extract(overture_type, bbox, client=client)
+    row_bytes = estimate.output_bytes // estimate.rows if estimate.rows > 0 else DEFAULT_ROW_BYTES
+    return MemoryBudget(max_memory, row_bytes=row_bytes)
+
+
+def _batches_to_spatially_enabled_dataframe(
+    batches: Iterable[pa.RecordBatch], arrow_dtypes: bool = False, categorical_threshold: Optional[float] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Convert record batches to a single spatially enabled dataframe, collecting the batches and combining these at
+    the Arrow level without copying, so the data is converted to pandas once, rather than concatenating a
+    dataframe for each batch, which copies every row already converted for each batch added.
+
+    Args:
+        batches: Record batches to convert.
+        arrow_dtypes: Whether to use Arrow backed pandas dtypes.
+        categorical_threshold: Optional maximum share of distinct values to rows for string columns to be
+            converted to categoricals.
+
+    Returns:
+        Spatially enabled dataframe, or `None` if there are no rows.
+    """
+    batches = [batch for batch in batches if batch.num_rows > 0]
+    if len(batches) == 0:
+        return None
+
+    return table_to_spatially_enabled_dataframe(
+        pa.Table.from_batches(batches), arrow_dtypes=arrow_dtypes, categorical_threshold=categorical_threshold
+    )
+
+
+def _concat_spatially_enabled_dataframes(frames: list[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Concatenate spatially enabled dataframes in a single step, and set the geometry of the result once.
+
+    Args:
+        frames: Spatially enabled dataframes to concatenate.
+
+    Returns:
+        Spatially enabled dataframe, or `None` if there are no dataframes.
+    """
+    if len(frames) == 0:
+        return None
+
+    # use the same categories for columns categorical in every frame, so these stay categorical when concatenated
+    for col in frames[0].columns:
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = frames[0][col].cat.categories
+            for frame in frames[1:]:
+                categories = categories.union(frame[col].cat.categories)
+            frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+
+    # concatenate all the frames at once, and set the geometry column using the ArcGIS GeoAccessor
+    geom_col = frames[0].spatial.name
+    df = pd.concat(frames, ignore_index=True)
+    df.spatial.set_geometry(geom_col, sr=4326, inplace=True)
+
+    return df
+
+
+def get_spatially_enabled_dataframe(
+    overture_type: str,
+    bbox: Optional[tuple[float, float, float, float]] = None,
     connect_timeout: int = None,
     request_timeout: int = None,
+    client: Optional[OvertureClient] = None,
+    columns: Optional[Union[str, list[str]]] = None,
+    where: Optional[Union[str, pc.Expression]] = None,
+    scan_options: Optional[ScanOptions] = None,
+    tile_size: Optional[Union[float, str]] = None,
+    tile_workers: int = 4,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    max_memory: Optional[Union[int, str]] = None,
+    sample: Optional[Union[float, Sample]] = None,
+    flatten: Optional[Union[bool, dict[str, Union[str, FlattenField]]]] = None,
+    geometry_processing: Optional[Union[GeometryProcessing, dict]] = None,
+    arrow_dtypes: bool = False,
+    categorical_threshold: Optional[float] = None,
 ) -> pd.DataFrame:
     """
     Retrieve data from Overture Maps as an
@@ -43,57 +154,112 @@ def get_spatially_enabled_dataframe(
 
     Args:
         overture_type: Overture feature type to retrieve.
-        bbox: Bounding box to filter the data. Format: (minx, miny, maxx, maxy).
+        bbox: Bounding box to filter the data. Format: (minx, miny, maxx, maxy). Optional if an area of interest
+            is provided.
         connect_timeout: Optional timeout in seconds for establishing a connection to the Overture Maps service.
         request_timeout: Optional timeout in seconds for waiting for a response from the Overture Maps service.
+        client: Optional `OvertureClient` to share the connection, release and schemas between requests. If
+            provided, the timeouts are ignored in favor of the client settings.
+        columns: Optional list of columns to retrieve, including nested struct fields using dotted paths such as
+            `names.primary`, or a column preset name such as `lite`. If not provided, all columns are retrieved.
+        where: Optional attribute filter applied while scanning, either a PyArrow compute expression or a SQL-like
+            string such as `"class in ('motorway', 'primary')"`.
+        scan_options: Optional `ScanOptions` controlling read ahead, batch size and threading.
+        tile_size: Optional tile size in decimal degrees to split a large bounding box into, so the tiles are
+            scanned concurrently, or `auto` to pick the tile size from the estimated feature density. Features
+            intersecting more than one tile are only included once.
+        tile_workers: Number of tiles scanned concurrently when tiling.
+        aoi: Optional polygon or multipolygon area of interest in WGS84, as an `AreaOfInterest`, WKB, WKT, a
+            GeoJSON dictionary or a geometry with a `WKB` property, such as an ArcPy geometry. Only features
+            intersecting the area are retrieved. If no bounding box is provided, the extent of the area is used.
+        max_memory: Optional memory budget for retrieving and converting the data, in bytes or as a string such as
+            `2GB`. The scanner reads ahead less and the batches are converted in chunks bounded by the budget. The
+            budget does not include the returned dataframe, so for data larger than memory use
+            `iter_spatially_enabled_dataframes` instead.
+        sample: Optional share of the features to return, such as `0.01`, or a `Sample` to set the seed or
+            stratify the sample using a grid, for a quick preview of a large area. Only the row groups chosen for
+            the sample are read. Cannot be combined with tiling.
+        flatten: Optional values to pull out of nested columns into their own columns while the data is still in
+            Arrow, as a dictionary of output column names and paths or `FlattenField` instances, e.g.
+            `{"primary_name": "names.primary", "website": "websites[0]"}`, or `True` for `OVERTURE_FLATTEN_SPEC`,
+            replacing the `add_primary_name`, `add_primary_category_field`, `add_alternate_category_field` and
+            `add_website_field` passes over the output.
+        geometry_processing: Optional `GeometryProcessing`, or a dictionary with the `precision` and `tolerance`,
+            to snap the coordinates to a grid and simplify the linestrings and polygons while reading, so the
+            output is smaller and faster to write and draw.
+        arrow_dtypes: Whether to use Arrow backed `pd.ArrowDtype` columns rather than NumPy and Python object
+            columns, so strings are kept in Arrow memory rather than as Python strings. Requires pandas 2.0 or
+            later.
+        categorical_threshold: Optional maximum share of distinct values to rows, such as `0.05`, for string
+            columns to be converted to categoricals, greatly reducing the memory used by low cardinality columns
+            such as `class`, `subtype` and `subclass`.
 
     Returns:
         A spatially enabled pandas DataFrame containing the requested Overture Maps data.
     """
+    # create a client for the request if one is not provided
+    if client is None:
+        client = OvertureClient(
+            connect_timeout=connect_timeout, request_timeout=request_timeout
+        )
+
     # validate the overture type
-    available_types = get_all_overture_types()
+    available_types = client.overture_types
     if overture_type not in available_types:
         raise ValueError(
             f"Invalid overture type: {overture_type}. Valid types are: {available_types}"
         )
 
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        bbox = aoi.bbox if bbox is None else bbox
+
     # validate the bounding box
     bbox = validate_bounding_box(bbox)
 
-    # get the record batch generator
-    batches = get_record_batches(overture_type, bbox, connect_timeout, request_timeout)
-
-    # initialize the dataframe and geometry column name
-    df = None
-
-    # iterate the batches
-    for idx, batch in enumerate(batches):
-
-        # if the batch has any rows and the dataframe is not yet initialized
-        if batch.num_rows > 0 and df is None:
-
-            # create the initial dataframe
-            df = table_to_spatially_enabled_dataframe(batch)
-
-            # save the geometry column name
-            geom_col = df.spatial.name
+    # fit the scan read ahead to the memory budget, shared between the tiles scanned concurrently
+    budget = None
+    if max_memory is not None:
+        budget = _get_memory_budget(overture_type, bbox, client, max_memory)
+        scan_options = budget.get_scan_options(
+            scan_options or client.scan_options, streams=tile_workers if tile_size is not None else 1
+        )
 
-        elif batch.num_rows > 0:
-            # get the batch as a spatially enabled dataframe
-            tmb_df = table_to_spatially_enabled_dataframe(batch)
+    # get the record batch generator
+    batches = get_record_batches(
+        overture_type,
+        bbox,
+        client=client,
+        columns=columns,
+        where=where,
+        scan_options=scan_options,
+        tile_size=tile_size,
+        tile_workers=tile_workers,
+        aoi=aoi,
+        sample=sample,
+        flatten=flatten,
+        geometry_processing=geometry_processing,
+    )
+
+    # with a memory budget, convert bounded chunks of batches and combine the converted chunks once at the end
+    if budget is not None:
+        frames = [
+            table_to_spatially_enabled_dataframe(
+                chunk, arrow_dtypes=arrow_dtypes, categorical_threshold=categorical_threshold
+            )
+            for chunk in iter_table_chunks(batches, budget.chunk_bytes)
+        ]
+        df = _concat_spatially_enabled_dataframes(frames)
 
-            # append the batch dataframe to the main dataframe
-            df = pd.concat([df, tmb_df], ignore_index=True)
+    # otherwise combine the batches into a single table, so the data is converted to pandas and the geometry set once
+    else:
+        df = _batches_to_spatially_enabled_dataframe(
+            batches, arrow_dtypes=arrow_dtypes, categorical_threshold=categorical_threshold
+        )
 
-    # if data found, perform post processing
+    # if data found, log the number of rows fetched
     if isinstance(df, pd.DataFrame):
-        # set the geometry column using the ArcGIS GeoAccessor to get a Spatially Enabled DataFrame
-        df.spatial.set_geometry(geom_col, sr=4326, inplace=True)
-
-        # reset the index so it makes sense after concatenation
-        df.reset_index(drop=True, inplace=True)
-
-        # log the number of rows fetched
         df_cnt = df.shape[0]
         logger.debug(
             f"Fetched {df_cnt} rows of '{overture_type}' data from Overture Maps."
@@ -109,42 +275,151 @@ def get_spatially_enabled_dataframe(
     return df
 
 
-def get_features(
-    output_feature_class: Union[str, Path],
+def iter_spatially_enabled_dataframes(
     overture_type: str,
-    bbox: tuple[float, float, float, float],
+    bbox: Optional[tuple[float, float, float, float]] = None,
+    max_memory: Union[int, str] = DEFAULT_MAX_MEMORY,
     connect_timeout: int = None,
     request_timeout: int = None,
-) -> Path:
+    client: Optional[OvertureClient] = None,
+    columns: Optional[Union[str, list[str]]] = None,
+    where: Optional[Union[str, pc.Expression]] = None,
+    scan_options: Optional[ScanOptions] = None,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    flatten: Optional[Union[bool, dict[str, Union[str, FlattenField]]]] = None,
+    geometry_processing: Optional[Union[GeometryProcessing, dict]] = None,
+    arrow_dtypes: bool = False,
+    categorical_threshold: Optional[float] = None,
+) -> Iterator[pd.DataFrame]:
     """
-    Retrieve data from Overture Maps and save it as an ArcGIS Feature Class.
+    Retrieve data from Overture Maps as a sequence of
+    [ArcGIS spatially enabled Pandas DataFrames](https://developers.arcgis.com/python/latest/guide/introduction-to-the-spatially-enabled-dataframe/),
+    each sized to fit a memory budget, so data larger than memory can be processed one dataframe at a time.
+
+    The scanner only reads ahead while the consumer processes the current dataframe, and reads less ahead to fit
+    the budget, so memory use stays about the budget if each dataframe is released before requesting the next.
+
+    ``` python
+    from overture_to_arcgis import iter_spatially_enabled_dataframes
+
+    for df in iter_spatially_enabled_dataframes("building", bbox, max_memory="2GB"):
+        df.spatial.to_featureclass(...)
+    ```
 
     Args:
-        output_feature_class: Path to the output feature class.
         overture_type: Overture feature type to retrieve.
-        bbox: Bounding box to filter the data. Format: (minx, miny, maxx, maxy).
-        connect_timeout: Optional timeout in seconds for establishing a connection to the AWS S3.
-        request_timeout: Optional timeout in seconds for waiting for a response from the AWS S3.
+        bbox: Bounding box to filter the data. Format: (minx, miny, maxx, maxy). Optional if an area of interest
+            is provided.
+        max_memory: Memory budget in bytes or as a string such as `2GB`, shared between the read ahead, the chunk
+            being converted and the dataframe it is converted to.
+        connect_timeout: Optional timeout in seconds for establishing a connection to the Overture Maps service.
+        request_timeout: Optional timeout in seconds for waiting for a response from the Overture Maps service.
+        client: Optional `OvertureClient` to share the connection, release and schemas between requests. If
+            provided, the timeouts are ignored in favor of the client settings.
+        columns: Optional list of columns to retrieve, including nested struct fields using dotted paths such as
+            `names.primary`, or a column preset name such as `lite`. If not provided, all columns are retrieved.
+        where: Optional attribute filter applied while scanning, either a PyArrow compute expression or a SQL-like
+            string such as `"class in ('motorway', 'primary')"`.
+        scan_options: Optional `ScanOptions`, with the read ahead and batch size reduced as needed to fit the
+            budget.
+        aoi: Optional polygon or multipolygon area of interest in WGS84, as an `AreaOfInterest`, WKB, WKT, a
+            GeoJSON dictionary or a geometry with a `WKB` property, such as an ArcPy geometry. Only features
+            intersecting the area are retrieved. If no bounding box is provided, the extent of the area is used.
+        flatten: Optional values to pull out of nested columns into their own columns while the data is still in
+            Arrow, as a dictionary of output column names and paths or `FlattenField` instances, e.g.
+            `{"primary_name": "names.primary", "website": "websites[0]"}`, or `True` for `OVERTURE_FLATTEN_SPEC`,
+            replacing the `add_primary_name`, `add_primary_category_field`, `add_alternate_category_field` and
+            `add_website_field` passes over the output.
+        geometry_processing: Optional `GeometryProcessing`, or a dictionary with the `precision` and `tolerance`,
+            to snap the coordinates to a grid and simplify the linestrings and polygons while reading, so the
+            output is smaller and faster to write and draw.
+        arrow_dtypes: Whether to use Arrow backed `pd.ArrowDtype` columns rather than NumPy and Python object
+            columns, so strings are kept in Arrow memory rather than as Python strings. Requires pandas 2.0 or
+            later.
+        categorical_threshold: Optional maximum share of distinct values to rows, such as `0.05`, for string
+            columns to be converted to categoricals, greatly reducing the memory used by low cardinality columns
+            such as `class`, `subtype` and `subclass`.
 
     Returns:
-        Path to the created feature class.
+        Iterator of spatially enabled pandas DataFrames.
     """
-    # ensure arcpy is available
-    if find_spec('arcpy') is None:
-        raise EnvironmentError("ArcPy is required for get_as_feature_class.")
+    # create a client for the request if one is not provided
+    if client is None:
+        client = OvertureClient(
+            connect_timeout=connect_timeout, request_timeout=request_timeout
+        )
+
+    # validate the overture type
+    client.validate_overture_type(overture_type)
+
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        bbox = aoi.bbox if bbox is None else bbox
 
     # validate the bounding box
     bbox = validate_bounding_box(bbox)
 
-    # get a temporary geodatabase to hold the batch feature classes
-    tmp_gdb = get_temp_gdb()
+    # fit the scan read ahead to the memory budget
+    budget = _get_memory_budget(overture_type, bbox, client, max_memory)
+    scan_options = budget.get_scan_options(scan_options or client.scan_options)
+
+    # get the record batch generator
+    batches = get_record_batches(
+        overture_type,
+        bbox,
+        client=client,
+        columns=columns,
+        where=where,
+        scan_options=scan_options,
+        aoi=aoi,
+        flatten=flatten,
+        geometry_processing=geometry_processing,
+    )
+
+    # convert and yield each bounded chunk of batches
+    chunk_count, row_count = 0, 0
+    for chunk in iter_table_chunks(batches, budget.chunk_bytes):
+        df = table_to_spatially_enabled_dataframe(
+            chunk, arrow_dtypes=arrow_dtypes, categorical_threshold=categorical_threshold
+        )
+        chunk_count += 1
+        row_count += df.shape[0]
+        yield df
 
+    if row_count == 0:
+        logger.warning(
+            f"No '{overture_type}' data found for the specified bounding box: {bbox}"
+        )
+    else:
+        logger.debug(
+            f"Fetched {row_count} rows of '{overture_type}' data from Overture Maps in {chunk_count} dataframes."
+        )
+
+
+def _write_batches_to_features(
+    batches: Iterable[pa.RecordBatch],
+    output_feature_class: Union[str, Path],
+    overture_type: str,
+    bbox: tuple[float, float, float, float],
+    tmp_gdb: Path,
+) -> bool:
+    """
+    Convert record batches to temporary feature classes and merge these into the output feature class.
+
+    Args:
+        batches: Record batches to convert.
+        output_feature_class: Path to the output feature class.
+        overture_type: Overture feature type of the data, used for naming the temporary feature classes.
+        bbox: Bounding box the data was retrieved for, used for reporting.
+        tmp_gdb: Temporary geodatabase to hold the batch feature classes.
+
+    Returns:
+        Whether any data was found and the output feature class created.
+    """
     # list to hold the feature classes
     fc_list = []
 
-    # get the record batch generator
-    batches = get_record_batches(overture_type, bbox, connect_timeout, request_timeout)
-
     # iterate through the record batches to see if we have any data
     for btch_idx, batch in enumerate(batches):
         # warn of no data found for the batch
@@ -178,7 +453,539 @@ def get_features(
     else:
         logger.warning("No data found for the specified bounding box. No output feature class created.")
 
+    return len(fc_list) > 0
+
+
+def _get_features_resumable(
+    output_feature_class: Union[str, Path],
+    overture_type: str,
+    bbox: tuple[float, float, float, float],
+    client: OvertureClient,
+    checkpoint_dir: Union[str, Path],
+    max_retries: int,
+    prefetch_depth: int,
+    **batch_kwargs,
+) -> Path:
+    """
+    Extract features in pieces, one for each file intersecting the bounding box, recording each piece in a
+    checkpoint journal once written, so a failed extract can be resumed by only extracting the remaining pieces.
+
+    Args:
+        output_feature_class: Path to the output feature class.
+        overture_type: Overture feature type to retrieve.
+        bbox: Validated bounding box.
+        client: Client to read with, pinned to the release.
+        checkpoint_dir: Directory for the checkpoint journal and intermediate outputs.
+        max_retries: Maximum number of retries for a piece failing with a network error.
+        prefetch_depth: Number of batches to prefetch for each piece, or `0` to not prefetch.
+        **batch_kwargs: Keyword arguments passed to `get_record_batches`.
+
+    Returns:
+        Path to the created feature class.
+    """
+    # everything defining the result identifies the journal, so only an identical extract resumes
+    aoi = batch_kwargs.get("aoi")
+    journal = CheckpointJournal.for_extract(
+        checkpoint_dir,
+        root=client.catalog.root,
+        release=client.release,
+        overture_type=overture_type,
+        bbox=bbox,
+        aoi=aoi.fingerprint if aoi is not None else None,
+        columns=batch_kwargs.get("columns"),
+        where=batch_kwargs.get("where"),
+        flatten=batch_kwargs.get("flatten"),
+        geometry_processing=batch_kwargs.get("geometry_processing"),
+    )
+
+    # intermediate outputs are kept in a geodatabase for the extract, not the shared temporary geodatabase
+    checkpoint_gdb = Path(checkpoint_dir) / f"extract_{journal.key}.gdb"
+    if not arcpy.Exists(str(checkpoint_gdb)):
+        arcpy.management.CreateFileGDB(str(checkpoint_gdb.parent), checkpoint_gdb.name)
+
+    # split the extract into pieces using the files with data in the bounding box
+    files = sorted(set(client.get_fragment_index(overture_type).query(bbox)["file"].to_pylist()))
+    pending = [file_name for file_name in files if not journal.is_complete(file_name)]
+
+    logger.info(
+        f"Extracting {len(pending)} of {len(files)} pieces of '{overture_type}', {len(files) - len(pending)} "
+        f"completed by a previous run."
+    )
+
+    def extract_piece(piece_idx: int, file_name: str) -> tuple[list[str], int]:
+        outputs, rows = [], 0
+        try:
+            batches = get_record_batches(overture_type, bbox, client=client, files=[file_name], **batch_kwargs)
+            if prefetch_depth > 0:
+                batches = BatchPrefetcher(batches, max_queue=prefetch_depth)
+
+            for btch_idx, batch in enumerate(batches):
+                if batch.num_rows == 0:
+                    continue
+
+                # replace any output left by an attempt interrupted before being recorded
+                tmp_fc = checkpoint_gdb / f"overture_{overture_type}_{piece_idx:05d}_{btch_idx:04d}"
+                if arcpy.Exists(str(tmp_fc)):
+                    arcpy.management.Delete(str(tmp_fc))
+
+                table_to_features(batch, output_features=tmp_fc)
+                outputs.append(str(tmp_fc))
+                rows += batch.num_rows
+
+        # remove the outputs of a failed attempt, so the retry starts clean
+        except BaseException:
+            for output in outputs:
+                arcpy.management.Delete(output)
+            raise
+
+        return outputs, rows
+
+    # extract the remaining pieces, retrying network failures, and continuing past pieces which keep failing
+    failed = []
+    for file_name in pending:
+        piece_idx = files.index(file_name)
+        try:
+            outputs, rows = retry_with_backoff(
+                lambda: extract_piece(piece_idx, file_name),
+                max_retries=max_retries,
+                description=f"extracting '{file_name}'",
+            )
+        except OSError as error:
+            logger.error(f"Failed to extract '{file_name}': {error}")
+            failed.append(file_name)
+            continue
+
+        journal.record(file_name, outputs, rows)
+
+    if failed:
+        raise RuntimeError(
+            f"Failed to extract {len(failed)} of {len(files)} pieces of '{overture_type}'. Run the extract again "
+            f"with the same parameters and checkpoint directory to retry only the failed pieces."
+        )
+
+    # merge the outputs of all the pieces into the output feature class
+    outputs = journal.outputs
+    if len(outputs) > 0:
+        arcpy.management.Merge(outputs, str(output_feature_class))
+    else:
+        logger.warning("No data found for the specified bounding box. No output feature class created.")
+
+    # the extract is complete, so remove the checkpoint
+    arcpy.management.Delete(str(checkpoint_gdb))
+    journal.remove()
+
+    return output_feature_class
+
+
+def get_features(
+    output_feature_class: Union[str, Path],
+    overture_type: str,
+    bbox: Optional[tuple[float, float, float, float]] = None,
+    connect_timeout: int = None,
+    request_timeout: int = None,
+    client: Optional[OvertureClient] = None,
+    columns: Optional[Union[str, list[str]]] = None,
+    where: Optional[Union[str, pc.Expression]] = None,
+    scan_options: Optional[ScanOptions] = None,
+    tile_size: Optional[Union[float, str]] = "auto",
+    tile_workers: Optional[int] = None,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    prefetch_depth: int = 0,
+    checkpoint_dir: Optional[Union[str, Path]] = None,
+    max_retries: int = 5,
+    flatten: Optional[Union[bool, dict[str, Union[str, FlattenField]]]] = None,
+    geometry_processing: Optional[Union[GeometryProcessing, dict]] = None,
+) -> Path:
+    """
+    Retrieve data from Overture Maps and save it as an ArcGIS Feature Class.
+
+    Args:
+        output_feature_class: Path to the output feature class.
+        overture_type: Overture feature type to retrieve.
+        bbox: Bounding box to filter the data. Format: (minx, miny, maxx, maxy). Optional if an area of interest
+            is provided.
+        connect_timeout: Optional timeout in seconds for establishing a connection to the AWS S3.
+        request_timeout: Optional timeout in seconds for waiting for a response from the AWS S3.
+        client: Optional `OvertureClient` to share the connection, release and schemas between requests. If
+            provided, the timeouts are ignored in favor of the client settings.
+        columns: Optional list of columns to retrieve, including nested struct fields using dotted paths such as
+            `names.primary`, or a column preset name such as `lite`. If not provided, all columns are retrieved.
+        where: Optional attribute filter applied while scanning, either a PyArrow compute expression or a SQL-like
+            string such as `"class in ('motorway', 'primary')"`.
+        scan_options: Optional `ScanOptions` controlling read ahead, batch size and threading.
+        tile_size: Tile size in decimal degrees to split a large bounding box into, so the tiles are scanned
+            concurrently. By default, `auto`, the extract is estimated using `estimate_extract`, and only tiled if
+            large, using a tile size picked from the estimated feature density. If `None`, the extract is not
+            tiled. Features intersecting more than one tile are only included once.
+        tile_workers: Number of tiles scanned concurrently when tiling. If not provided, picked from the estimate.
+        aoi: Optional polygon or multipolygon area of interest in WGS84, as an `AreaOfInterest`, WKB, WKT, a
+            GeoJSON dictionary or a geometry with a `WKB` property, such as an ArcPy geometry. Only features
+            intersecting the area are retrieved. If no bounding box is provided, the extent of the area is used.
+        prefetch_depth: Number of batches to fetch ahead on a background thread while the current batch is
+            converted and written, capping the memory used by the prefetched batches. If `0`, batches are fetched,
+            converted and written one after another.
+        checkpoint_dir: Optional directory to save a checkpoint journal and the intermediate outputs to, making
+            the extract resumable. The extract is split into pieces by file, and each piece is recorded in the
+            journal once written. If the extract fails, running it again with the same release, type, area and
+            filters, and the same checkpoint directory, skips the completed pieces. The journal and intermediate
+            outputs are removed once the output feature class is created.
+        max_retries: Maximum number of times a piece failing with a network error is retried, with exponential
+            backoff, when the extract is resumable.
+        flatten: Optional values to pull out of nested columns into their own columns while the data is still in
+            Arrow, as a dictionary of output column names and paths or `FlattenField` instances, e.g.
+            `{"primary_name": "names.primary", "website": "websites[0]"}`, or `True` for `OVERTURE_FLATTEN_SPEC`,
+            replacing the `add_primary_name`, `add_primary_category_field`, `add_alternate_category_field` and
+            `add_website_field` passes over the output.
+        geometry_processing: Optional `GeometryProcessing`, or a dictionary with the `precision` and `tolerance`,
+            to snap the coordinates to a grid and simplify the linestrings and polygons while reading, so the
+            output is smaller and faster to write and draw.
+
+    Returns:
+        Path to the created feature class.
+    """
+    # ensure arcpy is available
+    if find_spec('arcpy') is None:
+        raise EnvironmentError("ArcPy is required for get_as_feature_class.")
+
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        bbox = aoi.bbox if bbox is None else bbox
+
+    # validate the bounding box
+    bbox = validate_bounding_box(bbox)
+
+    # create a client, so the estimate and extract share the index and connection
+    if client is None:
+        client = OvertureClient(connect_timeout=connect_timeout, request_timeout=request_timeout)
+
+    # estimate the extract from the index to choose the tiling and concurrency
+    if tile_size == "auto" or tile_workers is None:
+        estimate = estimate_extract(overture_type, bbox, client=client)
+        logger.info(str(estimate))
+        if tile_size == "auto":
+            tile_size = estimate.tile_size
+        if tile_workers is None:
+            tile_workers = estimate.tile_workers
+
+    # if resumable, extract in pieces recorded in the checkpoint journal
+    if checkpoint_dir is not None:
+        return _get_features_resumable(
+            output_feature_class,
+            overture_type,
+            bbox,
+            client,
+            checkpoint_dir,
+            max_retries,
+            prefetch_depth,
+            columns=columns,
+            where=where,
+            scan_options=scan_options,
+            tile_size=tile_size,
+            tile_workers=tile_workers,
+            aoi=aoi,
+            flatten=flatten,
+            geometry_processing=geometry_processing,
+        )
+
+    # get a temporary geodatabase to hold the batch feature classes
+    tmp_gdb = get_temp_gdb()
+
+    # get the record batch generator
+    batches = get_record_batches(
+        overture_type,
+        bbox,
+        connect_timeout,
+        request_timeout,
+        client=client,
+        columns=columns,
+        where=where,
+        scan_options=scan_options,
+        tile_size=tile_size,
+        tile_workers=tile_workers,
+        aoi=aoi,
+        flatten=flatten,
+        geometry_processing=geometry_processing,
+    )
+
+    # if pipelining, fetch batches on a background thread while converting and writing in this thread
+    if prefetch_depth > 0:
+        batches = BatchPrefetcher(batches, max_queue=prefetch_depth)
+
+    # convert the batches to features and merge into the output feature class
+    _write_batches_to_features(batches, output_feature_class, overture_type, bbox, tmp_gdb)
+
+    # report the time each stage of the pipeline spent working and waiting
+    if isinstance(batches, BatchPrefetcher):
+        stats = batches.stats
+        logger.info(
+            f"Fetch busy {stats['fetch_busy']:.1f}s, idle {stats['fetch_idle']:.1f}s. Convert and write busy "
+            f"{stats['consume_busy']:.1f}s, idle {stats['consume_idle']:.1f}s."
+        )
+
     # cleanup temporary data - remove temporary geodatabase using arcpy to avoid any locks
     arcpy.management.Delete(str(tmp_gdb))
 
     return output_feature_class
+
+
+def get_features_many(
+    overture_types: list[str],
+    bbox: Optional[tuple[float, float, float, float]],
+    output_workspace: Union[str, Path],
+    connect_timeout: int = None,
+    request_timeout: int = None,
+    client: Optional[OvertureClient] = None,
+    columns: Optional[Union[str, list[str], dict[str, Union[str, list[str]]]]] = None,
+    where: Optional[Union[str, pc.Expression, dict[str, Union[str, pc.Expression]]]] = None,
+    scan_options: Optional[ScanOptions] = None,
+    max_workers: int = 4,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    flatten: Optional[Union[bool, dict[str, Union[str, FlattenField]]]] = None,
+    geometry_processing: Optional[Union[GeometryProcessing, dict]] = None,
+    prefetch_depth: int = 4,
+) -> dict[str, Path]:
+    """
+    Retrieve several Overture types for the same area and save each as an ArcGIS Feature Class, named using the
+    overture type, in the output workspace.
+
+    The release, type discovery, the connection and any area of interest are resolved once and shared by all types,
+    and the types are scanned concurrently. Each type streams its batches through a bounded queue, so while one
+    type is written to the output workspace, the other types scanned only read ahead until their queues are full,
+    and no type is held in memory in full.
+
+    ``` python
+    from overture_to_arcgis import get_features_many
+
+    types = ["segment", "connector", "building", "place", "water", "land_use", "division_area"]
+    feature_classes = get_features_many(types, bbox, "C:/data/basemap.gdb")
+    ```
+
+    Args:
+        overture_types: Overture feature types to retrieve.
+        bbox: Bounding box to filter the data. Format: (minx, miny, maxx, maxy). May be `None` if an area of
+            interest is provided.
+        output_workspace: Path to the workspace, such as a file geodatabase, to save the feature classes to.
+        connect_timeout: Optional timeout in seconds for establishing a connection to the AWS S3.
+        request_timeout: Optional timeout in seconds for waiting for a response from the AWS S3.
+        client: Optional `OvertureClient` to share the connection, release and schemas. If provided, the
+            timeouts are ignored in favor of the client settings.
+        columns: Optional columns to retrieve, either a column list or preset name used for every type, or a
+            dictionary of these keyed by overture type. Types not in the dictionary retrieve all columns.
+        where: Optional attribute filter, either a filter used for every type, or a dictionary of filters keyed by
+            overture type. Types not in the dictionary are not filtered.
+        scan_options: Optional `ScanOptions` controlling read ahead, batch size and threading.
+        max_workers: Number of types scanned concurrently.
+        aoi: Optional polygon or multipolygon area of interest in WGS84, resolved once and used for every type.
+            Only features intersecting the area are retrieved. If the bounding box is `None`, the extent of the
+            area is used.
+        flatten: Optional values to pull out of nested columns into their own columns, or `True` for
+            `OVERTURE_FLATTEN_SPEC`, used for every type. Paths into nested columns a type does not have are
+            skipped for that type.
+        geometry_processing: Optional `GeometryProcessing`, or a dictionary with the `precision` and `tolerance`,
+            used for every type.
+        prefetch_depth: Number of batches each type scanned reads ahead of writing, so at most about `max_workers`
+            times this many batches are held in memory.
+
+    Returns:
+        Dictionary of the created feature class paths keyed by overture type. Types with no data in the bounding
+        box are not included.
+    """
+    # ensure arcpy is available
+    if find_spec('arcpy') is None:
+        raise EnvironmentError("ArcPy is required for get_features_many.")
+
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        bbox = aoi.bbox if bbox is None else bbox
+
+    # validate the bounding box
+    bbox = validate_bounding_box(bbox)
+
+    # create a single client, so discovery and the connection are shared by all the types
+    if client is None:
+        client = OvertureClient(connect_timeout=connect_timeout, request_timeout=request_timeout)
+
+    # validate all the types before starting, so a typo does not fail the job part way through
+    overture_types = list(dict.fromkeys(overture_types))
+    for overture_type in overture_types:
+        client.validate_overture_type(overture_type)
+
+    output_workspace = Path(output_workspace)
+
+    # get a temporary geodatabase to hold the batch feature classes
+    tmp_gdb = get_temp_gdb()
+
+    def read_type(overture_type: str) -> BatchPrefetcher:
+        # get the columns and filter for the type if provided as a dictionary
+        type_columns = columns.get(overture_type) if isinstance(columns, dict) else columns
+        type_where = where.get(overture_type) if isinstance(where, dict) else where
+
+        # start scanning the type on a background thread, reading ahead into a bounded queue
+        batches = get_record_batches(
+            overture_type,
+            bbox,
+            client=client,
+            columns=type_columns,
+            where=type_where,
+            scan_options=scan_options,
+            aoi=aoi,
+            flatten=flatten,
+            geometry_processing=geometry_processing,
+        )
+        return BatchPrefetcher(batches, max_queue=prefetch_depth).start()
+
+    # dictionary to hold the created feature classes
+    feature_classes = {}
+
+    # keep up to the maximum number of types scanning, starting the next type as each type is written
+    pending = deque(overture_types)
+    scanning = deque()
+    for _ in range(min(max(1, max_workers), len(overture_types))):
+        overture_type = pending.popleft()
+        scanning.append((overture_type, read_type(overture_type)))
+
+    # since arcpy is not thread safe, write the types one after another from this thread as the batches arrive
+    try:
+        while scanning:
+            overture_type, batches = scanning.popleft()
+            output_feature_class = output_workspace / overture_type
+
+            logger.debug(f"Writing '{overture_type}' to {output_feature_class}.")
+
+            if _write_batches_to_features(batches, output_feature_class, overture_type, bbox, tmp_gdb):
+                feature_classes[overture_type] = output_feature_class
+
+            if pending:
+                next_type = pending.popleft()
+                scanning.append((next_type, read_type(next_type)))
+
+    # stop scanning the remaining types if writing fails
+    finally:
+        for _, batches in scanning:
+            batches.close()
+
+    # cleanup temporary data - remove temporary geodatabase using arcpy to avoid any locks
+    arcpy.management.Delete(str(tmp_gdb))
+
+    return feature_classes
+
+
+def update_features(
+    output_feature_class: Union[str, Path],
+    overture_type: str,
+    bbox: Optional[tuple[float, float, float, float]] = None,
+    base_release: Optional[str] = None,
+    connect_timeout: Optional[int] = None,
+    request_timeout: Optional[int] = None,
+    client: Optional[OvertureClient] = None,
+    columns: Optional[Union[str, list[str]]] = None,
+    where: Optional[Union[str, pc.Expression]] = None,
+    scan_options: Optional[ScanOptions] = None,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    fingerprint: Union[str, list[str]] = DEFAULT_FINGERPRINT,
+    flatten: Optional[Union[bool, dict[str, Union[str, FlattenField]]]] = None,
+    geometry_processing: Optional[Union[GeometryProcessing, dict]] = None,
+) -> ReleaseDiff:
+    """
+    Update a feature class extracted from an earlier release in place to match a later release, rather than
+    extracting it again in full. Only the `id` and fingerprint columns of both releases are compared, and the
+    geometry and attributes are only fetched for the features added or changed.
+
+    Features deleted or changed are removed from the feature class, and the features added or changed are appended.
+    The extract parameters, such as the bounding box, columns and filter, should match those the feature class was
+    created with.
+
+    ``` python
+    from overture_to_arcgis import update_features
+
+    diff = update_features("C:/data/overture.gdb/building", "building", bbox, base_release="2025-01-22.0")
+    print(diff)
+    ```
+
+    Args:
+        output_feature_class: Existing feature class extracted from the base release, with the `id` field.
+        overture_type: Overture feature type of the feature class.
+        bbox: Bounding box the feature class was extracted for. Optional if an area of interest is provided.
+        base_release: Release the feature class was extracted from. If not provided, the release before the client
+            release is used.
+        connect_timeout: Optional timeout in seconds for establishing a connection to the Overture Maps service.
+        request_timeout: Optional timeout in seconds for waiting for a response from the Overture Maps service.
+        client: Optional `OvertureClient` for the release to update to. If not provided, a client for the current
+            release is created.
+        columns: Optional list of columns the feature class was extracted with.
+        where: Optional attribute filter the feature class was extracted with.
+        scan_options: Optional `ScanOptions` controlling read ahead, batch size and threading.
+        aoi: Optional polygon or multipolygon area of interest the feature class was extracted for.
+        fingerprint: Column, or list of columns, compared to detect changed features.
+        flatten: Optional flattened columns the feature class was extracted with.
+        geometry_processing: Optional geometry processing the feature class was extracted with.
+
+    Returns:
+        Features added, deleted and changed between the releases.
+    """
+    # ensure there is a feature class to update
+    if not arcpy.Exists(str(output_feature_class)):
+        raise ValueError(f"Feature class to update does not exist: {output_feature_class}")
+
+    # create a client for the request if one is not provided
+    if client is None:
+        client = OvertureClient(connect_timeout=connect_timeout, request_timeout=request_timeout)
+
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        bbox = aoi.bbox if bbox is None else bbox
+
+    # compare the ids and fingerprints of the releases
+    diff = diff_releases(
+        overture_type,
+        bbox,
+        base_release=base_release,
+        client=client,
+        where=where,
+        aoi=aoi,
+        fingerprint=fingerprint,
+    )
+    logger.info(str(diff))
+
+    if diff.is_empty:
+        return diff
+
+    # remove the deleted and changed features
+    removed_ids = set(diff.removed_ids)
+    if len(removed_ids) > 0:
+        with arcpy.da.UpdateCursor(str(output_feature_class), ["id"]) as cursor:
+            for row in cursor:
+                if row[0] in removed_ids:
+                    cursor.deleteRow()
+
+    # fetch only the added and changed features, and append these to the feature class
+    if len(diff.updated_ids) > 0:
+        update_filter = diff.get_filter()
+        if where is not None:
+            update_filter = update_filter & resolve_where(where)
+
+        batches = get_record_batches(
+            overture_type,
+            bbox,
+            client=client,
+            columns=columns,
+            where=update_filter,
+            scan_options=scan_options,
+            aoi=aoi,
+            flatten=flatten,
+            geometry_processing=geometry_processing,
+        )
+
+        tmp_gdb = get_temp_gdb()
+        tmp_fc = tmp_gdb / f"overture_{overture_type}_updates"
+
+        if _write_batches_to_features(batches, tmp_fc, overture_type, bbox, tmp_gdb):
+            arcpy.management.Append([str(tmp_fc)], str(output_feature_class), schema_type="NO_TEST")
+
+        # cleanup temporary data - remove temporary geodatabase using arcpy to avoid any locks
+        arcpy.management.Delete(str(tmp_gdb))
+
+    return diff
@@ -1,8 +1,26 @@
+from ._aoi import AreaOfInterest
+from ._cache import RowGroupCache
+from ._catalog import ReleaseCatalog, get_catalog, set_base_uri, set_catalog
+from ._checkpoint import CheckpointJournal, retry_with_backoff
+from ._client import OvertureClient
+from ._diff import ReleaseDiff, diff_releases
+from ._estimate import ExtractEstimate, estimate_extract
+from ._flatten import OVERTURE_FLATTEN_SPEC, FlattenField
+from ._geometry import GeometryProcessing
+from ._index import FragmentIndex
 from ._logging import get_logger
+from ._memory import MemoryBudget, iter_table_chunks
+from ._pipeline import BatchPrefetcher
+from ._query import COLUMN_PRESETS, get_column_preset, parse_where
+from ._sample import Sample
+from ._scan import ScanOptions
+from ._tiling import get_tile_size, split_bbox
 from .__main__ import (
     get_all_overture_types,
+    get_arrow_table,
     get_current_release,
     get_temp_gdb,
+    get_record_batch_reader,
     get_record_batches,
     get_release_list,
     get_geometry_column,
@@ -31,15 +49,44 @@ __all__ = [
     "add_primary_name",
     "add_trail_field",
     "add_website_field",
+    "AreaOfInterest",
+    "BatchPrefetcher",
+    "CheckpointJournal",
+    "COLUMN_PRESETS",
+    "diff_releases",
+    "estimate_extract",
+    "ExtractEstimate",
+    "FlattenField",
+    "FragmentIndex",
+    "GeometryProcessing",
     "get_all_overture_types",
+    "get_arrow_table",
+    "get_catalog",
+    "get_column_preset",
     "get_logger",
     "get_current_release",
     "get_geometry_column",
     "get_layers_for_unique_values",
     "get_temp_gdb",
+    "get_tile_size",
+    "get_record_batch_reader",
     "get_record_batches",
     "get_release_list",
     "has_h3",
+    "iter_table_chunks",
+    "MemoryBudget",
+    "OVERTURE_FLATTEN_SPEC",
+    "OvertureClient",
+    "parse_where",
+    "ReleaseCatalog",
+    "ReleaseDiff",
+    "retry_with_backoff",
+    "RowGroupCache",
+    "Sample",
+    "ScanOptions",
+    "set_base_uri",
+    "set_catalog",
+    "split_bbox",
     "table_to_features",
     "table_to_spatially_enabled_dataframe",
     "validate_bounding_box",
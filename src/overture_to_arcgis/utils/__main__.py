@@ -1,10 +1,11 @@
+from collections import deque
 from importlib.util import find_spec
+from itertools import chain
 import json
 from pathlib import Path
 from cachetools import cachedmethod
-from geomet import wkb, esri
 import tempfile
-from typing import Optional, Tuple, Generator, Union
+from typing import Iterator, Optional, Tuple, Generator, Union
 from warnings import warn
 
 from arcgis.geometry import Geometry
@@ -14,7 +15,26 @@ import pyarrow.compute as pc
 import pyarrow.dataset as ds
 import pyarrow.fs as fs
 
+from ._aoi import AOI_BBOX_COLUMN, AreaOfInterest, resolve_aoi
+from ._catalog import get_catalog
+from ._client import OvertureClient
+from ._flatten import FlattenField, flatten_batch, get_flatten_projection, resolve_flatten
+from ._geometry import GeometryProcessing, process_batch_geometry, resolve_geometry_processing
+from ._index import FragmentIndex
+from ._json import encode_json_strings
 from ._logging import get_logger
+from ._pipeline import BatchPrefetcher
+from ._query import get_bbox_filter, resolve_columns, resolve_where
+from ._sample import SAMPLE_ID_COLUMN, Sample, resolve_sample
+from ._scan import ScanOptions
+from ._tiling import (
+    DEFAULT_TILE_PREFETCH_DEPTH,
+    DEFAULT_TILE_WORKERS,
+    assign_row_groups_to_tiles,
+    get_tile_size,
+    validate_tile_size,
+)
+from ._wkb import read_wkb_coordinates
 
 # create a logger for this module
 logger = get_logger(logger_name="overture_to_arcgis.utils.__main__", level="DEBUG", add_stream_handler=False)
@@ -31,6 +51,19 @@ has_pyarrow: bool = find_spec("pyarrow") is not None
 # provide variable indicating if h3 is available
 has_h3: bool = find_spec("h3") is not None
 
+# GeoParquet metadata used if the data does not have any, with the WKB geometry in WGS84 as Overture provides
+DEFAULT_GEO_METADATA: dict = {
+    "version": "1.1.0",
+    "primary_column": "geometry",
+    "columns": {"geometry": {"encoding": "WKB", "geometry_types": []}},
+}
+
+# GeoArrow extension metadata set on the geometry field, with the coordinates in WGS84 longitude, latitude order
+GEOARROW_FIELD_METADATA: dict[bytes, bytes] = {
+    b"ARROW:extension:name": b"geoarrow.wkb",
+    b"ARROW:extension:metadata": json.dumps({"crs": "OGC:CRS84", "crs_type": "authority_code"}).encode("utf-8"),
+}
+
 
 def slugify(value: str) -> str:
     """Convert a string to a slug format."""
@@ -104,32 +137,16 @@ def get_release_list(s3: Optional[fs.S3FileSystem] = None) -> list[str]:
     """
     Returns a list of all available Overture dataset releases.
 
-    Args:
-        s3: Optional pre-configured S3 filesystem. If not provided, an anonymous
-            S3 filesystem will be created.
-    """
-    # create S3 filesystem if not provided
-    if s3 is None:
-        s3 = fs.S3FileSystem(anonymous=True, region="us-west-2")
+    !!! note
 
-    # create fileselector
-    selector = fs.FileSelector(
-        base_dir="overturemaps-us-west-2/release/", recursive=False
-    )
-
-    # get the most current releases from S3 as FileInfo objects
-    file_infos = s3.get_file_info(selector)
-
-    # extract the directory names from the FileInfo objects
-    directories = [
-        info.path for info in file_infos if info.type == fs.FileType.Directory
-    ]
+        Releases are retrieved through the release catalog, so the list is only retrieved from S3 again once the
+        catalog time to live has expired. See `ReleaseCatalog` for details.
 
-    # get the directory names only (last part of the path)
-    releases = [dir_path.split("/")[-1] for dir_path in directories]
-
-    # for each of the releases, ensure the releas has data (can happen if new release is still being loaded)
-    releases = [rel for rel in releases if len(get_themes(rel, s3)) >= 5]
+    Args:
+        s3: Optional pre-configured S3 filesystem. If not provided, the release catalog filesystem, an anonymous
+            S3 filesystem, will be used.
+    """
+    releases = get_catalog().get_release_list(filesystem=s3)
 
     logger.debug(f"Available releases: {releases}")
 
@@ -143,15 +160,8 @@ def get_current_release() -> str:
     Returns:
         Most current release string.
     """
-    # retrieve the list of releases
-    releases = get_release_list()
-
-    # make sure there is at least one release
-    if not releases:
-        raise RuntimeError("No Overture dataset releases found.")
-
-    # get the most current release by sorting the list
-    current_release = sorted(releases)[-1]
+    # get the most current release from the catalog
+    current_release = get_catalog().get_current_release()
 
     logger.debug(f"Current release: {current_release}")
 
@@ -167,32 +177,15 @@ def get_themes(
     Args:
         release: Optional release version. If not provided, the most current
             release will be used.
-        s3: Optional pre-configured S3 filesystem. If not provided, an anonymous
-            S3 filesystem will be created.
+        s3: Optional pre-configured S3 filesystem. If not provided, the release catalog
+            filesystem will be used.
     """
     # if no release provided, get the most current one
     if release is None:
         release = get_current_release()
 
-    # create S3 filesystem if not provided
-    if s3 is None:
-        s3 = fs.S3FileSystem(anonymous=True, region="us-west-2")
-
-    # create fileselector
-    selector = fs.FileSelector(
-        base_dir=f"overturemaps-us-west-2/release/{release}/", recursive=False
-    )
-
-    # get the themes from S3 as FileInfo objects
-    file_infos = s3.get_file_info(selector)
-
-    # extract the directory names from the FileInfo objects
-    directories = [
-        info.path for info in file_infos if info.type == fs.FileType.Directory
-    ]
-
-    # get the directory names only (last part of the path)
-    themes = [dir_path.split("=")[-1] for dir_path in directories]
+    # get the themes from the catalog
+    themes = get_catalog().get_themes(release, filesystem=s3)
 
     logger.debug(f"Available themes for release {release}: {themes}")
 
@@ -205,45 +198,21 @@ def get_type_theme_map(
     """
     Returns the mapping of overture types to themes.
 
+    Args:
+        release: Optional release version. If not provided, the most current
+            release will be used.
+        s3: Optional pre-configured S3 filesystem. If not provided, the release catalog
+            filesystem will be used.
+
     Returns:
         Dictionary mapping overture types to themes.
     """
-    # initialize dictionary
-    type_theme_map = {}
-
     # if no release provided, get the most current one
     if release is None:
         release = get_current_release()
 
-    # create S3 filesystem if not provided
-    if s3 is None:
-        s3 = fs.S3FileSystem(anonymous=True, region="us-west-2")
-
-    # get the themes for the release
-    themes = get_themes(release=release, s3=s3)
-
-    # iterate through the themes and get the types for each
-    for theme in themes:
-        # create fileselector for the theme
-        selector = fs.FileSelector(
-            base_dir=f"overturemaps-us-west-2/release/{release}/theme={theme}/",
-            recursive=False,
-        )
-
-        # get the types from S3 as FileInfo objects
-        file_infos = s3.get_file_info(selector)
-
-        # extract the directory names from the FileInfo objects
-        directories = [
-            info.path for info in file_infos if info.type == fs.FileType.Directory
-        ]
-
-        # get the directory names only (last part of the path)
-        types = [dir_path.split("=")[-1] for dir_path in directories]
-
-        # add the types to the mapping
-        for overture_type in types:
-            type_theme_map[overture_type] = theme
+    # get the mapping from the catalog
+    type_theme_map = get_catalog().get_type_theme_map(release, filesystem=s3)
 
     logger.debug(f"Type theme map: {type_theme_map}")
 
@@ -282,7 +251,8 @@ def get_all_overture_types(
 
 def get_dataset_path(overture_type: str, release: Optional[str] = None) -> str:
     """
-    Returns the S3 path of the Overture dataset to use.
+    Returns the path of the Overture dataset to use on the release catalog filesystem, S3 unless configured
+    otherwise using `set_base_uri`.
 
     Args:
         overture_type: Overture feature type to load.
@@ -290,14 +260,14 @@ def get_dataset_path(overture_type: str, release: Optional[str] = None) -> str:
             release will be used.
 
     Returns:
-        S3 path to the dataset.
+        Path to the dataset.
     """
     # if no release provided, get the most current one
     if release is None:
         release = get_current_release()
 
-    # get the overture type to theme mapping
-    type_theme_map = get_type_theme_map()
+    # get the overture type to theme mapping for the release
+    type_theme_map = get_type_theme_map(release=release)
 
     # get and validate the theme for the overture type
     theme = type_theme_map.get(overture_type)
@@ -305,33 +275,26 @@ def get_dataset_path(overture_type: str, release: Optional[str] = None) -> str:
         raise ValueError(f"Invalid overture type: {overture_type}")
 
     # create and return the dataset path
-    pth = (
-        f"overturemaps-us-west-2/release/{release}/theme={theme}/type={overture_type}/"
-    )
+    pth = get_catalog().path(release, f"theme={theme}", f"type={overture_type}")
 
     return pth
 
 
 def convert_complex_columns_to_strings(table: pa.Table) -> pa.Table:
     """Convert complex data type columns in a PyArrow table to strings."""
-    import json
     # list to hold new column values for converting back
     new_columns = []
 
     # iterate the columns
-    for column in table.columns:
-        # get the field
-        field = table.schema.field(table.column_names[table.columns.index(column)])
-
+    for field, column in zip(table.schema, table.columns):
         # if a struct, list or map (complex data types)
         if (
             pa.types.is_struct(field.type)
             or pa.types.is_list(field.type)
             or pa.types.is_map(field.type)
         ):
-            # convert complex column to JSON string
-            string_array = pa.array([json.dumps(value.as_py()) for value in column])
-            new_columns.append(string_array)
+            # convert complex column to JSON strings, encoding the child arrays in bulk
+            new_columns.append(encode_json_strings(column))
         # if not complex, leave alone
         else:
             new_columns.append(column)
@@ -363,66 +326,144 @@ def get_geometry_column(table: Union[pa.Table, pa.RecordBatch]) -> str:
     return geom_col
 
 
-def convert_wkb_column_to_arcgis_geometry(wkb_series: pd.Series) -> pd.Series:
+def convert_wkb_column_to_arcgis_geometry(
+    wkb_series: Union[pd.Series, pa.Array, pa.ChunkedArray], index: Optional[pd.Index] = None
+) -> pd.Series:
     """
-    Convert a pandas Series of WKB values to ArcGIS Geometry objects.
+    Convert WKB values to ArcGIS Geometry objects.
+
+    The WKB values are decoded together into NumPy coordinate arrays, and the Esri JSON of each geometry is built
+    from these directly, without parsing each value into GeoJSON first. Null values become `None`, as do malformed
+    values, which are reported once with a count rather than for each value.
 
     Args:
-        wkb_series: pandas Series containing WKB values.
+        wkb_series: pandas Series, or PyArrow array, containing WKB values.
+        index: Optional index for the result if a PyArrow array is provided.
 
     Returns:
         pandas Series of ArcGIS Geometry objects.
     """
-    def wkb_to_geometry(wkb_value):
+    # keep the index of a series
+    if isinstance(wkb_series, pd.Series):
+        index = wkb_series.index
+        values = pa.array(wkb_series.to_numpy(dtype=object), pa.binary(), from_pandas=True)
+    else:
+        values = wkb_series
+
+    # decode the WKB values of each chunk at once, so a large combined table is decoded without copying the chunks
+    # into a single array
+    chunks = values.chunks if isinstance(values, pa.ChunkedArray) else [values]
+    geom_list, malformed_count = [], 0
+    for chunk in chunks:
+        geometries = read_wkb_coordinates(chunk)
+        malformed_count += geometries.malformed_count
+
+        # create the geometry objects from the Esri JSON
+        geom_list.extend(
+            Geometry(esri_json) if esri_json is not None else None
+            for esri_json in geometries.iter_esri_json(spatial_reference={"wkid": 4326})
+        )
+
+    if malformed_count > 0:
+        logger.warning(f"Failed to convert {malformed_count:,} malformed WKB values to Geometry.")
+
+    return pd.Series(geom_list, index=index, dtype=object)
+
+
+def encode_low_cardinality_columns(
+    table: pa.Table, categorical_threshold: float, exclude: Optional[list[str]] = None
+) -> pa.Table:
+    """
+    Dictionary encode the string columns of a PyArrow table with few distinct values relative to the number of rows,
+    such as `class` and `subtype`, so these are converted to pandas categoricals rather than Python strings.
+
+    Args:
+        table: PyArrow table.
+        categorical_threshold: Maximum share of distinct values to rows, such as `0.05`, for a string column to be
+            encoded.
+        exclude: Optional names of columns not to encode.
+
+    Returns:
+        PyArrow table with the low cardinality string columns dictionary encoded.
+    """
+    if (
+        isinstance(categorical_threshold, bool)
+        or not isinstance(categorical_threshold, (int, float))
+        or not 0 < categorical_threshold <= 1
+    ):
+        raise ValueError(
+            f"Invalid categorical threshold: {categorical_threshold}. Must be greater than 0 and at most 1."
+        )
 
-        # if null value, return None
-        if pd.isnull(wkb_value):
-            ret_geom = None
+    # nothing to count the distinct values of
+    if table.num_rows == 0:
+        return table
 
-        # otherwise, try to convert
-        try:
-            # convert WKB to geojson using geomet
-            geojson = wkb.loads(wkb_value)
+    exclude = exclude or []
+    for idx, field in enumerate(table.schema):
+        # only consider string columns
+        if field.name in exclude or not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+            continue
 
-            # convert geojson to ArcGIS Geometry
-            ret_geom = Geometry(geojson)
-        
-        # if any issues, log warning and return None
-        except Exception as e:
-            logger.warning(f"Failed to convert WKB to Geometry: {e}")
-            ret_geom = None
+        # encode the column if the share of distinct values is at most the threshold
+        column = table.column(idx)
+        distinct_count = pc.count_distinct(column, mode="all").as_py()
+        if distinct_count / table.num_rows <= categorical_threshold:
+            encoded = pc.dictionary_encode(column)
+            table = table.set_column(idx, pa.field(field.name, encoded.type, metadata=field.metadata), encoded)
 
-        return ret_geom
+    return table
 
-    # use the apply method to convert each WKB value to Geometry
-    geom_series = wkb_series.apply(wkb_to_geometry)
 
-    return geom_series
+def _arrow_types_mapper(arrow_type: pa.DataType) -> Optional[pd.api.extensions.ExtensionDtype]:
+    """Map Arrow types to Arrow backed pandas dtypes, leaving dictionary types to convert to categoricals."""
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
 
 
 def table_to_spatially_enabled_dataframe(
-    table: Union[pa.Table, pa.RecordBatch]
+    table: Union[pa.Table, pa.RecordBatch],
+    arrow_dtypes: bool = False,
+    categorical_threshold: Optional[float] = None,
 ) -> pd.DataFrame:
     """
     Convert a PyArrow Table or RecordBatch with GeoArrow metadata to an ArcGIS Spatially Enabled DataFrame.
 
     Args:
         table: PyArrow Table or RecordBatch with GeoArrow metadata.
+        arrow_dtypes: Whether to use Arrow backed `pd.ArrowDtype` columns rather than NumPy and Python object
+            columns, so strings are kept in Arrow memory rather than as Python strings. Requires pandas 2.0 or
+            later.
+        categorical_threshold: Optional maximum share of distinct values to rows, such as `0.05`, for string
+            columns to be converted to categoricals, greatly reducing the memory used by low cardinality columns
+            such as `class`, `subtype` and `subclass`.
 
     Returns:
         ArcGIS Spatially Enabled DataFrame.
     """
+    if arrow_dtypes and not hasattr(pd, "ArrowDtype"):
+        raise ValueError("Arrow backed dtypes require pandas 2.0 or later.")
+
     # clean up any complex columns
     smpl_table = convert_complex_columns_to_strings(table)
 
-    # convert table to a pandas DataFrame
-    df = smpl_table.to_pandas()
-
     # get the geometry column from the metadata using the helper function
     geom_col = get_geometry_column(table)
 
-    # convert the geometry column from WKB to arcgis Geometry objects
-    df[geom_col] = convert_wkb_column_to_arcgis_geometry(df[geom_col])
+    # dictionary encode the low cardinality string columns, so these are converted to categoricals
+    if categorical_threshold is not None:
+        smpl_table = encode_low_cardinality_columns(smpl_table, categorical_threshold, exclude=[geom_col])
+
+    # convert table to a pandas DataFrame, without converting the geometry column
+    column_names = smpl_table.schema.names
+    df = smpl_table.select([name for name in column_names if name != geom_col]).to_pandas(
+        types_mapper=_arrow_types_mapper if arrow_dtypes else None
+    )
+
+    # convert the geometry column from WKB to arcgis Geometry objects directly from the Arrow data
+    geom_series = convert_wkb_column_to_arcgis_geometry(smpl_table.column(geom_col), index=df.index)
+    df.insert(column_names.index(geom_col), geom_col, geom_series)
 
     # set the geometry column using the ArcGIS GeoAccessor to get a Spatially Enabled DataFrame
     df.spatial.set_geometry(geom_col, sr=4326, inplace=True)
@@ -451,11 +492,280 @@ def table_to_features(
     return output_features
 
 
+def _get_empty_record_batch(
+    schema: pa.Schema, columns: Optional[dict[str, pc.Expression]]
+) -> pa.RecordBatch:
+    """
+    Get an empty record batch with the schema a scan with a column projection returns, used if no data is found.
+
+    Args:
+        schema: Schema of the dataset.
+        columns: Resolved column projection, or `None` for all columns.
+
+    Returns:
+        Empty record batch.
+    """
+    projected = ds.dataset(schema.empty_table()).to_table(columns=columns).schema
+    return pa.RecordBatch.from_pylist([], schema=projected.with_metadata(schema.metadata))
+
+
+def _set_geoarrow_metadata(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """
+    Set the GeoArrow extension metadata on the geometry field of a record batch, and the GeoParquet metadata on the
+    schema if missing, so Arrow consumers recognize the WKB geometry column. No data is copied.
+
+    Args:
+        batch: Record batch with a WKB geometry column.
+
+    Returns:
+        Record batch with the geoarrow metadata set.
+    """
+    # add the geoparquet metadata if missing
+    metadata = dict(batch.schema.metadata or {})
+    if b"geo" not in metadata:
+        metadata[b"geo"] = json.dumps(DEFAULT_GEO_METADATA).encode("utf-8")
+    schema = batch.schema.with_metadata(metadata)
+
+    # set the extension metadata on the geometry field
+    geom_col = json.loads(metadata[b"geo"].decode("utf-8")).get("primary_column", "geometry")
+    geo_fld_idx = schema.get_field_index(geom_col)
+    if geo_fld_idx >= 0:
+        geo_fld = schema.field(geo_fld_idx)
+        schema = schema.set(geo_fld_idx, geo_fld.with_metadata({**(geo_fld.metadata or {}), **GEOARROW_FIELD_METADATA}))
+
+    return pa.RecordBatch.from_arrays(batch.columns, schema=schema)
+
+
+def _scan_record_batches(
+    client: OvertureClient,
+    overture_type: str,
+    bbox: Tuple[float, float, float, float],
+    dataset_filter: pc.Expression,
+    columns: Optional[dict[str, pc.Expression]],
+    scan_options: ScanOptions,
+    use_index: bool,
+    files: Optional[list[str]] = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Scan the record batches for an overture type using an already resolved filter and column projection.
+
+    Args:
+        client: Client to read with.
+        overture_type: Overture feature type to load.
+        bbox: Bounding box used to select the row groups from the fragment index.
+        dataset_filter: Filter expression applied while scanning.
+        columns: Resolved column projection, or `None` for all columns.
+        scan_options: Scan options to read with.
+        use_index: Whether to use the fragment index.
+        files: Optional names of the files to limit the scan to, always using the fragment index.
+
+    Returns:
+        Iterator of record batches.
+    """
+    # if using a row group cache, read the intersecting row groups from the index through the cache
+    if client.row_group_cache is not None:
+        index = client.get_fragment_index(overture_type)
+        return client.row_group_cache.iter_batches(
+            client.filesystem,
+            index.dataset_path,
+            index.query(bbox, files=files),
+            root=client.catalog.root,
+            release=client.release,
+            columns=columns,
+            filter=dataset_filter,
+            max_workers=scan_options.fragment_readahead,
+            schema=index.schema,
+        )
+
+    # get the PyArrow dataset, limited to the intersecting fragments if using the index
+    if use_index or files is not None:
+        dataset = client.get_indexed_dataset(overture_type, bbox, files=files)
+    else:
+        dataset = client.get_dataset(overture_type)
+
+    # get the record batches with the extent filter applied
+    return dataset.to_batches(columns=columns, filter=dataset_filter, **scan_options.to_scanner_kwargs())
+
+
+def _scan_row_groups(
+    client: OvertureClient,
+    index: FragmentIndex,
+    row_groups: pa.Table,
+    dataset_filter: pc.Expression,
+    columns: Optional[dict[str, pc.Expression]],
+    scan_options: ScanOptions,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Scan a selection of row groups from the fragment index, through the row group cache if the client has one.
+
+    Args:
+        client: Client to read with.
+        index: Fragment index the row groups are from.
+        row_groups: Fragment index rows of the row groups to read.
+        dataset_filter: Filter expression applied while scanning.
+        columns: Resolved column projection, or `None` for all columns.
+        scan_options: Scan options to read with.
+
+    Returns:
+        Iterator of record batches.
+    """
+    if client.row_group_cache is not None:
+        return client.row_group_cache.iter_batches(
+            client.filesystem,
+            index.dataset_path,
+            row_groups,
+            root=client.catalog.root,
+            release=client.release,
+            columns=columns,
+            filter=dataset_filter,
+            max_workers=scan_options.fragment_readahead,
+            schema=index.schema,
+        )
+
+    dataset = index.get_row_group_dataset(client.filesystem, row_groups)
+    return dataset.to_batches(columns=columns, filter=dataset_filter, **scan_options.to_scanner_kwargs())
+
+
+def _scan_tiled_record_batches(
+    client: OvertureClient,
+    overture_type: str,
+    bbox: Tuple[float, float, float, float],
+    dataset_filter: pc.Expression,
+    columns: Optional[dict[str, pc.Expression]],
+    scan_options: ScanOptions,
+    use_index: bool,
+    tile_size: Union[float, str],
+    tile_workers: int,
+    files: Optional[list[str]] = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Split the bounding box into tiles and scan the tiles concurrently, streaming the record batches of each tile
+    in order.
+
+    Each row group intersecting the bounding box is assigned to exactly one tile, so row groups spanning several
+    tiles are only read and decoded once, and every tile applies the filter for the whole bounding box, so no
+    feature is returned twice. Each tile reads ahead through a bounded queue, so at most `tile_workers` tiles are
+    scanned at once, each holding only a few batches, rather than whole tiles, in memory.
+
+    Args:
+        client: Client to read with.
+        overture_type: Overture feature type to load.
+        bbox: Bounding box to split into tiles.
+        dataset_filter: Filter expression for the whole bounding box, applied while scanning each tile.
+        columns: Resolved column projection, or `None` for all columns.
+        scan_options: Scan options to read each tile with.
+        use_index: Whether to use the fragment index.
+        tile_size: Tile size in decimal degrees, or `auto` to pick the tile size from the estimated feature density.
+        tile_workers: Number of tiles scanned concurrently.
+        files: Optional names of the files to limit the scan to.
+
+    Yields:
+        Record batches for the bounding box.
+    """
+    index = client.get_fragment_index(overture_type)
+
+    # pick the tile size from the feature density if requested
+    if tile_size == "auto":
+        tile_size = get_tile_size(index, bbox)
+
+    # assign each intersecting row group to a single tile
+    tiles = []
+    if tile_size is not None:
+        tiles = assign_row_groups_to_tiles(index.query(bbox, files=files), bbox, tile_size)
+
+    # if only a single tile has data, just scan the bounding box
+    if len(tiles) <= 1:
+        yield from _scan_record_batches(
+            client, overture_type, bbox, dataset_filter, columns, scan_options, use_index, files
+        )
+        return
+
+    logger.debug(f"Scanning '{overture_type}' in {len(tiles)} tiles using {tile_workers} workers.")
+
+    # scan up to the tile workers at once, each through a bounded queue, yielding the tiles in order and starting
+    # the next tile as each is finished
+    pending = deque(tiles)
+    scanning = deque()
+
+    def start_next() -> None:
+        row_groups = pending.popleft()
+        batches = _scan_row_groups(client, index, row_groups, dataset_filter, columns, scan_options)
+        scanning.append(BatchPrefetcher(batches, max_queue=DEFAULT_TILE_PREFETCH_DEPTH).start())
+
+    try:
+        for _ in range(min(tile_workers, len(tiles))):
+            start_next()
+
+        while scanning:
+            yield from scanning[0]
+            scanning.popleft()
+            if pending:
+                start_next()
+
+    # stop the tiles still scanning if the consumer stops early or fails
+    finally:
+        for prefetcher in scanning:
+            prefetcher.close()
+
+
+def _scan_sampled_record_batches(
+    client: OvertureClient,
+    overture_type: str,
+    bbox: Tuple[float, float, float, float],
+    dataset_filter: pc.Expression,
+    columns: Optional[dict[str, pc.Expression]],
+    scan_options: ScanOptions,
+    sample: Sample,
+    files: Optional[list[str]] = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Scan only the row groups chosen for a sample, and sample the rows of these if they hold more than needed.
+
+    Args:
+        client: Client to read with.
+        overture_type: Overture feature type to load.
+        bbox: Bounding box of the area sampled.
+        dataset_filter: Filter expression applied while scanning.
+        columns: Resolved column projection, or `None` for all columns.
+        scan_options: Scan options to read with.
+        sample: Sample to take.
+        files: Optional names of the files to limit the sample to.
+
+    Yields:
+        Record batches with the sampled features.
+    """
+    index = client.get_fragment_index(overture_type)
+    row_groups, row_fraction = sample.select_row_groups(index, bbox, files=files)
+
+    # add the helper column with the ids the rows are sampled by
+    if columns is None:
+        columns = {name: pc.field(name) for name in index.schema.names}
+    projection = {**columns, SAMPLE_ID_COLUMN: pc.field("id")}
+
+    # read the chosen row groups, through the row group cache if the client has one
+    batches = _scan_row_groups(client, index, row_groups, dataset_filter, projection, scan_options)
+
+    for batch in batches:
+        yield sample.filter_batch(batch, row_fraction)
+
+
 def get_record_batches(
     overture_type: str,
     bbox: Optional[Tuple[float, float, float, float]] = None,
     connect_timeout: Optional[float] = None,
     request_timeout: Optional[float] = None,
+    client: Optional[OvertureClient] = None,
+    columns: Optional[Union[str, list[str]]] = None,
+    where: Optional[Union[str, pc.Expression]] = None,
+    scan_options: Optional[ScanOptions] = None,
+    use_index: bool = True,
+    tile_size: Optional[Union[float, str]] = None,
+    tile_workers: int = DEFAULT_TILE_WORKERS,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    files: Optional[list[str]] = None,
+    sample: Optional[Union[float, Sample]] = None,
+    flatten: Optional[Union[bool, dict[str, Union[str, FlattenField]]]] = None,
+    geometry_processing: Optional[Union[GeometryProcessing, dict]] = None,
 ) -> Generator[pa.RecordBatch, None, None]:
     """
     Return a pyarrow RecordBatchReader for the desired bounding box and S3 path.
@@ -463,79 +773,249 @@ def get_record_batches(
     Args:
         overture_type: Overture feature type to load.
         bbox: Optional bounding box for data fetch (xmin, ymin, xmax, ymax).
-        connect_timeout: Optional connection timeout in seconds.
-        request_timeout: Optional request timeout in seconds.
+        connect_timeout: Optional connection timeout in seconds. Ignored if a client is provided.
+        request_timeout: Optional request timeout in seconds. Ignored if a client is provided.
+        client: Optional `OvertureClient` to reuse the filesystem, release and datasets from. If not provided, a
+            client is created for the request.
+        columns: Optional list of columns to retrieve, so only these are read. Nested struct fields can be
+            selected using dotted paths, e.g. `names.primary`, and are returned named with underscores, e.g.
+            `names_primary`. A column preset name, such as `lite`, can also be provided. The geometry column is
+            always included. If not provided, all columns are retrieved.
+        where: Optional attribute filter combined with the bounding box filter, either a PyArrow compute
+            expression or a SQL-like string such as `"class in ('motorway', 'primary') and confidence > 0.7"`.
+            Since the filter is applied while scanning, row group statistics prune data and discarded rows are
+            never converted.
+        scan_options: Optional `ScanOptions` controlling read ahead, batch size and threading. If not provided,
+            the client scan options are used.
+        use_index: Whether to use the fragment index, so only files and row groups intersecting the bounding box
+            are read. The index is built the first time a type is requested for a release, and cached on disk.
+            The index is always used if the client has a row group cache.
+        tile_size: Optional tile size in decimal degrees to split the bounding box into, so the tiles are scanned
+            concurrently. If `auto`, the tile size is picked from the feature density estimated using the fragment
+            index. Features intersecting more than one tile are only returned once, so the result matches scanning
+            the bounding box directly, although the order of the features differs.
+        tile_workers: Number of tiles scanned concurrently when tiling.
+        aoi: Optional polygon or multipolygon area of interest in WGS84, as an `AreaOfInterest`, WKB, WKT, a
+            GeoJSON dictionary or a geometry with a `WKB` property. Only features intersecting the area are
+            returned, tested first using the feature bounding boxes, then exactly using the geometry. If no
+            bounding box is provided, the extent of the area is used.
+        files: Optional names of the files, relative to the dataset directory as listed in the fragment index, to
+            limit the scan to, so an extract can be split into pieces by file. The fragment index is always used
+            if provided.
+        sample: Optional share of the features to return, such as `0.01`, or a `Sample` to set the seed or
+            stratify the sample using a grid. Only the row groups chosen for the sample are read, so a preview of a
+            large area is fast. The same sample is returned for the same seed and release. Cannot be combined with
+            tiling.
+        flatten: Optional values to pull out of nested columns into their own columns, as a dictionary of output
+            column names and paths or `FlattenField` instances, e.g. `{"primary_name": "names.primary",
+            "website": "websites[0]"}`, or `True` for `OVERTURE_FLATTEN_SPEC`. Only the nested fields needed are
+            read, and the values are extracted using Arrow compute, so no JSON needs to be parsed afterwards.
+            Paths into nested columns the type does not have are skipped.
+        geometry_processing: Optional `GeometryProcessing`, or a dictionary with the `precision` and `tolerance`,
+            to snap the coordinates to a grid and simplify the linestrings and polygons, processing the WKB
+            coordinates of each batch at once. The vertex counts before and after are logged once all the batches
+            are read.
 
     Yields:
         pa.RecordBatch: Record batches with the requested data.
     """
-    # create connection to the S3 filesystem
-    s3 = fs.S3FileSystem(
-        anonymous=True,
-        region="us-west-2",
-        connect_timeout=connect_timeout,
-        request_timeout=request_timeout,
-    )
-
-    # get the overture type to theme mapping
-    type_theme_map = get_type_theme_map(s3=s3)
+    # if no client provided, create one for this request
+    if client is None:
+        client = OvertureClient(
+            connect_timeout=connect_timeout, request_timeout=request_timeout
+        )
 
     # validate the overture type
-    available_types = type_theme_map.keys()
-    if overture_type not in available_types:
-        raise ValueError(
-            f"Invalid overture type: {overture_type}. Available types are: {list(available_types)}"
-        )
+    client.validate_overture_type(overture_type)
 
-    # validate the bounding box coordinates
-    bbox = validate_bounding_box(bbox)
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        if bbox is None:
+            bbox = aoi.bbox
 
-    # extract the coordinates from the bounding box and create the filter
-    xmin, ymin, xmax, ymax = bbox
-    dataset_filter = (
-        (pc.field("bbox", "xmin") < xmax)
-        & (pc.field("bbox", "xmax") > xmin)
-        & (pc.field("bbox", "ymin") < ymax)
-        & (pc.field("bbox", "ymax") > ymin)
+    # validate the bounding box coordinates and tile size
+    bbox = validate_bounding_box(bbox)
+    tile_size = validate_tile_size(tile_size)
+    if not isinstance(tile_workers, int) or tile_workers < 1:
+        raise ValueError(f"Invalid tile workers: {tile_workers}. Must be a positive integer.")
+
+    # resolve the geometry processing
+    if geometry_processing is not None:
+        geometry_processing = resolve_geometry_processing(geometry_processing)
+
+    # resolve the sample, which reads few row groups so is never tiled
+    if sample is not None:
+        sample = resolve_sample(sample)
+        if tile_size is not None:
+            raise ValueError("A sample cannot be combined with tiling. Remove the tile size.")
+
+    # create the extent filter
+    dataset_filter = get_bbox_filter(bbox)
+
+    # combine any attribute filter with the extent filter
+    if where is not None:
+        dataset_filter = dataset_filter & resolve_where(where)
+
+    # use the client scan options unless provided, and size the I/O thread pool only if the options set it
+    if scan_options is None:
+        scan_options = client.scan_options
+    scan_options.apply_io_thread_count()
+
+    # resolve the column projection so only the requested column chunks are read, using the schema saved with the
+    # index if available, so the dataset does not need to be discovered
+    uses_index = (
+        use_index
+        or client.row_group_cache is not None
+        or tile_size is not None
+        or files is not None
+        or sample is not None
     )
+    schema = None
+    if columns is not None or aoi is not None or flatten is not None:
+        if uses_index:
+            schema = client.get_fragment_index(overture_type).schema
+        else:
+            schema = client.get_schema(overture_type)
 
-    # get the most current release version
-    release = get_current_release()
-
-    # create the dataset path
-    s3_pth = get_dataset_path(overture_type, release)
-
-    # create the PyArrow dataset
-    dataset = ds.dataset(s3_pth, filesystem=s3)
+        if columns is not None:
+            columns = resolve_columns(columns, schema, overture_type)
+        else:
+            columns = {name: pc.field(name) for name in schema.names}
+
+        # add the feature bounding boxes for the area of interest pre-test
+        if aoi is not None:
+            columns[AOI_BBOX_COLUMN] = pc.field("bbox")
+
+        # add the nested fields needed for the flattened columns
+        if flatten is not None:
+            flatten = resolve_flatten(flatten, schema)
+            columns.update(get_flatten_projection(flatten))
+
+    # get the record batches, reading only the row groups chosen if sampling, or scanning tiles concurrently if
+    # tiling
+    if sample is not None:
+        batches = _scan_sampled_record_batches(
+            client, overture_type, bbox, dataset_filter, columns, scan_options, sample, files
+        )
+    elif tile_size is not None:
+        batches = _scan_tiled_record_batches(
+            client,
+            overture_type,
+            bbox,
+            dataset_filter,
+            columns,
+            scan_options,
+            use_index,
+            tile_size,
+            tile_workers,
+            files,
+        )
+    else:
+        batches = _scan_record_batches(
+            client, overture_type, bbox, dataset_filter, columns, scan_options, use_index, files
+        )
 
-    # get the record batches with the extent filter applied
-    batches = dataset.to_batches(filter=dataset_filter)
+    # if no data is found, use an empty batch with the projected schema, so the schema is always known
+    batches = iter(batches)
+    first_batch = next(batches, None)
+    if first_batch is None:
+        if schema is None:
+            schema = (
+                client.get_fragment_index(overture_type).schema
+                if uses_index
+                else client.get_schema(overture_type)
+            )
+        first_batch = _get_empty_record_batch(schema, columns)
 
     # iterate through the batches and yield with geoarrow metadata
-    for idx, batch in enumerate(batches):
+    vertex_counts = [0, 0]
+    for idx, batch in enumerate(chain([first_batch], batches)):
+        # remove the features not intersecting the area of interest before these are converted
+        if aoi is not None:
+            batch = aoi.filter_batch(batch)
+
+        # add the flattened columns
+        if flatten:
+            batch = flatten_batch(batch, flatten)
+
+        # snap and simplify the geometry once the features outside the area of interest are removed
+        if geometry_processing is not None:
+            batch, before_count, after_count = process_batch_geometry(batch, geometry_processing)
+            vertex_counts[0] += before_count
+            vertex_counts[1] += after_count
+
         # if this is the first batch, and it's empty, warn of no data found
         if idx == 0 and batch.num_rows == 0:
             warn(
                 f"No '{overture_type}' data found for the specified bounding box: {bbox}"
             )
 
-        # get the geometry field
-        geo_fld_idx = batch.schema.get_field_index("geometry")
-        geo_fld = batch.schema.field(geo_fld_idx)
+        # yield the batch to the caller with the geoarrow metadata set on the geometry field
+        yield _set_geoarrow_metadata(batch)
 
-        # set the geoarrow metadata on the geometry field
-        geoarrow_geo_fld = geo_fld.with_metadata(
-            {b"ARROW:extension:name": b"geoarrow.wkb"}
+    # report the vertices removed by the geometry processing
+    if geometry_processing is not None:
+        before_count, after_count = vertex_counts
+        reduction = 1 - after_count / before_count if before_count > 0 else 0
+        logger.info(
+            f"Geometry processing reduced '{overture_type}' from {before_count:,} to {after_count:,} vertices "
+            f"({reduction:.1%} fewer)."
         )
 
-        # create an updated schema with the correct metadata for the geometry field
-        geoarrow_schema = batch.schema.set(geo_fld_idx, geoarrow_geo_fld)
 
-        # replace the batch schema with the updated geoarrow schema
-        batch = batch.replace_schema_metadata(geoarrow_schema.metadata)
+def get_record_batch_reader(
+    overture_type: str,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    **kwargs,
+) -> pa.RecordBatchReader:
+    """
+    Get a streaming record batch reader for an overture type, with the geometry kept as WKB and nested columns kept
+    as Arrow structs and lists, so no pandas or ArcGIS conversion is done.
 
-        # yield the batch to the caller
-        yield batch
+    The geometry field carries the GeoArrow `geoarrow.wkb` extension metadata, and the schema the GeoParquet `geo`
+    metadata, so the reader can be consumed directly, without copying, through the Arrow C stream interface, e.g.
+    by `duckdb.from_arrow(reader)` or `polars.from_arrow(reader)`. The schema is known even if no data is found.
+
+    Args:
+        overture_type: Overture feature type to load.
+        bbox: Optional bounding box for data fetch (xmin, ymin, xmax, ymax).
+        **kwargs: Keyword arguments passed to `get_record_batches`, such as `client`, `columns`, `where`, `aoi`,
+            `tile_size`, `sample`, `flatten` or `geometry_processing`.
+
+    Returns:
+        pa.RecordBatchReader: Reader streaming the record batches with the requested data.
+    """
+    # get the first batch, which is always yielded even if empty, so the schema is known before streaming
+    batches = get_record_batches(overture_type, bbox, **kwargs)
+    first_batch = next(batches)
+
+    return pa.RecordBatchReader.from_batches(first_batch.schema, chain([first_batch], batches))
+
+
+def get_arrow_table(
+    overture_type: str,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    **kwargs,
+) -> pa.Table:
+    """
+    Get a PyArrow table for an overture type, with the geometry kept as WKB and nested columns kept as Arrow structs
+    and lists, so no pandas or ArcGIS conversion is done.
+
+    The geometry field carries the GeoArrow `geoarrow.wkb` extension metadata, and the schema the GeoParquet `geo`
+    metadata, so the table can be passed directly, without copying, to libraries such as DuckDB or Polars. Use
+    `get_record_batch_reader` to stream larger areas instead of holding all the data in memory.
+
+    Args:
+        overture_type: Overture feature type to load.
+        bbox: Optional bounding box for data fetch (xmin, ymin, xmax, ymax).
+        **kwargs: Keyword arguments passed to `get_record_batches`, such as `client`, `columns`, `where`, `aoi`,
+            `tile_size`, `sample`, `flatten` or `geometry_processing`.
+
+    Returns:
+        pa.Table: Table with the requested data.
+    """
+    return get_record_batch_reader(overture_type, bbox, **kwargs).read_all()
 
 
 def get_category_in_taxonomy(taxonomy_df: pd.DataFrame, category_code: str, taxonomy_index: int) -> str:
@@ -0,0 +1,460 @@
+from hashlib import sha256
+import re
+from typing import Any, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._logging import get_logger
+from ._wkb import (
+    PART_POINT,
+    PART_RING,
+    WKB_MULTIPOLYGON,
+    WKB_POLYGON,
+    WkbCoordinates,
+    _get_ranges,
+    read_wkb_coordinates,
+)
+
+__all__ = ["AreaOfInterest", "resolve_aoi"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# name of the helper column added to the projection with the feature bounding boxes for the pre-test
+AOI_BBOX_COLUMN: str = "__aoi_bbox"
+
+# innermost parenthesized coordinate list of a WKT geometry, which is a polygon ring
+_WKT_RING_PATTERN = re.compile(r"\(([^()]*)\)")
+
+# maximum number of point and edge pairs compared at once, limiting the memory used by the vectorized tests
+MAX_PAIRS_PER_CHUNK: int = 1_000_000
+
+
+def _ring_edges(rings: list[np.ndarray]) -> np.ndarray:
+    """Get the edges of rings as an array of (x1, y1, x2, y2) rows."""
+    edges = [np.hstack([ring[:-1], ring[1:]]) for ring in rings if len(ring) > 1]
+    return np.concatenate(edges) if edges else np.empty((0, 4), dtype=np.float64)
+
+
+def _segments_intersect(segments: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Whether each segment intersects or touches any edge, with both as arrays of (x1, y1, x2, y2) rows."""
+    result = np.zeros(len(segments), dtype=bool)
+    if len(edges) == 0:
+        return result
+
+    chunk_size = max(1, MAX_PAIRS_PER_CHUNK // len(edges))
+    for start in range(0, len(segments), chunk_size):
+        seg = segments[start:start + chunk_size, None, :]
+        ax1, ay1, ax2, ay2 = seg[..., 0], seg[..., 1], seg[..., 2], seg[..., 3]
+        bx1, by1, bx2, by2 = edges[None, :, 0], edges[None, :, 1], edges[None, :, 2], edges[None, :, 3]
+
+        # orientation of each end point relative to the other segment
+        o1 = np.sign((ax2 - ax1) * (by1 - ay1) - (ay2 - ay1) * (bx1 - ax1))
+        o2 = np.sign((ax2 - ax1) * (by2 - ay1) - (ay2 - ay1) * (bx2 - ax1))
+        o3 = np.sign((bx2 - bx1) * (ay1 - by1) - (by2 - by1) * (ax1 - bx1))
+        o4 = np.sign((bx2 - bx1) * (ay2 - by1) - (by2 - by1) * (ax2 - bx1))
+
+        # the extents must also overlap, which handles collinear segments
+        overlap = (
+            (np.minimum(ax1, ax2) <= np.maximum(bx1, bx2))
+            & (np.minimum(bx1, bx2) <= np.maximum(ax1, ax2))
+            & (np.minimum(ay1, ay2) <= np.maximum(by1, by2))
+            & (np.minimum(by1, by2) <= np.maximum(ay1, ay2))
+        )
+
+        result[start:start + chunk_size] = ((o1 * o2 <= 0) & (o3 * o4 <= 0) & overlap).any(axis=1)
+
+    return result
+
+
+def _get_part_segments(geometries: WkbCoordinates, parts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the segments of parts of decoded WKB geometries, and the part each segment is from.
+
+    Args:
+        geometries: Decoded WKB geometries.
+        parts: Indices of the linestring and ring parts to get the segments of.
+
+    Returns:
+        Tuple of the segments as an array of (x1, y1, x2, y2) rows, and the part index of each segment.
+    """
+    starts = geometries.part_offsets[parts]
+    counts = np.maximum(geometries.part_offsets[parts + 1] - starts - 1, 0)
+    vertices = _get_ranges(starts, counts)
+    segments = np.hstack([geometries.coords[vertices], geometries.coords[vertices + 1]])
+    return segments, np.repeat(parts, counts)
+
+
+def _points_in_rings(x: np.ndarray, y: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Even-odd test of whether points are inside or on the boundary of the rings the edges make up."""
+    result = np.zeros(len(x), dtype=bool)
+    if len(edges) == 0:
+        return result
+
+    x1, y1, x2, y2 = (edges[None, :, idx] for idx in range(4))
+    chunk_size = max(1, MAX_PAIRS_PER_CHUNK // len(edges))
+
+    for start in range(0, len(x), chunk_size):
+        px = x[start:start + chunk_size, None]
+        py = y[start:start + chunk_size, None]
+
+        # count the edges crossed by a ray cast from each point in the positive x direction
+        straddle = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.count_nonzero(straddle & (px < x_cross), axis=1)
+
+        # points on an edge are also included
+        on_edge = (
+            ((x2 - x1) * (py - y1) - (y2 - y1) * (px - x1) == 0)
+            & (px >= np.minimum(x1, x2))
+            & (px <= np.maximum(x1, x2))
+            & (py >= np.minimum(y1, y2))
+            & (py <= np.maximum(y1, y2))
+        )
+
+        result[start:start + chunk_size] = (crossings % 2 == 1) | on_edge.any(axis=1)
+
+    return result
+
+
+class AreaOfInterest:
+    """
+    Polygon or multipolygon area of interest in WGS84 used to filter features exactly, so only features
+    intersecting the area, not just the envelope of the area, are converted and written.
+
+    Features are first tested using their bounding boxes against the envelopes of the rings of the area, which is
+    fully vectorized and avoids decoding the geometry of most features outside the area. The remaining features
+    are tested exactly using the coordinates decoded from the WKB geometry. A feature intersects the area if any
+    of its vertices is inside or on the boundary of the area, any of its segments crosses the boundary, or, for
+    polygons, the area is inside the feature.
+
+    ``` python
+    from overture_to_arcgis.utils import AreaOfInterest
+
+    aoi = AreaOfInterest.from_wkt("POLYGON ((-123 47, -122.8 47.2, -122.9 47.3, -123 47))")
+    ```
+
+    Args:
+        rings: List of polygon rings, both exterior rings and holes, each as an array of x and y coordinates with
+            shape (vertices, 2). The first and last coordinates of each ring must be the same.
+    """
+
+    def __init__(self, rings: list[np.ndarray]):
+        rings = [np.asarray(ring, dtype=np.float64)[:, :2] for ring in rings]
+        if len(rings) == 0:
+            raise ValueError("Invalid area of interest: no polygon rings provided.")
+        for ring in rings:
+            if len(ring) < 4 or not np.array_equal(ring[0], ring[-1]):
+                raise ValueError(
+                    "Invalid area of interest: each polygon ring must have at least four coordinates, with the "
+                    "first and last the same."
+                )
+
+        self.rings = rings
+        self.edges = _ring_edges(rings)
+
+        # envelope of each ring used for the bounding box pre-test
+        self.ring_bboxes = np.array(
+            [[ring[:, 0].min(), ring[:, 1].min(), ring[:, 0].max(), ring[:, 1].max()] for ring in rings]
+        )
+
+        # a vertex of each ring, used to test if the area is inside a polygon feature
+        self.ring_vertices = np.array([ring[0] for ring in rings])
+
+        # split the edges into horizontal bands, so each point is only tested against the edges near it
+        self._band_count = int(np.clip(len(self.edges) // 16, 1, 1024))
+        ymin, ymax = self.ring_bboxes[:, 1].min(), self.ring_bboxes[:, 3].max()
+        self._band_ymin = ymin
+        self._band_height = (ymax - ymin) / self._band_count or 1.0
+        edge_ymin = np.minimum(self.edges[:, 1], self.edges[:, 3])
+        edge_ymax = np.maximum(self.edges[:, 1], self.edges[:, 3])
+        self._band_edges = []
+        for band in range(self._band_count):
+            # pad the bands slightly so rounding never leaves out an edge for a point on a band boundary
+            band_ymin = ymin + (band - 1e-6) * self._band_height
+            band_ymax = ymin + (band + 1 + 1e-6) * self._band_height
+            self._band_edges.append(self.edges[(edge_ymin <= band_ymax) & (edge_ymax >= band_ymin)])
+
+    def __repr__(self) -> str:
+        return f"AreaOfInterest(rings={len(self.rings)}, vertices={sum(len(ring) for ring in self.rings)})"
+
+    @classmethod
+    def from_geojson(cls, geometry: dict[str, Any]) -> "AreaOfInterest":
+        """
+        Create an area of interest from a GeoJSON Polygon or MultiPolygon geometry, or a Feature with one.
+
+        Args:
+            geometry: GeoJSON geometry dictionary.
+
+        Returns:
+            Area of interest.
+        """
+        if geometry.get("type") == "Feature":
+            geometry = geometry.get("geometry") or {}
+
+        geometry_type = geometry.get("type")
+        if geometry_type == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry_type == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            raise ValueError(
+                f"Invalid area of interest geometry type: {geometry_type}. Must be Polygon or MultiPolygon."
+            )
+
+        return cls([np.array(ring, dtype=np.float64) for polygon in polygons for ring in polygon])
+
+    @classmethod
+    def from_wkb(cls, value: bytes) -> "AreaOfInterest":
+        """
+        Create an area of interest from a WKB Polygon or MultiPolygon.
+
+        Args:
+            value: WKB geometry.
+
+        Returns:
+            Area of interest.
+        """
+        geometries = read_wkb_coordinates([bytes(value)])
+        geometry_type = int(geometries.geometry_types[0])
+        if not geometries.valid[0] or geometry_type not in (WKB_POLYGON, WKB_MULTIPOLYGON):
+            raise ValueError("Invalid area of interest WKB. Must be a Polygon or MultiPolygon.")
+
+        return cls(
+            [
+                geometries.coords[start:end]
+                for start, end in zip(geometries.part_offsets[:-1], geometries.part_offsets[1:])
+            ]
+        )
+
+    @classmethod
+    def from_wkt(cls, value: str) -> "AreaOfInterest":
+        """
+        Create an area of interest from a WKT Polygon or MultiPolygon.
+
+        Args:
+            value: WKT geometry.
+
+        Returns:
+            Area of interest.
+        """
+        geometry_type = value.strip().split("(", 1)[0].split()
+        if not geometry_type or geometry_type[0].upper() not in ("POLYGON", "MULTIPOLYGON"):
+            raise ValueError("Invalid area of interest WKT. Must be a Polygon or MultiPolygon.")
+
+        # every innermost coordinate list of a polygon or multipolygon is a ring
+        try:
+            rings = [
+                np.array([vertex.split()[:2] for vertex in ring.split(",")], dtype=np.float64)
+                for ring in _WKT_RING_PATTERN.findall(value)
+            ]
+        except ValueError:
+            raise ValueError("Invalid area of interest WKT. Unable to read the coordinates.")
+
+        return cls(rings)
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the coordinates of the area, identifying the area, such as for resuming an extract."""
+        return sha256(b"".join(ring.tobytes() for ring in self.rings)).hexdigest()
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        """Bounding box (xmin, ymin, xmax, ymax) of the area."""
+        return (
+            float(self.ring_bboxes[:, 0].min()),
+            float(self.ring_bboxes[:, 1].min()),
+            float(self.ring_bboxes[:, 2].max()),
+            float(self.ring_bboxes[:, 3].max()),
+        )
+
+    def contains_points(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Test whether points are inside or on the boundary of the area.
+
+        Args:
+            x: Array of x coordinates.
+            y: Array of y coordinates.
+
+        Returns:
+            Boolean array, true for points in the area.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        result = np.zeros(len(x), dtype=bool)
+
+        # get the band of each point, skipping points outside the area extent
+        xmin, ymin, xmax, ymax = self.bbox
+        in_extent = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        band_idx = np.clip(((y - self._band_ymin) / self._band_height).astype(np.int64), 0, self._band_count - 1)
+
+        for band in np.unique(band_idx[in_extent]):
+            point_idx = np.nonzero(in_extent & (band_idx == band))[0]
+            result[point_idx] = _points_in_rings(x[point_idx], y[point_idx], self._band_edges[band])
+
+        return result
+
+    def intersects_bboxes(
+        self, xmin: np.ndarray, ymin: np.ndarray, xmax: np.ndarray, ymax: np.ndarray
+    ) -> np.ndarray:
+        """
+        Test whether bounding boxes intersect the envelope of any ring of the area, as a pre-test before the
+        exact test.
+
+        Args:
+            xmin: Array of minimum x coordinates.
+            ymin: Array of minimum y coordinates.
+            xmax: Array of maximum x coordinates.
+            ymax: Array of maximum y coordinates.
+
+        Returns:
+            Boolean array, true for bounding boxes possibly intersecting the area.
+        """
+        result = np.zeros(len(xmin), dtype=bool)
+        for ring_xmin, ring_ymin, ring_xmax, ring_ymax in self.ring_bboxes:
+            result |= (xmin <= ring_xmax) & (xmax >= ring_xmin) & (ymin <= ring_ymax) & (ymax >= ring_ymin)
+        return result
+
+    def intersects_wkb(self, values: Union[pa.Array, list[bytes]]) -> np.ndarray:
+        """
+        Test exactly whether WKB geometries intersect the area.
+
+        Args:
+            values: WKB geometries as a PyArrow binary array or a list of bytes.
+
+        Returns:
+            Boolean array, true for geometries intersecting the area. Null and malformed geometries are false.
+        """
+        geometries = read_wkb_coordinates(values)
+        coords = geometries.coords
+        vertex_offsets = geometries.vertex_offsets
+
+        # test all the vertices at once, and get the geometries with any vertex in the area
+        inside = np.concatenate([[0], np.cumsum(self.contains_points(coords[:, 0], coords[:, 1]))])
+        result = (inside[vertex_offsets[1:]] - inside[vertex_offsets[:-1]]) > 0
+
+        # any remaining geometry intersecting must cross the boundary, or contain the area, so only the remaining
+        # geometries with linestrings or rings need testing
+        remaining = ~result & geometries.valid
+        part_geometries = np.repeat(np.arange(len(remaining)), np.diff(geometries.geometry_offsets))
+        parts = np.nonzero(remaining[part_geometries] & (geometries.part_kinds != PART_POINT))[0]
+        if len(parts) == 0:
+            return result
+
+        # test the segments of all the parts at once, each only against the boundary edges in the bands it spans
+        segments, segment_parts = _get_part_segments(geometries, parts)
+        crosses = self.crosses_segments(segments)
+        result[part_geometries[segment_parts[crosses]]] = True
+
+        # otherwise, a polygon intersects if the area is inside the polygon, so test a vertex of each ring of the
+        # area against the rings of all the remaining polygons at once
+        rings = parts[~result[part_geometries[parts]] & (geometries.part_kinds[parts] == PART_RING)]
+        if len(rings) == 0:
+            return result
+
+        edges, edge_parts = _get_part_segments(geometries, rings)
+        edge_geometries = part_geometries[edge_parts]
+        x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+        for px, py in self.ring_vertices:
+            # count the edges of each polygon crossed by a ray cast from the vertex in the positive x direction
+            straddle = (y1 > py) != (y2 > py)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            crossings = np.bincount(edge_geometries[straddle & (px < x_cross)], minlength=len(result))
+            result |= crossings % 2 == 1
+
+        return result
+
+    def crosses_segments(self, segments: np.ndarray) -> np.ndarray:
+        """
+        Test whether segments intersect or touch the boundary of the area.
+
+        Args:
+            segments: Array of segments as (x1, y1, x2, y2) rows.
+
+        Returns:
+            Boolean array, true for segments intersecting the boundary.
+        """
+        result = np.zeros(len(segments), dtype=bool)
+
+        # get the bands spanned by each segment, skipping segments outside the area extent
+        xmin, ymin, xmax, ymax = self.bbox
+        seg_xmin, seg_xmax = np.minimum(segments[:, 0], segments[:, 2]), np.maximum(segments[:, 0], segments[:, 2])
+        seg_ymin, seg_ymax = np.minimum(segments[:, 1], segments[:, 3]), np.maximum(segments[:, 1], segments[:, 3])
+        in_extent = (seg_xmin <= xmax) & (seg_xmax >= xmin) & (seg_ymin <= ymax) & (seg_ymax >= ymin)
+        first_band, last_band = (
+            np.clip(((values - self._band_ymin) / self._band_height).astype(np.int64), 0, self._band_count - 1)
+            for values in (seg_ymin, seg_ymax)
+        )
+
+        if not in_extent.any():
+            return result
+
+        for band in range(int(first_band[in_extent].min()), int(last_band[in_extent].max()) + 1):
+            segment_idx = np.nonzero(in_extent & ~result & (first_band <= band) & (last_band >= band))[0]
+            if len(segment_idx) > 0:
+                result[segment_idx] = _segments_intersect(segments[segment_idx], self._band_edges[band])
+
+        return result
+
+    def filter_batch(self, batch: pa.RecordBatch, geometry_column: str = "geometry") -> pa.RecordBatch:
+        """
+        Remove the features not intersecting the area from a record batch, and drop the helper bounding box
+        column added to the projection for the pre-test.
+
+        Args:
+            batch: Record batch including the helper bounding box column.
+            geometry_column: Name of the WKB geometry column.
+
+        Returns:
+            Record batch with only the features intersecting the area.
+        """
+        bbox = batch.column(AOI_BBOX_COLUMN)
+
+        # pre-test using the bounding boxes, with null bounding boxes never matching
+        xmin, ymin, xmax, ymax = (
+            pc.struct_field(bbox, name).to_numpy(zero_copy_only=False).astype(np.float64)
+            for name in ["xmin", "ymin", "xmax", "ymax"]
+        )
+        candidates = np.nonzero(self.intersects_bboxes(xmin, ymin, xmax, ymax))[0]
+
+        # test the candidates exactly
+        mask = np.zeros(batch.num_rows, dtype=bool)
+        if len(candidates) > 0:
+            values = pc.take(batch.column(geometry_column), pa.array(candidates))
+            mask[candidates] = self.intersects_wkb(values)
+
+        if not mask.all():
+            batch = batch.filter(pa.array(mask))
+
+        # remove the helper column
+        return batch.select([name for name in batch.schema.names if name != AOI_BBOX_COLUMN])
+
+
+def resolve_aoi(aoi: Union[AreaOfInterest, bytes, str, dict[str, Any]]) -> AreaOfInterest:
+    """
+    Resolve an area of interest argument.
+
+    Args:
+        aoi: Area of interest, or a WGS84 Polygon or MultiPolygon as WKB, WKT, a GeoJSON dictionary, or a geometry
+            object with a `WKB` property, such as an ArcPy or ArcGIS API for Python geometry.
+
+    Returns:
+        Area of interest.
+    """
+    if isinstance(aoi, AreaOfInterest):
+        return aoi
+    if isinstance(aoi, (bytes, bytearray, memoryview)):
+        return AreaOfInterest.from_wkb(bytes(aoi))
+    if isinstance(aoi, str):
+        return AreaOfInterest.from_wkt(aoi)
+    if isinstance(aoi, dict):
+        return AreaOfInterest.from_geojson(aoi)
+    if hasattr(aoi, "WKB"):
+        return AreaOfInterest.from_wkb(bytes(aoi.WKB))
+    raise ValueError(
+        f"Invalid area of interest, must be WKB, WKT, a GeoJSON dictionary or a geometry, not {type(aoi).__name__}."
+    )
@@ -70,6 +70,10 @@ def add_primary_name(features: Union[arcpy._mp.Layer, str, Path]) -> None:
     """
     Add a 'primary_name' field to the input features if it does not already exist, and calculate from
 
+    !!! tip
+        Rather than reading and updating every feature again, the 'primary_name' field can be created while the
+        data is retrieved, using `flatten=True` with `get_features`.
+
     Args:
         features: The input feature layer or feature class.
     """
@@ -170,6 +174,10 @@ def add_primary_category_field(features: Union[arcpy._mp.Layer, str, Path]) -> N
     Add a 'primary_category' field to the input features if it does not already exist, and calculate from
     the 'categories' field.
 
+    !!! tip
+        Rather than reading and updating every feature again, the 'primary_category' field can be created while the
+        data is retrieved, using `flatten=True` with `get_features`.
+
     Args:
         features: The input feature layer or feature class.
     """
@@ -228,6 +236,10 @@ def add_alternate_category_field(features: Union[arcpy._mp.Layer, str, Path]) ->
     Add an 'alternate_category' field to the input features if it does not already exist, and calculate from
     the 'categories' field.
 
+    !!! tip
+        Rather than reading and updating every feature again, the 'alternate_category' field can be created while the
+        data is retrieved, using `flatten=True` with `get_features`.
+
     Args:
         features: The input feature layer or feature class.
     """
@@ -399,6 +411,10 @@ def add_website_field(features: Union[arcpy._mp.Layer, str, Path]) -> None:
     Add a 'website' field to the input features if it does not already exist, and calculate from
     the 'contact_info' field.
 
+    !!! tip
+        Rather than reading and updating every feature again, the 'website' field can be created while the
+        data is retrieved, using `flatten=True` with `get_features`.
+
     Args:
         features: The input feature layer or feature class.
     """
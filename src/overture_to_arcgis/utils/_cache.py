@@ -0,0 +1,379 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+import os
+from pathlib import Path
+import re
+import tempfile
+import threading
+from typing import Iterator, Optional, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
+
+from ._logging import get_logger
+
+__all__ = ["RowGroupCache"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# default maximum size of the row group cache on disk
+DEFAULT_CACHE_MAX_BYTES: int = 10 * 1024**3
+
+# names which may be field references in the string form of an expression
+_FIELD_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def get_read_columns(
+    schema: pa.Schema,
+    columns: Optional[Union[list[str], dict[str, pc.Expression]]] = None,
+    filter: Optional[pc.Expression] = None,
+) -> Optional[list[str]]:
+    """
+    Get the top level columns a projection and filter reference, so only these are read from the row groups.
+
+    The referenced names are taken from the string form of the expressions, which may include a few more columns
+    than needed, such as a column named the same as a string literal, but never fewer, since the projection and
+    filter are checked against an empty table with only the columns found.
+
+    Args:
+        schema: Schema of the dataset read.
+        columns: Optional column projection, as accepted by the dataset scanner.
+        filter: Optional filter expression.
+
+    Returns:
+        Top level column names in schema order, or `None` if every column is needed.
+    """
+    # without a projection, the scanner returns every column
+    if columns is None:
+        return None
+
+    # collect the names in the projection and filter matching top level columns
+    expressions = list(columns.values()) if isinstance(columns, dict) else [pc.field(name) for name in columns]
+    if filter is not None:
+        expressions.append(filter)
+    tokens = set(_FIELD_NAME_PATTERN.findall(" ".join(str(expression) for expression in expressions)))
+    if isinstance(columns, list):
+        tokens.update(name.split(".")[0] for name in columns)
+    read_columns = [name for name in schema.names if name in tokens]
+
+    # fall back to every column if the projection or filter references a column not found
+    try:
+        ds.dataset(schema.empty_table().select(read_columns)).scanner(columns=columns, filter=filter)
+    except (pa.ArrowInvalid, KeyError):
+        return None
+
+    return read_columns
+
+
+class RowGroupCache:
+    """
+    Content addressed cache of Parquet row groups on local disk, so reading overlapping areas repeatedly, such as a
+    metro, then a county inside it, only downloads each row group once.
+
+    Each row group is saved as an Arrow IPC file named using a hash of the release root, release, file path,
+    row group index and the top level columns read, so reads only fetch and cache the columns the projection and
+    filter need, and reads with a different projection are cached separately. Since releases are immutable, cached row groups never need to be invalidated, only evicted
+    when the cache grows beyond `max_bytes`, least recently used first.
+
+    Several processes can safely share the same cache directory. Row groups are written to a temporary file and
+    atomically moved into place, so a partially written file is never read, and a file evicted by another process
+    while being looked up is simply treated as a miss.
+
+    ``` python
+    from overture_to_arcgis import OvertureClient
+    from overture_to_arcgis.utils import RowGroupCache
+
+    client = OvertureClient(row_group_cache=RowGroupCache(max_bytes=50 * 1024**3))
+    ```
+
+    Args:
+        cache_dir: Directory to save the cached row groups in. If not provided, a directory in the system temporary
+            directory is used.
+        max_bytes: Maximum size of the cache on disk in bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ):
+        if cache_dir is None:
+            cache_dir = Path(tempfile.gettempdir()) / "overture_to_arcgis" / "row_groups"
+
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+        # counters for reporting cache effectiveness
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+        # running estimate of the cache size, refreshed from disk when evicting
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"RowGroupCache(cache_dir='{self.cache_dir}', max_bytes={self.max_bytes:,})"
+
+    @staticmethod
+    def get_key(
+        root: str, release: str, file_path: str, row_group: int, columns: Optional[list[str]] = None
+    ) -> str:
+        """
+        Get the content address of a row group.
+
+        Args:
+            root: Identifier of the release root the row group is read from.
+            release: Release the row group is part of.
+            file_path: Path of the Parquet file relative to the dataset directory.
+            row_group: Index of the row group in the file.
+            columns: Optional top level columns read, or `None` for every column.
+
+        Returns:
+            Hexadecimal hash identifying the row group.
+        """
+        key = f"{root}|{release}|{file_path}|{row_group}"
+        if columns is not None:
+            key = f"{key}|{','.join(sorted(columns))}"
+        return sha256(key.encode("utf-8")).hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        """Get the path a row group is cached at, using the first characters of the key to limit directory size."""
+        return self.cache_dir / key[:2] / f"{key}.arrow"
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Cache hit, miss and eviction counts, and the bytes read from and written to the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+    def get(self, key: str) -> Optional[pa.Table]:
+        """
+        Get a row group from the cache.
+
+        Args:
+            key: Content address of the row group.
+
+        Returns:
+            The cached row group as a table, or `None` if not cached.
+        """
+        path = self.get_path(key)
+        try:
+            # read fully into memory rather than memory mapping, so the file is not held open and can be evicted
+            with pa.OSFile(str(path), "rb") as source:
+                table = pa.ipc.open_file(source).read_all()
+
+            # mark the row group as recently used for the least recently used eviction
+            os.utime(path)
+
+        # another process may have evicted the file since checking
+        except (OSError, pa.ArrowInvalid):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_read += table.nbytes
+
+        return table
+
+    def put(self, key: str, table: pa.Table) -> None:
+        """
+        Add a row group to the cache, evicting least recently used row groups if the cache grows too large.
+
+        Args:
+            key: Content address of the row group.
+            table: Row group data.
+        """
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a process and thread specific temporary file, and move into place atomically
+        tmp_pth = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with pa.OSFile(str(tmp_pth), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        # if the move fails, e.g. on Windows because another process wrote and is reading the same row group, the
+        # row group is already cached, so just discard the temporary file
+        try:
+            os.replace(tmp_pth, path)
+        except PermissionError:
+            tmp_pth.unlink()
+            return
+
+        size = path.stat().st_size
+        with self._lock:
+            self.bytes_written += size
+            if self._size is not None:
+                self._size += size
+            needs_eviction = self._size is None or self._size > self.max_bytes
+
+        if needs_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used row groups until the cache is no larger than the maximum size.
+
+        Returns:
+            Number of row groups removed.
+        """
+        # get the cached files, tolerating files removed by other processes while listing
+        entries = []
+        for path in self.cache_dir.glob("*/*.arrow"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+
+        # remove the oldest files first until under the size limit
+        for _, file_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+                size -= file_size
+
+            # already removed by another process, or still open by another process on Windows
+            except FileNotFoundError:
+                size -= file_size
+            except PermissionError:
+                pass
+
+        with self._lock:
+            self._size = size
+            self.evictions += removed
+
+        if removed:
+            logger.debug(f"Evicted {removed} row groups from the cache, now {size:,} bytes.")
+
+        return removed
+
+    def clear(self) -> None:
+        """Remove all cached row groups."""
+        for path in self.cache_dir.glob("*/*.arrow"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._size = None
+
+    def read_row_group(
+        self,
+        filesystem: fs.FileSystem,
+        dataset_path: str,
+        file_name: str,
+        row_group: int,
+        root: str,
+        release: str,
+        columns: Optional[list[str]] = None,
+    ) -> pa.Table:
+        """
+        Read a row group, from the cache if available, or from the filesystem, adding it to the cache.
+
+        Args:
+            filesystem: PyArrow filesystem to read from on a cache miss.
+            dataset_path: Path to the dataset directory.
+            file_name: Path of the Parquet file relative to the dataset directory.
+            row_group: Index of the row group in the file.
+            root: Identifier of the release root.
+            release: Release the row group is part of.
+            columns: Optional top level columns to read, or `None` to read every column.
+
+        Returns:
+            Row group data as a table.
+        """
+        key = self.get_key(root, release, file_name, row_group, columns=columns)
+
+        table = self.get(key)
+        if table is None:
+            file_path = f"{dataset_path}/{file_name}" if dataset_path else file_name
+            with filesystem.open_input_file(file_path) as handle:
+                table = pq.ParquetFile(handle).read_row_group(row_group, columns=columns)
+            self.put(key, table)
+
+        return table
+
+    def iter_batches(
+        self,
+        filesystem: fs.FileSystem,
+        dataset_path: str,
+        row_groups: pa.Table,
+        root: str,
+        release: str,
+        columns: Optional[Union[list[str], dict[str, pc.Expression]]] = None,
+        filter: Optional[pc.Expression] = None,
+        max_workers: int = 8,
+        schema: Optional[pa.Schema] = None,
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Read row groups through the cache, applying the projection and filter locally, yielding record batches in
+        the order of the row groups.
+
+        If the dataset schema is provided, only the top level columns the projection and filter reference are read
+        and cached, otherwise every column of each row group is read.
+
+        Args:
+            filesystem: PyArrow filesystem to read from on a cache miss.
+            dataset_path: Path to the dataset directory.
+            row_groups: Fragment index rows with the `file` and `row_group` of each row group to read.
+            root: Identifier of the release root.
+            release: Release the row groups are part of.
+            columns: Optional column projection, as accepted by the dataset scanner.
+            filter: Optional filter expression.
+            max_workers: Maximum number of row groups read concurrently.
+            schema: Optional schema of the dataset, used to limit the columns read.
+
+        Yields:
+            Record batches with the projection and filter applied.
+        """
+        items = list(zip(row_groups["file"].to_pylist(), row_groups["row_group"].to_pylist()))
+        if not items:
+            return
+
+        # get the top level columns needed, reading every column if these cannot be determined
+        read_columns = get_read_columns(schema, columns, filter) if schema is not None else None
+        if read_columns is None:
+            logger.debug("Reading every column of the row groups through the cache.")
+        else:
+            logger.debug(f"Reading the {read_columns} columns of the row groups through the cache.")
+
+        def read(item: tuple[str, int]) -> pa.Table:
+            return self.read_row_group(
+                filesystem, dataset_path, item[0], item[1], root, release, columns=read_columns
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+            # keep a bounded number of reads in flight so memory use does not grow with the number of row groups
+            futures = deque()
+            for item in items:
+                futures.append(executor.submit(read, item))
+                if len(futures) >= max_workers:
+                    table = futures.popleft().result()
+                    yield from ds.dataset(table).to_batches(columns=columns, filter=filter)
+
+            while futures:
+                table = futures.popleft().result()
+                yield from ds.dataset(table).to_batches(columns=columns, filter=filter)
+
+        logger.debug(f"Row group cache statistics: {self.stats}")
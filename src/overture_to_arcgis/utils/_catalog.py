@@ -0,0 +1,510 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import tempfile
+import threading
+import time
+from hashlib import md5
+from pathlib import Path
+from typing import Optional, Union
+
+import pyarrow.fs as fs
+
+from ._logging import get_logger
+
+__all__ = ["ReleaseCatalog", "get_catalog", "set_base_uri", "set_catalog"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# root of the published Overture releases on S3
+OVERTURE_RELEASE_DIR: str = "overturemaps-us-west-2/release"
+
+# default number of seconds the current release pointer is trusted before listing the releases again
+DEFAULT_CURRENT_RELEASE_TTL: int = 3600
+
+# minimum number of themes for a release to be considered completely loaded
+MIN_RELEASE_THEMES: int = 5
+
+# default maximum number of directories listed concurrently
+DEFAULT_MAX_LIST_WORKERS: int = 16
+
+
+def list_directory_names(
+    filesystem: fs.FileSystem, base_dir: str, split_on: str = "/"
+) -> list[str]:
+    """
+    List the names of the directories directly below a base directory.
+
+    Args:
+        filesystem: PyArrow filesystem to list with.
+        base_dir: Directory to list the contents of.
+        split_on: Character to split the directory path on to get the name, e.g. `=` to get the value out of a
+            Hive style partition directory such as `theme=places`.
+
+    Returns:
+        List of directory names.
+    """
+    # create fileselector
+    selector = fs.FileSelector(base_dir=base_dir, recursive=False)
+
+    # get the contents as FileInfo objects
+    file_infos = filesystem.get_file_info(selector)
+
+    # extract the directory names from the FileInfo objects
+    directories = [
+        info.path for info in file_infos if info.type == fs.FileType.Directory
+    ]
+
+    # get the directory names only (last part of the path)
+    names = [dir_path.rstrip("/").split(split_on)[-1] for dir_path in directories]
+
+    return names
+
+
+def list_directory_names_concurrently(
+    filesystem: fs.FileSystem,
+    base_dirs: list[str],
+    split_on: str = "/",
+    max_workers: int = DEFAULT_MAX_LIST_WORKERS,
+) -> list[list[str]]:
+    """
+    List the names of the directories directly below each of several base directories using a bounded thread
+    pool, so the round trips to object storage overlap instead of adding up.
+
+    Args:
+        filesystem: PyArrow filesystem to list with.
+        base_dirs: Directories to list the contents of.
+        split_on: Character to split the directory path on to get the name.
+        max_workers: Maximum number of directories to list at the same time.
+
+    Returns:
+        List of directory names for each base directory, in the same order as the base directories.
+    """
+    # no need for the overhead of a thread pool for a single listing
+    if len(base_dirs) <= 1 or max_workers <= 1:
+        return [list_directory_names(filesystem, pth, split_on) for pth in base_dirs]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(base_dirs))) as executor:
+        names = list(
+            executor.map(
+                lambda pth: list_directory_names(filesystem, pth, split_on), base_dirs
+            )
+        )
+
+    return names
+
+
+class ReleaseCatalog:
+    """
+    Cache for the release, theme and type discovery listings, kept both in memory and in a JSON snapshot on disk.
+
+    Published Overture releases are immutable, so once a release is completely loaded, the themes and the type to
+    theme mapping for the release are cached indefinitely. Only the list of releases, and with it the pointer to the
+    current release, expires after `current_release_ttl` seconds, since this is the only part of the catalog
+    changing when a new release is published.
+
+    ``` python
+    from overture_to_arcgis.utils import ReleaseCatalog, set_catalog
+
+    # trust the current release for a day, and use the last snapshot without touching S3
+    set_catalog(ReleaseCatalog(current_release_ttl=86400, offline=True))
+    ```
+
+    The catalog is not limited to the public Overture bucket. Any PyArrow filesystem and base directory laid out
+    like the Overture release tree, such as a local mirror, a `SubTreeFileSystem` or an S3 compatible endpoint, can
+    be used.
+
+    ``` python
+    # local mirror of the Overture GeoParquet
+    catalog = ReleaseCatalog.from_uri("file:///mnt/nvme/overture/release")
+    ```
+
+    Args:
+        filesystem: Optional PyArrow filesystem to list releases with. If not provided, an anonymous S3 filesystem
+            will be created when first needed.
+        base_dir: Directory on the filesystem containing the release directories. Use an empty string if the
+            filesystem is rooted at the release directory, such as a `SubTreeFileSystem`.
+        cache_dir: Directory to save the catalog snapshot to. If not provided, a directory in the system temporary
+            directory is used.
+        current_release_ttl: Seconds the release list and current release pointer are valid before being listed
+            again.
+        offline: If `True`, never list the filesystem and only use the snapshot saved on disk.
+        max_workers: Maximum number of directories listed concurrently when discovering releases and types.
+    """
+
+    def __init__(
+        self,
+        filesystem: Optional[fs.FileSystem] = None,
+        base_dir: str = OVERTURE_RELEASE_DIR,
+        cache_dir: Optional[Union[str, Path]] = None,
+        current_release_ttl: float = DEFAULT_CURRENT_RELEASE_TTL,
+        offline: bool = False,
+        max_workers: int = DEFAULT_MAX_LIST_WORKERS,
+    ):
+        if cache_dir is None:
+            cache_dir = Path(tempfile.gettempdir()) / "overture_to_arcgis"
+
+        self._filesystem = filesystem
+        self.base_dir = base_dir.rstrip("/")
+        self.cache_dir = Path(cache_dir)
+        self.current_release_ttl = current_release_ttl
+        self.offline = offline
+        self.max_workers = max_workers
+
+        # whether the catalog creates its own anonymous S3 filesystem, recorded once since the filesystem is created
+        # lazily when first needed
+        self._uses_default_filesystem = filesystem is None
+
+        # in memory catalog state
+        self._releases: Optional[list[str]] = None
+        self._releases_timestamp: float = 0.0
+        self._themes: dict[str, list[str]] = {}
+        self._type_theme_maps: dict[str, dict[str, str]] = {}
+
+        # lock so the catalog can be shared between threads
+        self._lock = threading.RLock()
+
+        # hydrate the in memory state from the last snapshot, if one exists
+        self._load_snapshot()
+
+    def __repr__(self) -> str:
+        return f"ReleaseCatalog(root='{self.root}', offline={self.offline})"
+
+    @classmethod
+    def from_uri(cls, uri: str, **kwargs) -> "ReleaseCatalog":
+        """
+        Create a release catalog from a URI to the directory containing the releases, such as
+        `file:///mnt/overture/release` or `s3://mirror/release?endpoint_override=minio.local:9000`.
+
+        Args:
+            uri: URI PyArrow can create a filesystem from.
+            **kwargs: Additional keyword arguments passed to the `ReleaseCatalog` constructor.
+
+        Returns:
+            Release catalog for the URI.
+        """
+        filesystem, base_dir = fs.FileSystem.from_uri(uri)
+        return cls(filesystem=filesystem, base_dir=base_dir, **kwargs)
+
+    @property
+    def is_default_root(self) -> bool:
+        """Whether the catalog points to the public Overture releases on S3."""
+        return self._uses_default_filesystem and self.base_dir == OVERTURE_RELEASE_DIR
+
+    @property
+    def filesystem(self) -> fs.FileSystem:
+        """Filesystem used to list the releases, created when first needed."""
+        if self._filesystem is None:
+            self._filesystem = fs.S3FileSystem(anonymous=True, region="us-west-2")
+        return self._filesystem
+
+    @property
+    def root(self) -> str:
+        """Description of the release root uniquely identifying it, including the filesystem type."""
+        fs_type = "s3" if self._uses_default_filesystem else self._filesystem.type_name
+        sub_tree = getattr(self._filesystem, "base_path", "")
+        return f"{fs_type}://{sub_tree}{self.base_dir}"
+
+    def path(self, *parts: str) -> str:
+        """
+        Create a path on the filesystem relative to the base directory.
+
+        Args:
+            *parts: Path parts to join to the base directory, e.g. release, theme and type directories.
+
+        Returns:
+            Path joined with forward slashes.
+        """
+        return "/".join([part for part in [self.base_dir, *parts] if part])
+
+    @property
+    def root_hash(self) -> str:
+        """Short hash of the release root, used to keep files cached for different roots apart."""
+        return md5(self.root.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Path to the JSON snapshot of the catalog, unique to the release root."""
+        return self.cache_dir / f"catalog_{self.root_hash}.json"
+
+    def _load_snapshot(self) -> None:
+        """Load the catalog state from the snapshot on disk, if available."""
+        if not self.snapshot_path.exists():
+            return
+
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unable to read the release catalog snapshot, ignoring it: {e}")
+            return
+
+        self._releases = snapshot.get("releases")
+        self._releases_timestamp = snapshot.get("releases_timestamp", 0.0)
+        self._themes = snapshot.get("themes", {})
+        self._type_theme_maps = snapshot.get("type_theme_maps", {})
+
+        logger.debug(f"Loaded release catalog snapshot from {self.snapshot_path}")
+
+    def _save_snapshot(self) -> None:
+        """Save the catalog state to disk, replacing the previous snapshot atomically."""
+        snapshot = {
+            "root": self.root,
+            "releases": self._releases,
+            "releases_timestamp": self._releases_timestamp,
+            "themes": self._themes,
+            "type_theme_maps": self._type_theme_maps,
+        }
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # write to a process specific temporary file first so readers never see a partial snapshot
+            tmp_pth = self.snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_pth.write_text(json.dumps(snapshot), encoding="utf-8")
+            os.replace(tmp_pth, self.snapshot_path)
+
+        except OSError as e:
+            logger.warning(f"Unable to save the release catalog snapshot: {e}")
+
+    def _check_online(self, description: str) -> None:
+        """Raise an error if listing is needed while offline."""
+        if self.offline:
+            raise RuntimeError(
+                f"The release catalog is offline, and the {description} is not in the snapshot at "
+                f"{self.snapshot_path}."
+            )
+
+    def _list_themes(
+        self, releases: list[str], filesystem: fs.FileSystem
+    ) -> dict[str, list[str]]:
+        """List the themes for releases concurrently, caching the results for completely loaded releases."""
+        theme_lists = list_directory_names_concurrently(
+            filesystem,
+            [self.path(release) for release in releases],
+            split_on="=",
+            max_workers=self.max_workers,
+        )
+        release_themes = dict(zip(releases, theme_lists))
+
+        # only cache complete releases, since a release still being loaded will change
+        for release, themes in release_themes.items():
+            if len(themes) >= MIN_RELEASE_THEMES:
+                self._themes[release] = themes
+
+        return release_themes
+
+    @property
+    def releases_expired(self) -> bool:
+        """Whether the cached release list is missing or older than the time to live."""
+        return (
+            self._releases is None
+            or time.time() - self._releases_timestamp > self.current_release_ttl
+        )
+
+    def get_release_list(
+        self, refresh: bool = False, filesystem: Optional[fs.FileSystem] = None
+    ) -> list[str]:
+        """
+        Returns a list of all available, completely loaded, Overture dataset releases.
+
+        Args:
+            refresh: If `True`, list the releases again even if the cached list has not expired.
+            filesystem: Optional filesystem to use for listing instead of the catalog filesystem.
+
+        Returns:
+            List of release strings.
+        """
+        with self._lock:
+            # use the cached list if still valid, or if offline and any list is available
+            if self._releases is not None and (
+                self.offline or (not refresh and not self.releases_expired)
+            ):
+                return list(self._releases)
+
+            self._check_online("release list")
+
+            if filesystem is None:
+                filesystem = self.filesystem
+
+            # list all the release directories
+            releases = list_directory_names(filesystem, self.path())
+
+            # list the themes of any releases not yet cached all at once
+            release_themes = self._list_themes(
+                [rel for rel in releases if rel not in self._themes], filesystem
+            )
+            release_themes.update(self._themes)
+
+            # ensure each release has data, since a new release may still be loading
+            releases = [
+                rel
+                for rel in releases
+                if len(release_themes.get(rel, [])) >= MIN_RELEASE_THEMES
+            ]
+
+            self._releases = releases
+            self._releases_timestamp = time.time()
+            self._save_snapshot()
+
+            logger.debug(f"Available releases: {releases}")
+
+            return list(releases)
+
+    def get_current_release(
+        self, refresh: bool = False, filesystem: Optional[fs.FileSystem] = None
+    ) -> str:
+        """
+        Returns the most current Overture dataset release string.
+
+        Args:
+            refresh: If `True`, list the releases again even if the cached list has not expired.
+            filesystem: Optional filesystem to use for listing instead of the catalog filesystem.
+
+        Returns:
+            Most current release string.
+        """
+        releases = self.get_release_list(refresh=refresh, filesystem=filesystem)
+
+        # make sure there is at least one release
+        if not releases:
+            raise RuntimeError("No Overture dataset releases found.")
+
+        return sorted(releases)[-1]
+
+    def get_themes(
+        self, release: str, filesystem: Optional[fs.FileSystem] = None
+    ) -> list[str]:
+        """
+        Returns a list of all available Overture dataset themes for a release.
+
+        Args:
+            release: Release version.
+            filesystem: Optional filesystem to use for listing instead of the catalog filesystem.
+
+        Returns:
+            List of themes in the release.
+        """
+        with self._lock:
+            if release in self._themes:
+                return list(self._themes[release])
+
+            self._check_online(f"theme list for release {release}")
+
+            themes = self._list_themes([release], filesystem or self.filesystem)[release]
+
+            if release in self._themes:
+                self._save_snapshot()
+
+            return themes
+
+    def get_type_theme_map(
+        self, release: str, filesystem: Optional[fs.FileSystem] = None
+    ) -> dict[str, str]:
+        """
+        Returns the mapping of overture types to themes for a release.
+
+        Args:
+            release: Release version.
+            filesystem: Optional filesystem to use for listing instead of the catalog filesystem.
+
+        Returns:
+            Dictionary mapping overture types to themes.
+        """
+        with self._lock:
+            if release in self._type_theme_maps:
+                return dict(self._type_theme_maps[release])
+
+            self._check_online(f"type theme map for release {release}")
+
+            if filesystem is None:
+                filesystem = self.filesystem
+
+            # list the types for all the themes at once
+            themes = self.get_themes(release, filesystem=filesystem)
+            type_lists = list_directory_names_concurrently(
+                filesystem,
+                [self.path(release, f"theme={theme}") for theme in themes],
+                split_on="=",
+                max_workers=self.max_workers,
+            )
+
+            # map each type to the theme it was found in
+            type_theme_map = {}
+            for theme, types in zip(themes, type_lists):
+                for overture_type in types:
+                    type_theme_map[overture_type] = theme
+
+            # only cache the mapping if the release is completely loaded, and the themes were hence cached
+            if release in self._themes:
+                self._type_theme_maps[release] = type_theme_map
+                self._save_snapshot()
+
+            return dict(type_theme_map)
+
+    def clear(self, remove_snapshot: bool = False) -> None:
+        """
+        Clear the in memory catalog state.
+
+        Args:
+            remove_snapshot: If `True`, also delete the snapshot saved on disk.
+        """
+        with self._lock:
+            self._releases = None
+            self._releases_timestamp = 0.0
+            self._themes = {}
+            self._type_theme_maps = {}
+
+            if remove_snapshot and self.snapshot_path.exists():
+                self.snapshot_path.unlink()
+
+
+# default catalog shared by the module level discovery functions
+_catalog: Optional[ReleaseCatalog] = None
+
+
+def get_catalog() -> ReleaseCatalog:
+    """
+    Get the release catalog used by the discovery functions, creating it with default settings if needed.
+
+    Returns:
+        Shared release catalog.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = ReleaseCatalog()
+    return _catalog
+
+
+def set_catalog(catalog: ReleaseCatalog) -> None:
+    """
+    Replace the release catalog used by the discovery functions, e.g. to change the time to live or go offline.
+
+    Args:
+        catalog: Release catalog to use.
+    """
+    global _catalog
+    _catalog = catalog
+
+
+def set_base_uri(uri: str, **kwargs) -> ReleaseCatalog:
+    """
+    Point the discovery functions, and any `OvertureClient` created without a filesystem, to a release tree other
+    than the public Overture bucket, such as a local mirror.
+
+    ``` python
+    from overture_to_arcgis.utils import set_base_uri
+
+    set_base_uri("file:///mnt/nvme/overture/release")
+    ```
+
+    Args:
+        uri: URI to the directory containing the release directories.
+        **kwargs: Additional keyword arguments passed to the `ReleaseCatalog` constructor.
+
+    Returns:
+        The release catalog now used by default.
+    """
+    catalog = ReleaseCatalog.from_uri(uri, **kwargs)
+    set_catalog(catalog)
+    return catalog
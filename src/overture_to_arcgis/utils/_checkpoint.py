@@ -0,0 +1,176 @@
+from datetime import datetime, timezone
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from ._logging import get_logger
+
+__all__ = ["CheckpointJournal", "retry_with_backoff"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# default retry settings, doubling the delay after each failed attempt up to the maximum
+DEFAULT_MAX_RETRIES: int = 5
+DEFAULT_BACKOFF_BASE: float = 1.0
+DEFAULT_BACKOFF_MAX: float = 60.0
+
+T = TypeVar("T")
+
+
+def retry_with_backoff(
+    func: Callable[[], T],
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_delay: float = DEFAULT_BACKOFF_BASE,
+    max_delay: float = DEFAULT_BACKOFF_MAX,
+    retry_on: tuple[type[BaseException], ...] = (OSError,),
+    description: str = "operation",
+) -> T:
+    """
+    Call a function, retrying with bounded exponential backoff if it fails with a transient error. Network
+    failures, including timeouts and PyArrow I/O errors, are all subclasses of `OSError`.
+
+    Args:
+        func: Function to call without arguments.
+        max_retries: Maximum number of retries after the first attempt.
+        base_delay: Delay in seconds before the first retry, doubled for each subsequent retry.
+        max_delay: Maximum delay in seconds between retries.
+        retry_on: Exception types considered transient and retried.
+        description: Description of the operation used in the log messages.
+
+    Returns:
+        The return value of the function.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except retry_on as error:
+            if attempt >= max_retries:
+                logger.warning(f"Giving up on {description} after {attempt + 1} attempts: {error}")
+                raise
+            delay = min(max_delay, base_delay * 2**attempt)
+            attempt += 1
+            logger.warning(f"Attempt {attempt} of {description} failed, retrying in {delay:.1f}s: {error}")
+            time.sleep(delay)
+
+
+def get_extract_key(**parameters: Any) -> str:
+    """
+    Get a key identifying an extract from the parameters defining its result, such as the release, type and area,
+    so a re-run with the same parameters finds the same checkpoint journal.
+
+    Args:
+        **parameters: Parameters defining the extract. Values must be JSON serializable or have a meaningful
+            string representation.
+
+    Returns:
+        Hexadecimal key.
+    """
+    payload = json.dumps(parameters, sort_keys=True, default=str)
+    return sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CheckpointJournal:
+    """
+    Append only journal recording the pieces of an extract, such as files or tiles, which have been fetched and
+    written, together with the intermediate outputs for each, so an interrupted extract can be resumed by only
+    processing the pieces not yet completed.
+
+    Each completed piece is appended to the journal as a line of JSON and flushed to disk immediately, so the
+    journal is never more than the piece in progress behind. A partially written last line, left if the process
+    is killed while writing, is ignored when the journal is loaded.
+
+    Args:
+        path: Path to the journal file.
+        parameters: Optional parameters describing the extract, saved in the journal header for reference.
+    """
+
+    def __init__(self, path: Union[str, Path], parameters: Optional[dict[str, Any]] = None):
+        self.path = Path(path)
+        self.parameters = parameters or {}
+        self.completed: dict[str, dict[str, Any]] = {}
+
+        # load the pieces completed by a previous run
+        if self.path.exists():
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._append({"parameters": self.parameters, "created": self._now()})
+
+    def __repr__(self) -> str:
+        return f"CheckpointJournal(path='{self.path}', completed={len(self.completed)})"
+
+    @classmethod
+    def for_extract(cls, checkpoint_dir: Union[str, Path], **parameters: Any) -> "CheckpointJournal":
+        """
+        Get the journal for an extract in a checkpoint directory, named using the key of the extract parameters.
+
+        Args:
+            checkpoint_dir: Directory to save the journal in.
+            **parameters: Parameters defining the extract.
+
+        Returns:
+            Checkpoint journal, with the completed pieces of any previous run.
+        """
+        key = get_extract_key(**parameters)
+        return cls(Path(checkpoint_dir) / f"extract_{key}.jsonl", parameters)
+
+    @property
+    def key(self) -> str:
+        """Key of the extract, taken from the journal file name."""
+        return self.path.stem.removeprefix("extract_")
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(f"Ignoring incomplete entry in checkpoint journal {self.path}.")
+                    continue
+                if "piece" in entry:
+                    self.completed[entry["piece"]] = entry
+                elif "parameters" in entry:
+                    self.parameters = entry["parameters"]
+
+        logger.debug(f"Loaded checkpoint journal {self.path} with {len(self.completed)} completed pieces.")
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, default=str) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def is_complete(self, piece: str) -> bool:
+        """Whether a piece of the extract was completed by this or a previous run."""
+        return piece in self.completed
+
+    def record(self, piece: str, outputs: list[str], rows: int = 0) -> None:
+        """
+        Record a piece of the extract as completed.
+
+        Args:
+            piece: Identifier of the piece, such as a file name or tile.
+            outputs: Paths to the intermediate outputs written for the piece.
+            rows: Number of rows written for the piece.
+        """
+        entry = {"piece": piece, "outputs": list(outputs), "rows": rows, "completed": self._now()}
+        self._append(entry)
+        self.completed[piece] = entry
+
+    @property
+    def outputs(self) -> list[str]:
+        """Intermediate outputs of all the completed pieces, in the order the pieces were completed."""
+        return [output for entry in self.completed.values() for output in entry["outputs"]]
+
+    def remove(self) -> None:
+        """Delete the journal once the extract is finished."""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,336 @@
+from pathlib import Path
+import threading
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+
+from ._cache import RowGroupCache
+from ._catalog import ReleaseCatalog, get_catalog
+from ._index import FragmentIndex
+from ._logging import get_logger
+from ._scan import ScanOptions
+
+__all__ = ["OvertureClient"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+
+class OvertureClient:
+    """
+    Session holding everything needed to read Overture data, so a batch of extracts shares a single pooled
+    filesystem connection, a single pinned release, the type to theme mapping and the discovered datasets with their
+    schemas, instead of creating and discovering all of these for every call.
+
+    Since the release is resolved once, when the client is created, every extract using the client reads from the
+    same release, even if a new release is published while a job is running.
+
+    ``` python
+    from overture_to_arcgis import OvertureClient, get_features
+
+    client = OvertureClient(request_timeout=60)
+
+    for overture_type in ["segment", "connector"]:
+        get_features(f"C:/data/overture.gdb/{overture_type}", overture_type, bbox, client=client)
+    ```
+
+    The client can also read from any tree laid out like the Overture releases, such as a local mirror of the
+    GeoParquet, by providing a filesystem and the base path to the directory containing the releases.
+
+    ``` python
+    from pyarrow import fs
+
+    client = OvertureClient(filesystem=fs.LocalFileSystem(), base_path="/mnt/nvme/overture/release")
+
+    # or equivalently
+    client = OvertureClient.from_uri("file:///mnt/nvme/overture/release")
+    ```
+
+    Args:
+        release: Optional release to pin the client to. If not provided, the most current release is used.
+        connect_timeout: Optional timeout in seconds for establishing a connection to AWS S3.
+        request_timeout: Optional timeout in seconds for waiting for a response from AWS S3.
+        filesystem: Optional pre-configured PyArrow filesystem. If not provided, the filesystem of the catalog is
+            used, or for the public Overture bucket, an anonymous S3 filesystem is created using the timeouts.
+        base_path: Optional path on the filesystem to the directory containing the release directories. If
+            provided, a release catalog for this root is created.
+        catalog: Optional release catalog used for discovery. If neither this nor the base path is provided, the
+            shared catalog is used.
+        scan_options: Optional `ScanOptions` used for every scan with the client. If not provided, the defaults
+            tuned for object storage are used.
+        row_group_cache: Optional `RowGroupCache` to read row groups through, so repeated reads of the same row
+            groups are served from local disk.
+    """
+
+    def __init__(
+        self,
+        release: Optional[str] = None,
+        connect_timeout: Optional[float] = None,
+        request_timeout: Optional[float] = None,
+        filesystem: Optional[fs.FileSystem] = None,
+        base_path: Optional[str] = None,
+        catalog: Optional[ReleaseCatalog] = None,
+        scan_options: Optional[ScanOptions] = None,
+        row_group_cache: Optional[RowGroupCache] = None,
+    ):
+        # resolve the catalog describing the release root
+        if catalog is None and base_path is not None:
+            catalog = ReleaseCatalog(filesystem=filesystem, base_dir=base_path)
+        elif catalog is None:
+            catalog = get_catalog()
+
+        # create the single filesystem used for all reads by this client
+        if filesystem is None and catalog.is_default_root:
+            filesystem = fs.S3FileSystem(
+                anonymous=True,
+                region="us-west-2",
+                connect_timeout=connect_timeout,
+                request_timeout=request_timeout,
+            )
+        elif filesystem is None:
+            filesystem = catalog.filesystem
+
+        self.filesystem = filesystem
+        self.catalog = catalog
+        self.scan_options = scan_options if scan_options is not None else ScanOptions()
+        self.row_group_cache = row_group_cache
+
+        # pin the release
+        if release is None:
+            release = self.catalog.get_current_release(filesystem=self.filesystem)
+        elif release not in self.catalog.get_release_list(filesystem=self.filesystem):
+            raise ValueError(f"Invalid release: {release}")
+        self.release = release
+
+        # lazily populated state shared by all extracts using the client
+        self._type_theme_map: Optional[dict[str, str]] = None
+        self._datasets: dict[str, ds.Dataset] = {}
+        self._indices: dict[str, FragmentIndex] = {}
+        self._lock = threading.RLock()
+        self._dataset_locks: dict[str, threading.Lock] = {}
+        self._index_locks: dict[str, threading.Lock] = {}
+
+        logger.debug(f"Created Overture client pinned to release {self.release}.")
+
+    def __repr__(self) -> str:
+        return f"OvertureClient(root='{self.catalog.root}', release='{self.release}')"
+
+    @classmethod
+    def from_uri(cls, uri: str, release: Optional[str] = None) -> "OvertureClient":
+        """
+        Create a client reading from the release tree at a URI, such as `file:///mnt/overture/release` or
+        `s3://mirror/release?endpoint_override=minio.local:9000`.
+
+        Args:
+            uri: URI to the directory containing the release directories.
+            release: Optional release to pin the client to. If not provided, the most current release is used.
+
+        Returns:
+            Client for the release tree.
+        """
+        filesystem, base_path = fs.FileSystem.from_uri(uri)
+        return cls(release=release, filesystem=filesystem, base_path=base_path)
+
+    def for_release(self, release: str) -> "OvertureClient":
+        """
+        Create a client for another release sharing the filesystem, catalog, scan options and row group cache of
+        this client, such as to compare two releases.
+
+        Args:
+            release: Release to pin the new client to.
+
+        Returns:
+            Client for the release.
+        """
+        return OvertureClient(
+            release=release,
+            filesystem=self.filesystem,
+            catalog=self.catalog,
+            scan_options=self.scan_options,
+            row_group_cache=self.row_group_cache,
+        )
+
+    def get_previous_release(self) -> str:
+        """
+        Get the release preceding the pinned release, such as to find what changed in the pinned release.
+
+        Returns:
+            Previous release string.
+        """
+        releases = sorted(self.catalog.get_release_list(filesystem=self.filesystem))
+        previous = [release for release in releases if release < self.release]
+        if len(previous) == 0:
+            raise ValueError(f"No release found before release {self.release}.")
+        return previous[-1]
+
+    @property
+    def type_theme_map(self) -> dict[str, str]:
+        """Mapping of overture types to themes for the pinned release."""
+        with self._lock:
+            if self._type_theme_map is None:
+                self._type_theme_map = self.catalog.get_type_theme_map(
+                    self.release, filesystem=self.filesystem
+                )
+            return self._type_theme_map
+
+    @property
+    def overture_types(self) -> list[str]:
+        """List of available overture types for the pinned release."""
+        return list(self.type_theme_map.keys())
+
+    def validate_overture_type(self, overture_type: str) -> str:
+        """
+        Ensure the overture type is available in the pinned release.
+
+        Args:
+            overture_type: Overture feature type to validate.
+
+        Returns:
+            The validated overture type.
+        """
+        if overture_type not in self.type_theme_map:
+            raise ValueError(
+                f"Invalid overture type: {overture_type}. Available types are: {self.overture_types}"
+            )
+        return overture_type
+
+    def get_dataset_path(self, overture_type: str) -> str:
+        """
+        Returns the path of the dataset for an overture type in the pinned release.
+
+        Args:
+            overture_type: Overture feature type.
+
+        Returns:
+            Path to the dataset on the client filesystem.
+        """
+        theme = self.type_theme_map.get(self.validate_overture_type(overture_type))
+        return self.catalog.path(self.release, f"theme={theme}", f"type={overture_type}")
+
+    def get_dataset(self, overture_type: str) -> ds.Dataset:
+        """
+        Get the PyArrow dataset for an overture type. The dataset, including the discovered files and the schema,
+        is created once and reused for every subsequent request.
+
+        Args:
+            overture_type: Overture feature type.
+
+        Returns:
+            PyArrow dataset for the overture type.
+        """
+        # get the lock for the type, so the files are only discovered once, while other types discover concurrently
+        with self._lock:
+            if overture_type in self._datasets:
+                return self._datasets[overture_type]
+            type_lock = self._dataset_locks.setdefault(overture_type, threading.Lock())
+
+        with type_lock:
+            # another thread may have finished discovering the files while waiting for the lock
+            with self._lock:
+                if overture_type in self._datasets:
+                    return self._datasets[overture_type]
+
+            dataset = ds.dataset(self.get_dataset_path(overture_type), filesystem=self.filesystem)
+
+            with self._lock:
+                self._datasets[overture_type] = dataset
+
+            return dataset
+
+    def get_schema(self, overture_type: str) -> pa.Schema:
+        """
+        Get the schema of the dataset for an overture type.
+
+        Args:
+            overture_type: Overture feature type.
+
+        Returns:
+            PyArrow schema for the overture type.
+        """
+        return self.get_dataset(overture_type).schema
+
+    def get_fragment_index_path(self, overture_type: str) -> Path:
+        """
+        Get the path the fragment index for an overture type in the pinned release is saved to.
+
+        Args:
+            overture_type: Overture feature type.
+
+        Returns:
+            Path to the saved fragment index.
+        """
+        return (
+            self.catalog.cache_dir
+            / "index"
+            / self.catalog.root_hash
+            / self.release
+            / f"{self.validate_overture_type(overture_type)}.parquet"
+        )
+
+    def get_fragment_index(self, overture_type: str) -> FragmentIndex:
+        """
+        Get the fragment index for an overture type, loading it from disk if previously built, or building and
+        saving it if not. Since releases are immutable, the index is only built once for each release.
+
+        Args:
+            overture_type: Overture feature type.
+
+        Returns:
+            Fragment index for the overture type.
+        """
+        # get the lock for the type, so an index is only built once, while indices of other types build concurrently
+        with self._lock:
+            if overture_type in self._indices:
+                return self._indices[overture_type]
+            type_lock = self._index_locks.setdefault(overture_type, threading.Lock())
+
+        with type_lock:
+            # another thread may have finished building the index while waiting for the lock
+            with self._lock:
+                if overture_type in self._indices:
+                    return self._indices[overture_type]
+
+            index_path = self.get_fragment_index_path(overture_type)
+            dataset_path = self.get_dataset_path(overture_type)
+
+            # load the saved index, unless saved by an earlier version with a different index schema
+            index = None
+            if index_path.exists():
+                try:
+                    index = FragmentIndex.load(index_path, dataset_path)
+                except ValueError as error:
+                    logger.debug(f"{error} Rebuilding the index.")
+
+            if index is None:
+                logger.info(
+                    f"Building the fragment index for '{overture_type}' in release {self.release}."
+                )
+                index = FragmentIndex.build(self.get_dataset(overture_type), dataset_path)
+                index.save(index_path)
+
+            with self._lock:
+                self._indices[overture_type] = index
+
+            return index
+
+    def get_indexed_dataset(
+        self,
+        overture_type: str,
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        files: Optional[list[str]] = None,
+    ) -> ds.Dataset:
+        """
+        Get a PyArrow dataset for an overture type made up of only the files and row groups intersecting a
+        bounding box, using the fragment index.
+
+        Args:
+            overture_type: Overture feature type.
+            bbox: Bounding box (xmin, ymin, xmax, ymax).
+            files: Optional names of the files, relative to the dataset directory, to limit the dataset to.
+
+        Returns:
+            PyArrow dataset with the intersecting fragments.
+        """
+        return self.get_fragment_index(overture_type).get_dataset(self.filesystem, bbox, files=files)
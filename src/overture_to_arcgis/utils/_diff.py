@@ -0,0 +1,250 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._aoi import AOI_BBOX_COLUMN, AreaOfInterest, resolve_aoi
+from ._client import OvertureClient
+from ._logging import get_logger
+from ._query import get_bbox_filter, resolve_where
+
+__all__ = ["ReleaseDiff", "diff_releases"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# column compared by default to detect changed features, incremented by Overture whenever a feature changes
+DEFAULT_FINGERPRINT: str = "version"
+
+# name of the fingerprint column in the key tables
+FINGERPRINT_COLUMN: str = "__fingerprint"
+
+
+@dataclass(frozen=True)
+class ReleaseDiff:
+    """
+    Features added, deleted and changed between two releases for an overture type and area, identified by the
+    Overture `id`.
+
+    Args:
+        overture_type: Overture feature type compared.
+        base_release: Earlier release compared against.
+        release: Later release.
+        added: Ids of the features only in the later release.
+        deleted: Ids of the features only in the earlier release.
+        changed: Ids of the features in both releases with a different fingerprint.
+        unchanged: Number of features in both releases with the same fingerprint.
+    """
+
+    overture_type: str
+    base_release: str
+    release: str
+    added: list[str]
+    deleted: list[str]
+    changed: list[str]
+    unchanged: int
+
+    def __str__(self) -> str:
+        return (
+            f"'{self.overture_type}' changes from release {self.base_release} to {self.release}: "
+            f"{len(self.added):,} added, {len(self.deleted):,} deleted, {len(self.changed):,} changed and "
+            f"{self.unchanged:,} unchanged."
+        )
+
+    @property
+    def updated_ids(self) -> list[str]:
+        """Ids of the features to fetch from the later release, so those added or changed."""
+        return self.added + self.changed
+
+    @property
+    def removed_ids(self) -> list[str]:
+        """Ids of the features to remove from an output of the earlier release, so those deleted or changed."""
+        return self.deleted + self.changed
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether nothing changed between the releases."""
+        return len(self.added) == 0 and len(self.deleted) == 0 and len(self.changed) == 0
+
+    def get_filter(self) -> pc.Expression:
+        """
+        Get a filter selecting only the added and changed features, so only these are fetched from the later
+        release, e.g. as the `where` filter for `get_record_batches`.
+
+        Returns:
+            PyArrow compute expression.
+        """
+        return pc.field("id").isin(pa.array(self.updated_ids, type=pa.string()))
+
+
+def _get_fingerprints(
+    client: OvertureClient,
+    overture_type: str,
+    bbox: tuple[float, float, float, float],
+    fingerprint: list[str],
+    where: Optional[Union[str, pc.Expression]],
+    aoi: Optional[AreaOfInterest],
+) -> pa.Table:
+    """
+    Scan only the id and fingerprint columns of the features in the bounding box, reducing the fingerprint columns
+    to a single value for each feature.
+
+    Args:
+        client: Client for the release to scan.
+        overture_type: Overture feature type.
+        bbox: Bounding box of the features.
+        fingerprint: Columns making up the fingerprint, including nested field paths.
+        where: Optional attribute filter.
+        aoi: Optional area of interest, tested using the feature bounding boxes.
+
+    Returns:
+        Table with the `id` and fingerprint columns.
+    """
+    # late import to avoid a circular import
+    from .__main__ import _scan_record_batches, convert_complex_columns_to_strings
+
+    # project only the id, the fingerprint columns and, for an area of interest, the feature bounding boxes
+    columns = {"id": pc.field("id")}
+    for column in fingerprint:
+        columns["_".join(column.split("."))] = pc.field(*column.split("."))
+    if aoi is not None:
+        columns[AOI_BBOX_COLUMN] = pc.field("bbox")
+    fingerprint_names = [name for name in columns if name not in ("id", AOI_BBOX_COLUMN)]
+
+    dataset_filter = get_bbox_filter(bbox)
+    if where is not None:
+        dataset_filter = dataset_filter & resolve_where(where)
+
+    batches = _scan_record_batches(
+        client, overture_type, bbox, dataset_filter, columns, client.scan_options, use_index=True
+    )
+
+    tables = []
+    for batch in batches:
+        # keep only the features with bounding boxes intersecting the area of interest
+        if aoi is not None:
+            bbox_column = batch.column(AOI_BBOX_COLUMN)
+            xmin, ymin, xmax, ymax = (
+                pc.struct_field(bbox_column, name).to_numpy(zero_copy_only=False).astype(np.float64)
+                for name in ["xmin", "ymin", "xmax", "ymax"]
+            )
+            batch = batch.filter(pa.array(aoi.intersects_bboxes(xmin, ymin, xmax, ymax)))
+
+        # use a single integer column, such as the version, directly, and otherwise hash the columns
+        values = batch.select(fingerprint_names)
+        if len(fingerprint_names) == 1 and pa.types.is_integer(values.schema.field(0).type):
+            fingerprint_values = values.column(0).cast(pa.int64())
+        else:
+            frame = convert_complex_columns_to_strings(values).to_pandas()
+            fingerprint_values = pa.array(pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64))
+
+        tables.append(pa.table({"id": batch.column("id"), FINGERPRINT_COLUMN: fingerprint_values}))
+
+    if len(tables) == 0:
+        return pa.table({"id": pa.array([], type=pa.string()), FINGERPRINT_COLUMN: pa.array([], type=pa.int64())})
+
+    return pa.concat_tables(tables)
+
+
+def diff_releases(
+    overture_type: str,
+    bbox: Optional[tuple[float, float, float, float]] = None,
+    base_release: Optional[str] = None,
+    client: Optional[OvertureClient] = None,
+    where: Optional[Union[str, pc.Expression]] = None,
+    aoi: Optional[Union[AreaOfInterest, bytes, str, dict]] = None,
+    fingerprint: Union[str, list[str]] = DEFAULT_FINGERPRINT,
+) -> ReleaseDiff:
+    """
+    Find the features added, deleted and changed between two releases for an overture type and area, reading only
+    the `id` and fingerprint columns of each release, so the geometry and attributes only need to be fetched for
+    the features which changed.
+
+    ``` python
+    from overture_to_arcgis.utils import OvertureClient, diff_releases, get_record_batches
+
+    client = OvertureClient()
+    diff = diff_releases("building", bbox, client=client)
+    print(diff)
+
+    # fetch only the added and changed features
+    batches = get_record_batches("building", bbox, client=client, where=diff.get_filter())
+    ```
+
+    Args:
+        overture_type: Overture feature type to compare.
+        bbox: Bounding box (xmin, ymin, xmax, ymax). Optional if an area of interest is provided.
+        base_release: Earlier release to compare against. If not provided, the release before the client release
+            is used.
+        client: Optional `OvertureClient` for the later release. If not provided, a client for the current release
+            is created.
+        where: Optional attribute filter, so features no longer matching the filter are reported as deleted.
+        aoi: Optional polygon or multipolygon area of interest. Features are matched to the area using their
+            bounding boxes only, so features near the area not intersecting it may be included. Since these are
+            removed when the added and changed features are fetched using the area, and deleting features not in
+            an output has no effect, the result of an update is unaffected.
+        fingerprint: Column, or list of columns, compared to detect changed features. A single integer column,
+            such as the default `version`, is compared directly, while other columns are hashed, e.g.
+            `["names.primary", "geometry"]` to only detect changes in the name and shape.
+
+    Returns:
+        Features added, deleted and changed.
+    """
+    # late import to avoid a circular import
+    from .__main__ import validate_bounding_box
+
+    if client is None:
+        client = OvertureClient()
+
+    if base_release is None:
+        base_release = client.get_previous_release()
+    if base_release == client.release:
+        raise ValueError(f"The base release must differ from the client release: {base_release}.")
+    base_client = client.for_release(base_release)
+
+    # validate the type is in both releases
+    client.validate_overture_type(overture_type)
+    base_client.validate_overture_type(overture_type)
+
+    # resolve the area of interest, using the extent of the area if no bounding box is provided
+    if aoi is not None:
+        aoi = resolve_aoi(aoi)
+        bbox = aoi.bbox if bbox is None else bbox
+    bbox = validate_bounding_box(bbox)
+
+    if isinstance(fingerprint, str):
+        fingerprint = [fingerprint]
+    if len(fingerprint) == 0:
+        raise ValueError("Invalid fingerprint: at least one column is required.")
+
+    # get the ids and fingerprints of both releases
+    current = _get_fingerprints(client, overture_type, bbox, fingerprint, where, aoi)
+    base = _get_fingerprints(base_client, overture_type, bbox, fingerprint, where, aoi)
+
+    # features only in one of the releases
+    added = current.filter(pc.invert(pc.is_in(current["id"], value_set=base["id"])))["id"]
+    deleted = base.filter(pc.invert(pc.is_in(base["id"], value_set=current["id"])))["id"]
+
+    # features in both releases with a different fingerprint, with missing fingerprints in both considered equal
+    joined = current.join(base, keys="id", join_type="inner", right_suffix="_base")
+    left, right = joined[FINGERPRINT_COLUMN], joined[f"{FINGERPRINT_COLUMN}_base"]
+    differs = pc.fill_null(pc.not_equal(left, right), True)
+    differs = pc.and_(differs, pc.invert(pc.and_(pc.is_null(left), pc.is_null(right))))
+    changed = joined.filter(differs)["id"]
+
+    diff = ReleaseDiff(
+        overture_type=overture_type,
+        base_release=base_release,
+        release=client.release,
+        added=added.to_pylist(),
+        deleted=deleted.to_pylist(),
+        changed=changed.to_pylist(),
+        unchanged=joined.num_rows - len(changed),
+    )
+
+    logger.debug(str(diff))
+
+    return diff
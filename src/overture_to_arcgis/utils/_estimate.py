@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+import math
+from typing import Optional
+
+from ._client import OvertureClient
+from ._logging import get_logger
+from ._tiling import DEFAULT_TILE_ROWS, DEFAULT_TILE_WORKERS, get_tile_size
+
+__all__ = ["ExtractEstimate", "estimate_extract"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# maximum number of tiles scanned concurrently when picked from the estimate
+MAX_TILE_WORKERS: int = 8
+
+
+def _format_bytes(value: int) -> str:
+    """Format a number of bytes using binary units."""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if value < 1024:
+            return f"{value:,.0f} {unit}" if unit == "B" else f"{value:,.1f} {unit}"
+        value /= 1024
+    return f"{value:,.1f} TB"
+
+
+@dataclass(frozen=True)
+class ExtractEstimate:
+    """
+    Estimated size of an extract, computed from the fragment index, so from the Parquet row group statistics and
+    the `bbox` column alone, without reading any data.
+
+    Args:
+        overture_type: Overture feature type of the extract.
+        bbox: Bounding box of the extract.
+        files: Number of files with data in the bounding box.
+        row_groups: Number of row groups with data in the bounding box.
+        rows: Estimated number of features in the bounding box.
+        compressed_bytes: Compressed bytes of the row groups intersecting the bounding box, which are fetched.
+        output_bytes: Projected uncompressed size of the features in the bounding box.
+        tile_size: Tile size recommended for the extract, or `None` if the extract does not need to be tiled.
+        tile_workers: Number of tiles recommended to scan concurrently.
+    """
+
+    overture_type: str
+    bbox: tuple[float, float, float, float]
+    files: int
+    row_groups: int
+    rows: int
+    compressed_bytes: int
+    output_bytes: int
+    tile_size: Optional[float]
+    tile_workers: int
+
+    def __str__(self) -> str:
+        return (
+            f"Estimated {self.rows:,} '{self.overture_type}' features from {self.files:,} files, fetching "
+            f"{_format_bytes(self.compressed_bytes)} with a projected output of {_format_bytes(self.output_bytes)}."
+        )
+
+
+def estimate_extract(
+    overture_type: str,
+    bbox: tuple[float, float, float, float],
+    client: Optional[OvertureClient] = None,
+    target_tile_rows: int = DEFAULT_TILE_ROWS,
+) -> ExtractEstimate:
+    """
+    Estimate the number of features, bytes fetched and output size of an extract before running it, using only
+    the fragment index built from the Parquet row group statistics.
+
+    The estimate assumes features are spread evenly over the extent of each row group, so is most accurate for
+    larger areas. Since row groups are fetched in full, the bytes fetched are those of every intersecting row
+    group.
+
+    ``` python
+    from overture_to_arcgis import estimate_extract
+
+    estimate = estimate_extract("building", (-123.0, 45.5, -122.0, 46.0))
+    print(estimate)
+    ```
+
+    Args:
+        overture_type: Overture feature type.
+        bbox: Bounding box (xmin, ymin, xmax, ymax).
+        client: Optional `OvertureClient` to use. If not provided, a client for the current release is created.
+        target_tile_rows: Target number of features in each tile, used for the recommended tiling.
+
+    Returns:
+        Estimate for the extract.
+    """
+    # late import to avoid a circular import
+    from .__main__ import validate_bounding_box
+
+    if client is None:
+        client = OvertureClient()
+
+    client.validate_overture_type(overture_type)
+    bbox = validate_bounding_box(bbox)
+
+    index = client.get_fragment_index(overture_type)
+    totals = index.estimate(bbox)
+
+    # recommend tiling so each tile has about the target number of features, and scan up to a limited number of
+    # tiles concurrently
+    tile_size = get_tile_size(index, bbox, target_rows=target_tile_rows)
+    tile_count = math.ceil(totals["rows"] / target_tile_rows) if tile_size is not None else 1
+    tile_workers = max(1, min(MAX_TILE_WORKERS, tile_count)) if tile_size is not None else DEFAULT_TILE_WORKERS
+
+    estimate = ExtractEstimate(
+        overture_type=overture_type,
+        bbox=bbox,
+        files=totals["files"],
+        row_groups=totals["row_groups"],
+        rows=totals["rows"],
+        compressed_bytes=totals["compressed_bytes"],
+        output_bytes=totals["uncompressed_bytes"],
+        tile_size=tile_size,
+        tile_workers=tile_workers,
+    )
+
+    logger.debug(str(estimate))
+
+    return estimate
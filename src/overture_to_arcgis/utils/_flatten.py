@@ -0,0 +1,220 @@
+from dataclasses import dataclass
+import re
+from typing import Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._logging import get_logger
+from ._query import _get_field_type
+
+__all__ = ["FlattenField", "OVERTURE_FLATTEN_SPEC", "flatten_batch"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# prefix of the helper columns holding the nested fields read for flattening, added to the projection
+FLATTEN_COLUMN_PREFIX: str = "__flatten_"
+
+# pattern for a step of a flatten path, a field name optionally followed by a list index, or `*` to join the list
+_STEP_PATTERN = re.compile(r"^([^\[\]]+)((?:\[(?:-?\d+|\*)\])*)$")
+
+
+def _parse_path(path: str) -> list[Union[str, int]]:
+    """Split a flatten path into steps, with field names as strings, list indices as integers and a join as `*`."""
+    steps = []
+    for part in path.split("."):
+        match = _STEP_PATTERN.match(part)
+        if match is None:
+            raise ValueError(f"Invalid flatten path: '{path}'.")
+        steps.append(match.group(1))
+        for index in re.findall(r"\[(-?\d+|\*)\]", match.group(2)):
+            steps.append(index if index == "*" else int(index))
+
+    if "*" in steps[:-1]:
+        raise ValueError(f"Invalid flatten path: '{path}'. A list can only be joined at the end of the path.")
+
+    return steps
+
+
+@dataclass(frozen=True)
+class FlattenField:
+    """
+    Value pulled out of a nested column into its own column, read while the data is still in Arrow so no JSON
+    needs to be parsed afterwards.
+
+    The path is made up of field names separated by dots, each optionally followed by a list index in brackets,
+    such as `websites[0]` for the first website, or `[*]` to join all the values of a list into a single string,
+    such as `categories.alternate[*]`. Joining is only allowed at the end of the path.
+
+    Args:
+        path: Path to the value, e.g. `names.primary`, `websites[0]` or `categories.alternate[*]`.
+        separator: Separator used when joining the values of a list.
+        max_length: Optional maximum length of string values, such as the length of the output text field.
+            Longer values are set to null.
+    """
+
+    path: str
+    separator: str = ", "
+    max_length: Optional[int] = None
+
+    def __post_init__(self):
+        if self.max_length is not None and (not isinstance(self.max_length, int) or self.max_length < 1):
+            raise ValueError(f"Invalid maximum length: {self.max_length}. Must be a positive integer.")
+        _parse_path(self.path)
+
+    @property
+    def steps(self) -> list[Union[str, int]]:
+        """Steps of the path, with field names as strings, list indices as integers and a join as `*`."""
+        return _parse_path(self.path)
+
+    @property
+    def field_path(self) -> list[str]:
+        """Leading struct field names of the path, which are read directly by the scanner."""
+        field_path = []
+        for step in self.steps:
+            if not isinstance(step, str) or step == "*":
+                break
+            field_path.append(step)
+        return field_path
+
+
+# values pulled out of the Overture nested columns, replacing `add_primary_name`, `add_primary_category_field`,
+# `add_alternate_category_field` and `add_website_field`
+OVERTURE_FLATTEN_SPEC: dict[str, FlattenField] = {
+    "primary_name": FlattenField("names.primary"),
+    "primary_category": FlattenField("categories.primary"),
+    "alternate_category": FlattenField("categories.alternate[*]"),
+    "website": FlattenField("websites[0]", max_length=255),
+}
+
+
+def resolve_flatten(
+    flatten: Union[bool, dict[str, Union[str, FlattenField]]], schema: pa.Schema
+) -> dict[str, FlattenField]:
+    """
+    Resolve a flatten spec to the fields available in a schema, so a spec such as `OVERTURE_FLATTEN_SPEC` can be
+    used for any overture type, skipping the fields of nested columns the type does not have.
+
+    Args:
+        flatten: `True` for `OVERTURE_FLATTEN_SPEC`, or a dictionary of output column names and paths or
+            `FlattenField` instances.
+        schema: Schema of the dataset.
+
+    Returns:
+        Dictionary of output column names and `FlattenField` instances available in the schema.
+    """
+    if flatten is True:
+        flatten = OVERTURE_FLATTEN_SPEC
+    elif not isinstance(flatten, dict):
+        raise ValueError(f"Invalid flatten spec: {flatten}. Must be True or a dictionary of column names and paths.")
+
+    resolved = {}
+    for name, field in flatten.items():
+        if isinstance(field, str):
+            field = FlattenField(field)
+        elif not isinstance(field, FlattenField):
+            raise ValueError(f"Invalid flatten field for '{name}': {field}. Must be a path or a FlattenField.")
+
+        # skip the fields not in the schema
+        if _get_field_type(schema, field.field_path) is None:
+            logger.debug(f"Skipping flattened column '{name}', since '{field.path}' is not in the schema.")
+            continue
+
+        resolved[name] = field
+
+    return resolved
+
+
+def get_flatten_projection(flatten: dict[str, FlattenField]) -> dict[str, pc.Expression]:
+    """
+    Get the helper columns to add to the projection for a resolved flatten spec, so only the nested fields needed
+    are read.
+
+    Args:
+        flatten: Resolved flatten spec.
+
+    Returns:
+        Dictionary of helper column names and field expressions.
+    """
+    return {f"{FLATTEN_COLUMN_PREFIX}{name}": pc.field(*field.field_path) for name, field in flatten.items()}
+
+
+def _get_list_element(array: pa.Array, index: int) -> pa.Array:
+    """Get an element of each list by index, counting from the end if negative, or null if out of range."""
+    offsets = array.offsets.to_numpy(zero_copy_only=False)
+    lengths = np.diff(offsets)
+    in_range = (lengths > index) if index >= 0 else (lengths >= -index)
+    if array.null_count > 0:
+        in_range &= array.is_valid().to_numpy(zero_copy_only=False)
+
+    # take from the list values, using the start or end of each list
+    positions = (offsets[:-1] + index) if index >= 0 else (offsets[1:] + index)
+    indices = pa.array(np.where(in_range, positions, 0), mask=~in_range)
+    return pc.take(array.values, indices)
+
+
+def _flatten_array(array: pa.Array, field: FlattenField) -> pa.Array:
+    """Apply the steps of a flatten path after the leading struct fields, read by the scanner, to an array."""
+    for step in field.steps[len(field.field_path):]:
+        if step == "*":
+            if not (pa.types.is_list(array.type) or pa.types.is_large_list(array.type)):
+                raise ValueError(f"Cannot join '{field.path}', since the values are not lists.")
+            array = pc.binary_join(pc.cast(array, pa.list_(pa.string())), field.separator)
+        elif isinstance(step, int):
+            if not (pa.types.is_list(array.type) or pa.types.is_large_list(array.type)):
+                raise ValueError(f"Cannot index '{field.path}', since the values are not lists.")
+            array = _get_list_element(array, step)
+        else:
+            if not pa.types.is_struct(array.type):
+                raise ValueError(f"Cannot get '{step}' of '{field.path}', since the values are not structs.")
+            array = pc.struct_field(array, step)
+
+    # treat empty strings as null, and set strings longer than the maximum length to null
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        lengths = pc.utf8_length(array)
+        empty = pc.equal(lengths, 0)
+        if field.max_length is not None:
+            too_long = pc.greater(lengths, field.max_length)
+            too_long_count = pc.sum(too_long).as_py() or 0
+            if too_long_count > 0:
+                logger.warning(
+                    f"{too_long_count:,} values of '{field.path}' exceed {field.max_length} characters and are set "
+                    f"to null."
+                )
+            empty = pc.or_(empty, too_long)
+        array = pc.if_else(pc.fill_null(empty, False), pa.scalar(None, array.type), array)
+
+    return array
+
+
+def flatten_batch(batch: pa.RecordBatch, flatten: dict[str, FlattenField]) -> pa.RecordBatch:
+    """
+    Add the flattened columns to a record batch, computed from the helper columns added to the projection, and
+    drop the helper columns.
+
+    Args:
+        batch: Record batch including the helper columns.
+        flatten: Resolved flatten spec.
+
+    Returns:
+        Record batch with the flattened columns added.
+    """
+    fields = [field for field in batch.schema if not field.name.startswith(FLATTEN_COLUMN_PREFIX)]
+    names = [field.name for field in fields]
+    arrays = [batch.column(name) for name in names]
+
+    for name, flatten_field in flatten.items():
+        array = _flatten_array(batch.column(f"{FLATTEN_COLUMN_PREFIX}{name}"), flatten_field)
+
+        # replace a column with the same name, or add the column
+        if name in names:
+            fields[names.index(name)] = pa.field(name, array.type)
+            arrays[names.index(name)] = array
+        else:
+            names.append(name)
+            fields.append(pa.field(name, array.type))
+            arrays.append(array)
+
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields, metadata=batch.schema.metadata))
@@ -0,0 +1,288 @@
+from dataclasses import dataclass
+import json
+import math
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._logging import get_logger
+from ._wkb import PART_LINESTRING, PART_RING, WkbCoordinates, _get_ranges, read_wkb_coordinates, write_wkb_coordinates
+
+__all__ = ["GeometryProcessing", "process_batch_geometry", "process_wkb"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# minimum number of vertices kept for each kind of part, so linestrings and closed rings are never collapsed
+MIN_LINESTRING_VERTICES: int = 2
+MIN_RING_VERTICES: int = 4
+
+
+@dataclass(frozen=True)
+class GeometryProcessing:
+    """
+    Geometry processing applied to the WKB coordinates while reading, so extracts for web delivery are smaller and
+    faster to write and draw.
+
+    Coordinates are first snapped to a grid of the precision, dropping the repeated vertices this creates, then
+    linestrings and polygon rings are simplified using the Douglas-Peucker algorithm, dropping the vertices within
+    the tolerance of the simplified line. Each part keeps its first and last vertex, and a part which would have
+    too few vertices left, such as a ring smaller than the tolerance, is kept as snapped, so no part is collapsed
+    or removed. Points are only snapped.
+
+    Each part is simplified on its own, so validity is not guaranteed. A simplified ring may intersect itself,
+    and a hole may cross its exterior ring or another hole, or end up outside its exterior ring. Keep the tolerance
+    well below the size of the features, or repair the geometries after writing if valid polygons are required.
+
+    Args:
+        precision: Optional size of the grid to snap coordinates to in decimal degrees, such as `0.000001`, about
+            0.1 meters at the equator.
+        tolerance: Optional simplification tolerance in decimal degrees, such as `0.00001`, about a meter at the
+            equator.
+    """
+
+    precision: Optional[float] = None
+    tolerance: Optional[float] = None
+
+    def __post_init__(self):
+        for name in ["precision", "tolerance"]:
+            value = getattr(self, name)
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value < 1
+            ):
+                raise ValueError(f"Invalid {name}: {value}. Must be a positive number of decimal degrees below 1.")
+        if self.precision is None and self.tolerance is None:
+            raise ValueError("Geometry processing needs a precision, a tolerance or both.")
+
+    @property
+    def decimals(self) -> Optional[int]:
+        """Decimal places for a precision which is a power of ten, so coordinates are rounded exactly."""
+        if self.precision is None:
+            return None
+        decimals = -math.log10(self.precision)
+        return round(decimals) if math.isclose(decimals, round(decimals)) else None
+
+
+def resolve_geometry_processing(
+    geometry_processing: Union[GeometryProcessing, dict],
+) -> GeometryProcessing:
+    """
+    Resolve the geometry processing from a `GeometryProcessing` or a dictionary of its arguments.
+
+    Args:
+        geometry_processing: Geometry processing or dictionary with the `precision` and `tolerance`.
+
+    Returns:
+        Geometry processing.
+    """
+    if isinstance(geometry_processing, GeometryProcessing):
+        return geometry_processing
+    if isinstance(geometry_processing, dict):
+        return GeometryProcessing(**geometry_processing)
+    raise ValueError(
+        f"Invalid geometry processing: {geometry_processing}. Must be a GeometryProcessing or a dictionary."
+    )
+
+
+def _snap_coordinates(coords: np.ndarray, processing: GeometryProcessing) -> np.ndarray:
+    """Snap coordinates to the grid of the precision, rounding to decimal places if the precision allows."""
+    if processing.decimals is not None:
+        return np.round(coords, processing.decimals)
+    return np.round(coords / processing.precision) * processing.precision
+
+
+def _get_min_vertices(part_kinds: np.ndarray) -> np.ndarray:
+    """Get the minimum number of vertices each part needs to not be collapsed."""
+    return np.select(
+        [part_kinds == PART_RING, part_kinds == PART_LINESTRING], [MIN_RING_VERTICES, MIN_LINESTRING_VERTICES], 1
+    )
+
+
+def _keep_valid_parts(keep: np.ndarray, part_offsets: np.ndarray, part_kinds: np.ndarray) -> np.ndarray:
+    """Keep all the vertices of the parts which would have too few vertices left."""
+    counts = np.diff(part_offsets)
+    filled = counts > 0
+    kept_counts = np.zeros(len(counts), dtype=np.int64)
+    kept_counts[filled] = np.add.reduceat(keep.astype(np.int64), part_offsets[:-1][filled])
+    too_few = filled & (kept_counts < np.minimum(_get_min_vertices(part_kinds), counts))
+    keep[_get_ranges(part_offsets[:-1][too_few], counts[too_few])] = True
+    return keep
+
+
+def _get_repeated_vertex_mask(coords: np.ndarray, part_offsets: np.ndarray) -> np.ndarray:
+    """Get which vertices to keep, dropping the vertices repeating the previous vertex of the same part."""
+    keep = np.ones(len(coords), dtype=bool)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    keep[part_offsets[:-1][np.diff(part_offsets) > 0]] = True
+    return keep
+
+
+def _get_simplify_mask(
+    coords: np.ndarray, part_offsets: np.ndarray, part_kinds: np.ndarray, tolerance: float
+) -> np.ndarray:
+    """
+    Get which vertices to keep simplifying the linestrings and rings using the Douglas-Peucker algorithm.
+
+    Rather than recursing into each part, all the spans between kept vertices of all the parts are processed in each
+    step, finding the vertex farthest from each span, and splitting the spans with a vertex farther than the
+    tolerance, so the number of steps is set by the most complex part rather than the number of parts.
+
+    Args:
+        coords: Array of x and y coordinates with shape (vertices, 2).
+        part_offsets: Offsets into the coordinates for each part.
+        part_kinds: Kind of each part.
+        tolerance: Simplification tolerance.
+
+    Returns:
+        Boolean array of the vertices to keep.
+    """
+    counts = np.diff(part_offsets)
+    simplified = np.isin(part_kinds, [PART_LINESTRING, PART_RING]) & (counts > 2)
+
+    # keep all the vertices of the parts not simplified, and the first and last vertices of the others
+    keep = np.ones(len(coords), dtype=bool)
+    keep[_get_ranges(part_offsets[:-1][simplified], counts[simplified])] = False
+    starts = part_offsets[:-1][simplified]
+    ends = part_offsets[1:][simplified] - 1
+    keep[starts] = True
+    keep[ends] = True
+
+    # contiguous x and y arrays, gathered much faster than the rows of the coordinates
+    x, y = np.ascontiguousarray(coords[:, 0]), np.ascontiguousarray(coords[:, 1])
+    squared_tolerance = tolerance * tolerance
+
+    while len(starts) > 0:
+        # the interior vertices of each span
+        lengths = ends - starts - 1
+        spans = lengths > 0
+        starts, ends, lengths = starts[spans], ends[spans], lengths[spans]
+        if len(starts) == 0:
+            break
+        vertices = _get_ranges(starts + 1, lengths)
+        span_offsets = np.cumsum(lengths) - lengths
+
+        # the segment between the ends of each span, repeated for its interior vertices
+        ax, ay = x[starts], y[starts]
+        dx, dy = x[ends] - ax, y[ends] - ay
+        squared_length = dx * dx + dy * dy
+        inverse_length = np.divide(1.0, squared_length, out=np.zeros(len(starts)), where=squared_length > 0)
+        ax, ay, dx, dy, inverse_length = (
+            np.repeat(values, lengths) for values in (ax, ay, dx, dy, inverse_length)
+        )
+
+        # squared distance of each interior vertex to the segment, which is the distance to the start for the
+        # closed spans of rings
+        px, py = x[vertices] - ax, y[vertices] - ay
+        t = np.clip((px * dx + py * dy) * inverse_length, 0, 1)
+        ex, ey = px - t * dx, py - t * dy
+        distances = ex * ex + ey * ey
+
+        # the first vertex farthest from each span
+        max_distances = np.maximum.reduceat(distances, span_offsets)
+        candidates = np.where(distances == np.repeat(max_distances, lengths), vertices, len(coords))
+        farthest = np.minimum.reduceat(candidates, span_offsets)
+
+        # keep the farthest vertices beyond the tolerance, splitting the spans there
+        split = max_distances > squared_tolerance
+        keep[farthest[split]] = True
+        starts = np.concatenate([starts[split], farthest[split]])
+        ends = np.concatenate([farthest[split], ends[split]])
+
+    return keep
+
+
+def _compress(coordinates: WkbCoordinates, keep: np.ndarray) -> WkbCoordinates:
+    """Drop the vertices not kept, updating the part offsets."""
+    part_offsets = np.zeros(len(coordinates.part_offsets), dtype=np.int64)
+    filled = np.diff(coordinates.part_offsets) > 0
+    kept_counts = np.zeros(len(filled), dtype=np.int64)
+    kept_counts[filled] = np.add.reduceat(keep.astype(np.int64), coordinates.part_offsets[:-1][filled])
+    np.cumsum(kept_counts, out=part_offsets[1:])
+    return WkbCoordinates(
+        coords=coordinates.coords[keep],
+        part_offsets=part_offsets,
+        part_kinds=coordinates.part_kinds,
+        geometry_offsets=coordinates.geometry_offsets,
+        valid=coordinates.valid,
+        null=coordinates.null,
+        geometry_types=coordinates.geometry_types,
+        exterior=coordinates.exterior,
+    )
+
+
+def process_wkb(
+    values: Union[pa.Array, pa.ChunkedArray], processing: GeometryProcessing
+) -> Tuple[pa.Array, int, int]:
+    """
+    Snap and simplify WKB geometries, processing the coordinates of all the geometries at once as flat NumPy arrays,
+    and writing these back to WKB.
+
+    Geometries which cannot be processed, such as malformed geometries and geometry collections, are kept as they
+    are, and null values stay null. Processed geometries are written as little endian 2D WKB.
+
+    Args:
+        values: WKB geometries as a PyArrow binary array.
+        processing: Geometry processing to apply.
+
+    Returns:
+        Tuple of the processed WKB geometries, and the number of vertices before and after processing.
+    """
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks() if values.num_chunks > 0 else pa.array([], pa.binary())
+
+    coordinates = read_wkb_coordinates(values)
+    before_count = len(coordinates.coords)
+
+    # snap the coordinates to the grid, dropping the repeated vertices this creates
+    if processing.precision is not None:
+        coordinates.coords = _snap_coordinates(coordinates.coords, processing)
+        keep = _get_repeated_vertex_mask(coordinates.coords, coordinates.part_offsets)
+        keep = _keep_valid_parts(keep, coordinates.part_offsets, coordinates.part_kinds)
+        coordinates = _compress(coordinates, keep)
+
+    # simplify the linestrings and rings
+    if processing.tolerance is not None:
+        keep = _get_simplify_mask(
+            coordinates.coords, coordinates.part_offsets, coordinates.part_kinds, processing.tolerance
+        )
+        keep = _keep_valid_parts(keep, coordinates.part_offsets, coordinates.part_kinds)
+        coordinates = _compress(coordinates, keep)
+
+    # write the processed geometries, keeping the values which could not be written
+    processed = write_wkb_coordinates(coordinates)
+    processed = pc.if_else(processed.is_valid(), processed, values.cast(processed.type))
+
+    return processed, before_count, len(coordinates.coords)
+
+
+def process_batch_geometry(
+    batch: pa.RecordBatch, processing: GeometryProcessing
+) -> Tuple[pa.RecordBatch, int, int]:
+    """
+    Snap and simplify the geometry column of a record batch.
+
+    Args:
+        batch: Record batch with a WKB geometry column, and GeoParquet metadata naming it.
+        processing: Geometry processing to apply.
+
+    Returns:
+        Tuple of the record batch with the processed geometry, and the number of vertices before and after
+        processing.
+    """
+    # get the geometry column from the geoparquet metadata
+    geo_meta = (batch.schema.metadata or {}).get(b"geo")
+    geom_col = json.loads(geo_meta.decode("utf-8")).get("primary_column", "geometry") if geo_meta else "geometry"
+    geo_fld_idx = batch.schema.get_field_index(geom_col)
+    if geo_fld_idx < 0:
+        return batch, 0, 0
+
+    geometry, before_count, after_count = process_wkb(batch.column(geo_fld_idx), processing)
+    geo_fld = batch.schema.field(geo_fld_idx)
+    arrays = batch.columns
+    arrays[geo_fld_idx] = geometry
+    schema = batch.schema.set(geo_fld_idx, pa.field(geom_col, geometry.type, metadata=geo_fld.metadata))
+    batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    return batch, before_count, after_count
@@ -0,0 +1,367 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
+
+from ._logging import get_logger
+
+__all__ = ["FragmentIndex"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# default maximum number of file footers read concurrently when building an index
+DEFAULT_MAX_INDEX_WORKERS: int = 32
+
+# schema of the index table, one row per row group
+INDEX_SCHEMA: pa.Schema = pa.schema(
+    [
+        ("file", pa.string()),
+        ("row_group", pa.int32()),
+        ("num_rows", pa.int64()),
+        ("compressed_bytes", pa.int64()),
+        ("uncompressed_bytes", pa.int64()),
+        ("xmin", pa.float64()),
+        ("ymin", pa.float64()),
+        ("xmax", pa.float64()),
+        ("ymax", pa.float64()),
+    ]
+)
+
+# bbox struct columns and the statistic used for the row group extent
+BBOX_STATISTICS: dict[str, tuple[str, str, float]] = {
+    "xmin": ("bbox.xmin", "min", -180.0),
+    "ymin": ("bbox.ymin", "min", -90.0),
+    "xmax": ("bbox.xmax", "max", 180.0),
+    "ymax": ("bbox.ymax", "max", 90.0),
+}
+
+
+def read_row_group_extents(
+    filesystem: fs.FileSystem, path: str, file_name: str
+) -> list[dict]:
+    """
+    Read the footer of a Parquet file and get the extent, row count and size of each row group from the statistics
+    of the `bbox` struct columns.
+
+    If statistics are missing for a row group, the extent defaults to the whole world, so the row group is never
+    incorrectly skipped.
+
+    Args:
+        filesystem: PyArrow filesystem to read with.
+        path: Path to the Parquet file.
+        file_name: Name recorded for the file in the index.
+
+    Returns:
+        List of dictionaries, one for each row group, matching the index schema.
+    """
+    with filesystem.open_input_file(path) as handle:
+        metadata = pq.ParquetFile(handle).metadata
+
+    rows = []
+    for rg_idx in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg_idx)
+
+        # get the columns by path so the bbox statistics can be looked up
+        columns = {
+            row_group.column(col_idx).path_in_schema: row_group.column(col_idx)
+            for col_idx in range(row_group.num_columns)
+        }
+
+        row = {
+            "file": file_name,
+            "row_group": rg_idx,
+            "num_rows": row_group.num_rows,
+            "compressed_bytes": sum(col.total_compressed_size for col in columns.values()),
+            "uncompressed_bytes": row_group.total_byte_size,
+        }
+
+        # get the extent from the statistics, falling back to the world extent
+        for key, (col_path, stat, default) in BBOX_STATISTICS.items():
+            col = columns.get(col_path)
+            stats = col.statistics if col is not None else None
+            if stats is not None and stats.has_min_max:
+                row[key] = float(getattr(stats, stat))
+            else:
+                row[key] = default
+
+        rows.append(row)
+
+    return rows
+
+
+class FragmentIndex:
+    """
+    Spatial index of the extent of every file and row group in an Overture dataset, so bounding box queries only
+    open the files with data in the area of interest instead of reading the footer of every file in the dataset.
+
+    Since releases are immutable, the index for a release only needs to be built once, and is saved as a small
+    Parquet sidecar file for reuse.
+
+    Args:
+        table: Index table with one row per row group, matching `INDEX_SCHEMA`.
+        schema: Schema of the indexed dataset.
+        dataset_path: Path to the directory of the indexed dataset, the file names are relative to.
+    """
+
+    def __init__(self, table: pa.Table, schema: pa.Schema, dataset_path: str):
+        self.table = table
+        self.schema = schema
+        self.dataset_path = dataset_path.rstrip("/")
+
+    def __repr__(self) -> str:
+        return (
+            f"FragmentIndex(dataset_path='{self.dataset_path}', files={self.file_count}, "
+            f"row_groups={self.table.num_rows})"
+        )
+
+    @property
+    def file_count(self) -> int:
+        """Number of files in the index."""
+        return len(pc.unique(self.table["file"]))
+
+    @classmethod
+    def build(
+        cls,
+        dataset: ds.FileSystemDataset,
+        dataset_path: str,
+        max_workers: int = DEFAULT_MAX_INDEX_WORKERS,
+    ) -> "FragmentIndex":
+        """
+        Build the index by reading the footer of every file in a dataset concurrently.
+
+        Args:
+            dataset: PyArrow dataset to index.
+            dataset_path: Path to the directory of the dataset.
+            max_workers: Maximum number of file footers read concurrently.
+
+        Returns:
+            Fragment index for the dataset.
+        """
+        dataset_path = dataset_path.rstrip("/")
+        files = dataset.files
+
+        # file names are saved relative to the dataset directory
+        prefix = f"{dataset_path}/" if dataset_path else ""
+
+        def read_extents(path: str) -> list[dict]:
+            file_name = path[len(prefix):] if path.startswith(prefix) else path
+            return read_row_group_extents(dataset.filesystem, path, file_name)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as executor:
+            rows = [row for file_rows in executor.map(read_extents, files) for row in file_rows]
+
+        table = pa.Table.from_pylist(rows, schema=INDEX_SCHEMA)
+
+        logger.debug(f"Built fragment index for {len(files)} files and {table.num_rows} row groups.")
+
+        return cls(table, dataset.schema, dataset_path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], dataset_path: str) -> "FragmentIndex":
+        """
+        Load an index saved to disk.
+
+        Args:
+            path: Path to the saved index.
+            dataset_path: Path to the directory of the indexed dataset.
+
+        Returns:
+            Fragment index.
+        """
+        table = pq.read_table(str(path))
+
+        # an index saved by an earlier version with different columns needs to be rebuilt
+        if not table.schema.remove_metadata().equals(INDEX_SCHEMA):
+            raise ValueError(f"Fragment index {path} does not match the current index schema.")
+
+        schema = pa.ipc.read_schema(
+            pa.py_buffer(base64.b64decode(table.schema.metadata[b"dataset_schema"]))
+        )
+        return cls(table.replace_schema_metadata(None), schema, dataset_path)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """
+        Save the index to disk as a Parquet file, with the dataset schema in the file metadata.
+
+        Args:
+            path: Path to save the index to.
+
+        Returns:
+            Path to the saved index.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # keep the dataset schema so the dataset does not need to be discovered when using the index
+        schema_b64 = base64.b64encode(self.schema.serialize().to_pybytes())
+        table = self.table.replace_schema_metadata({b"dataset_schema": schema_b64})
+
+        # write to a process specific temporary file first so readers never see a partial index
+        tmp_pth = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, str(tmp_pth))
+        os.replace(tmp_pth, path)
+
+        return path
+
+    def query(
+        self,
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        files: Optional[list[str]] = None,
+    ) -> pa.Table:
+        """
+        Get the row groups with an extent intersecting a bounding box.
+
+        Args:
+            bbox: Bounding box (xmin, ymin, xmax, ymax). If not provided, all row groups are returned.
+            files: Optional names of the files to limit the row groups to.
+
+        Returns:
+            Index table rows for the intersecting row groups.
+        """
+        table = self.table
+
+        if files is not None:
+            table = table.filter(pc.field("file").isin(files))
+
+        if bbox is None:
+            return table
+
+        xmin, ymin, xmax, ymax = bbox
+        return table.filter(
+            (pc.field("xmin") <= xmax)
+            & (pc.field("xmax") >= xmin)
+            & (pc.field("ymin") <= ymax)
+            & (pc.field("ymax") >= ymin)
+        )
+
+    @staticmethod
+    def _get_overlap_fractions(
+        matches: pa.Table, bbox: Optional[tuple[float, float, float, float]]
+    ) -> Union[pa.Array, float]:
+        """Get the fraction of the extent of each row group overlapping a bounding box."""
+        if bbox is None or matches.num_rows == 0:
+            return 1.0
+
+        xmin, ymin, xmax, ymax = bbox
+
+        # get the width and height of the overlap of each row group extent with the bounding box
+        overlap_width = pc.subtract(
+            pc.min_element_wise(matches["xmax"], xmax), pc.max_element_wise(matches["xmin"], xmin)
+        )
+        overlap_height = pc.subtract(
+            pc.min_element_wise(matches["ymax"], ymax), pc.max_element_wise(matches["ymin"], ymin)
+        )
+
+        # get the fraction of each row group extent overlapping, treating a degenerate extent dimension, such as
+        # for a row group of points along a line, as fully overlapping along that dimension
+        width = pc.subtract(matches["xmax"], matches["xmin"])
+        height = pc.subtract(matches["ymax"], matches["ymin"])
+        width_fraction = pc.if_else(pc.greater(width, 0), pc.divide(overlap_width, width), 1.0)
+        height_fraction = pc.if_else(pc.greater(height, 0), pc.divide(overlap_height, height), 1.0)
+
+        return pc.multiply(width_fraction, height_fraction)
+
+    def estimate(self, bbox: Optional[tuple[float, float, float, float]] = None) -> dict[str, int]:
+        """
+        Estimate the size of the data in a bounding box from the index alone, assuming the features in each
+        intersecting row group are spread evenly over the extent of the row group.
+
+        Args:
+            bbox: Bounding box (xmin, ymin, xmax, ymax). If not provided, the totals for the dataset are returned.
+
+        Returns:
+            Dictionary with the number of intersecting `files` and `row_groups`, the estimated `rows` and
+            `uncompressed_bytes` in the bounding box, and the `compressed_bytes` of the intersecting row groups,
+            which are read in full.
+        """
+        matches = self.query(bbox)
+        fractions = self._get_overlap_fractions(matches, bbox)
+
+        def scaled_sum(column: str) -> int:
+            return int(round(pc.sum(pc.multiply(matches[column], fractions)).as_py() or 0))
+
+        return {
+            "files": len(pc.unique(matches["file"])),
+            "row_groups": matches.num_rows,
+            "rows": scaled_sum("num_rows"),
+            "compressed_bytes": int(pc.sum(matches["compressed_bytes"]).as_py() or 0),
+            "uncompressed_bytes": scaled_sum("uncompressed_bytes"),
+        }
+
+    def estimate_rows(
+        self, bbox: Optional[tuple[float, float, float, float]] = None
+    ) -> int:
+        """
+        Estimate the number of features in a bounding box, assuming the features in each intersecting row group
+        are spread evenly over the extent of the row group.
+
+        Args:
+            bbox: Bounding box (xmin, ymin, xmax, ymax). If not provided, the total number of rows is returned.
+
+        Returns:
+            Estimated number of features.
+        """
+        return self.estimate(bbox)["rows"]
+
+    def get_dataset(
+        self,
+        filesystem: fs.FileSystem,
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        files: Optional[list[str]] = None,
+    ) -> ds.FileSystemDataset:
+        """
+        Create a dataset made up of only the files and row groups intersecting a bounding box.
+
+        Args:
+            filesystem: PyArrow filesystem the dataset is read from.
+            bbox: Bounding box (xmin, ymin, xmax, ymax). If not provided, all row groups are included.
+            files: Optional names of the files to limit the dataset to.
+
+        Returns:
+            PyArrow dataset with the intersecting fragments.
+        """
+        return self.get_row_group_dataset(filesystem, self.query(bbox, files=files))
+
+    def get_row_group_dataset(self, filesystem: fs.FileSystem, row_groups: pa.Table) -> ds.FileSystemDataset:
+        """
+        Create a dataset made up of only a selection of row groups, such as those returned by `query`.
+
+        Args:
+            filesystem: PyArrow filesystem the dataset is read from.
+            row_groups: Index table rows with the `file` and `row_group` of each row group to include.
+
+        Returns:
+            PyArrow dataset with the row groups.
+        """
+        # group the row groups by file
+        file_row_groups: dict[str, list[int]] = {}
+        for file_name, rg_idx in zip(
+            row_groups["file"].to_pylist(), row_groups["row_group"].to_pylist()
+        ):
+            file_row_groups.setdefault(file_name, []).append(rg_idx)
+
+        # create fragments reading only the selected row groups of each file
+        file_format = ds.ParquetFileFormat()
+        fragments = [
+            file_format.make_fragment(
+                f"{self.dataset_path}/{file_name}" if self.dataset_path else file_name,
+                filesystem=filesystem,
+                row_groups=sorted(rg_ids),
+            )
+            for file_name, rg_ids in sorted(file_row_groups.items())
+        ]
+
+        logger.debug(
+            f"Fragment index selected {row_groups.num_rows} of {self.table.num_rows} row groups in "
+            f"{len(fragments)} files."
+        )
+
+        return ds.FileSystemDataset(fragments, self.schema, file_format, filesystem)
@@ -0,0 +1,169 @@
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._logging import get_logger
+
+__all__ = ["encode_json_strings"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# separators matching the `json.dumps` defaults
+ITEM_SEPARATOR: str = ", "
+KEY_SEPARATOR: str = ": "
+
+# representations of the special float values matching `json.dumps`
+_SPECIAL_FLOATS = {"nan": "NaN", "inf": "Infinity", "-inf": "-Infinity"}
+
+# range of absolute float values the Arrow string cast formats as Python does, apart from the trailing `.0` of
+# whole numbers, while smaller and larger values are formatted with exponents differently
+FAST_FLOAT_MIN: float = 1e-4
+FAST_FLOAT_MAX: float = 1e10
+
+# characters escaped by `json.dumps` with the default `ensure_ascii`, which are anything but printable ASCII, and
+# the quote and backslash
+ESCAPED_CHARACTERS: str = r"[^\x20-\x21\x23-\x5b\x5d-\x7e]"
+
+
+class _UnsupportedType(Exception):
+    """Raised for a type the columnar encoder does not handle, so the values are encoded one at a time."""
+
+
+def _float_token(value: float) -> str:
+    """Get the JSON representation of a float, matching `json.dumps`."""
+    token = float.__repr__(value)
+    return _SPECIAL_FLOATS.get(token, token)
+
+
+def _join(*parts: Union[str, pa.Array]) -> pa.Array:
+    """Concatenate string arrays and scalar strings element wise."""
+    return pc.binary_join_element_wise(*parts, "")
+
+
+def _encode_floats(array: pa.Array) -> pa.Array:
+    """Encode float values, using the Arrow string cast where it matches `json.dumps`, and Python otherwise."""
+    # floats are converted to Python as doubles, so format the double value of any single precision floats
+    doubles = pc.cast(array, pa.float64()).fill_null(0.0)
+    values = doubles.to_numpy(zero_copy_only=False)
+    magnitudes = np.abs(values)
+    fast = (magnitudes >= FAST_FLOAT_MIN) & (magnitudes < FAST_FLOAT_MAX)
+
+    # add the trailing `.0` Python adds to whole numbers
+    tokens = pc.cast(doubles, pa.string())
+    whole = pa.array(fast & (values == np.floor(values)))
+    tokens = pc.if_else(whole, _join(tokens, ".0"), tokens)
+
+    # format the remaining values using Python
+    slow = ~fast
+    if slow.any():
+        replacements = pa.array(list(map(_float_token, values[slow].tolist())), pa.string())
+        tokens = pc.replace_with_mask(tokens, pa.array(slow), replacements)
+
+    return tokens
+
+
+def _encode_strings(array: pa.Array) -> pa.Array:
+    """Encode string values, quoting these directly unless any characters need escaping."""
+    array = pc.cast(array.fill_null(""), pa.string())
+    tokens = _join('"', array, '"')
+
+    # escape the values with any characters needing escaping using Python
+    escape = pc.match_substring_regex(array, ESCAPED_CHARACTERS)
+    if pc.any(escape).as_py():
+        values = array.filter(escape).to_pylist()
+        replacements = pa.array(list(map(encode_basestring_ascii, values)), pa.string())
+        tokens = pc.replace_with_mask(tokens, escape, replacements)
+
+    return tokens
+
+
+def _join_lists(offsets: pa.Array, tokens: pa.Array, large: bool) -> pa.Array:
+    """Join the tokens of each list, given by the list offsets, and wrap these in brackets."""
+    list_type = pa.LargeListArray if large else pa.ListArray
+    joined = pc.binary_join(list_type.from_arrays(offsets, tokens), ITEM_SEPARATOR)
+    return _join("[", joined, "]")
+
+
+def _encode(array: pa.Array) -> pa.Array:
+    """Encode each value of an array as a JSON string, with null values encoded as `null`."""
+    data_type = array.type
+
+    if pa.types.is_dictionary(data_type):
+        return _encode(array.dictionary_decode())
+
+    if pa.types.is_null(data_type):
+        return pa.nulls(len(array), pa.string()).fill_null("null")
+
+    if pa.types.is_boolean(data_type):
+        tokens = pc.if_else(array, "true", "false")
+
+    elif pa.types.is_integer(data_type):
+        tokens = pc.cast(array, pa.string())
+
+    elif pa.types.is_float32(data_type) or pa.types.is_float64(data_type):
+        tokens = _encode_floats(array)
+
+    elif pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        tokens = _encode_strings(array)
+
+    # structs as objects with the fields in schema order
+    elif pa.types.is_struct(data_type):
+        parts = ["{"]
+        for idx in range(data_type.num_fields):
+            if idx > 0:
+                parts.append(ITEM_SEPARATOR)
+            parts.append(encode_basestring_ascii(data_type.field(idx).name) + KEY_SEPARATOR)
+            parts.append(_encode(array.field(idx)))
+        parts.append("}")
+        tokens = _join(*parts) if data_type.num_fields > 0 else pa.array(["{}"] * len(array), pa.string())
+
+    # lists, encoding the values of all the lists at once before joining by the offsets
+    elif pa.types.is_list(data_type) or pa.types.is_large_list(data_type):
+        values = _encode(array.values)
+        tokens = _join_lists(array.offsets, values, pa.types.is_large_list(data_type))
+
+    # maps as a list of key and value pairs, matching the PyArrow conversion of a map to Python
+    elif pa.types.is_map(data_type):
+        pairs = _join("[", _encode(array.keys), ITEM_SEPARATOR, _encode(array.items), "]")
+        tokens = _join_lists(array.offsets, pairs, False)
+
+    else:
+        raise _UnsupportedType(str(data_type))
+
+    # encode the null values
+    if array.null_count > 0:
+        tokens = pc.if_else(array.is_valid(), tokens, "null")
+
+    return tokens
+
+
+def encode_json_strings(array: Union[pa.Array, pa.ChunkedArray]) -> Union[pa.Array, pa.ChunkedArray]:
+    """
+    Encode each value of a nested array, such as a struct, list or map column, as a JSON string, identical to
+    `json.dumps(value.as_py())` for each value.
+
+    Rather than converting every value to Python, the child arrays are encoded once each using Arrow compute, and
+    the JSON strings are assembled by concatenating the child strings element wise and joining the list values by
+    the list offsets. Only strings needing escaping and floats the Arrow string cast formats differently, such as
+    very small or large values, are converted to Python to match the `json` module. Types the columnar encoding
+    does not handle, such as timestamps, are encoded one value at a time.
+
+    Args:
+        array: PyArrow array or chunked array.
+
+    Returns:
+        String array, or chunked array if a chunked array was provided, of JSON strings.
+    """
+    if isinstance(array, pa.ChunkedArray):
+        return pa.chunked_array([encode_json_strings(chunk) for chunk in array.chunks], type=pa.string())
+
+    try:
+        return _encode(array)
+    except _UnsupportedType as error:
+        logger.debug(f"Encoding '{array.type}' values one at a time, since {error} is not supported.")
+        return pa.array([json.dumps(value.as_py()) for value in array], pa.string())
@@ -0,0 +1,169 @@
+import re
+from typing import Iterable, Iterator, Union
+
+import pyarrow as pa
+
+from ._logging import get_logger
+
+__all__ = ["MemoryBudget", "iter_table_chunks", "parse_memory_size"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# memory budget used when streaming dataframes if none is given
+DEFAULT_MAX_MEMORY: str = "1GB"
+
+# share of the memory budget used for batches read ahead by the scanner, with the rest used for the chunk being
+# converted
+READAHEAD_SHARE: float = 0.25
+
+# approximate size of a spatially enabled dataframe relative to the Arrow data it is converted from, since the
+# geometries become Python objects and the strings are copied into Python strings
+DATAFRAME_EXPANSION: float = 8.0
+
+# row size assumed when no estimate is available
+DEFAULT_ROW_BYTES: int = 1024
+
+# smallest batch size used to fit a memory budget, below which the per batch overhead dominates
+MIN_BATCH_SIZE: int = 1024
+
+# multipliers for the memory size units, using binary units
+_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+
+
+def parse_memory_size(value: Union[int, float, str]) -> int:
+    """
+    Parse a memory size given in bytes or as a string with units, such as `512MB` or `4 GB`. Units are binary, so
+    `1KB` is 1,024 bytes, and `KiB`, `MiB`, etc. are accepted as well.
+
+    Args:
+        value: Memory size in bytes or as a string with units.
+
+    Returns:
+        Memory size in bytes.
+    """
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([KMGT]?I?B?)\s*", value.upper())
+        if match is None:
+            raise ValueError(f"Invalid memory size: '{value}'. Use bytes or a size such as '512MB' or '4GB'.")
+        number, unit = match.groups()
+        size = float(number) * _UNITS[unit.replace("I", "")]
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        size = value
+    else:
+        raise ValueError(f"Invalid memory size: {value}. Use bytes or a size such as '512MB' or '4GB'.")
+
+    if size < 1:
+        raise ValueError(f"Invalid memory size: {value}. Must be positive.")
+
+    return int(size)
+
+
+class MemoryBudget:
+    """
+    Split a memory budget between the stages of the pipeline, so the batches read ahead by the scanner, the chunk
+    of batches being combined and the dataframe it is converted to together stay within the budget.
+
+    The budget is a target rather than a hard limit, since the sizes are estimated from the Arrow buffers and the
+    average row size, so should be set with some headroom below the memory available.
+
+    Args:
+        max_memory: Memory budget in bytes or as a string with units, such as `2GB`.
+        row_bytes: Average size of a row in bytes, used to size the batches read ahead, e.g. from the output bytes
+            and rows of an `ExtractEstimate`.
+    """
+
+    def __init__(self, max_memory: Union[int, float, str], row_bytes: int = DEFAULT_ROW_BYTES):
+        self.max_memory = parse_memory_size(max_memory)
+        self.row_bytes = max(1, int(row_bytes))
+
+    def __repr__(self) -> str:
+        return f"MemoryBudget(max_memory={self.max_memory}, row_bytes={self.row_bytes})"
+
+    @property
+    def readahead_bytes(self) -> int:
+        """Bytes available for the batches read ahead by the scanner."""
+        return int(self.max_memory * READAHEAD_SHARE)
+
+    @property
+    def chunk_bytes(self) -> int:
+        """Maximum Arrow bytes combined into a chunk, leaving room for the dataframe it is converted to."""
+        return max(1, int(self.max_memory * (1 - READAHEAD_SHARE) / (1 + DATAFRAME_EXPANSION)))
+
+    def get_scan_options(self, scan_options, streams: int = 1):
+        """
+        Reduce the batch size and read ahead of scan options so the batches in flight fit the read ahead share of
+        the budget. Settings already within the budget are kept.
+
+        Args:
+            scan_options: `ScanOptions` to reduce.
+            streams: Number of scans running concurrently with these options, such as tiles, which share the read
+                ahead budget.
+
+        Returns:
+            Scan options fitting the budget.
+        """
+        # split the read ahead budget between the concurrent scans
+        readahead_bytes = self.readahead_bytes // max(1, streams)
+
+        # keep enough batches in flight for the fragment and batch read ahead to have an effect
+        batch_size = min(scan_options.batch_size, readahead_bytes // (self.row_bytes * 4))
+        batch_size = max(MIN_BATCH_SIZE, batch_size)
+
+        # number of batches fitting in the read ahead budget, split between the files and the batches within each
+        batches_in_flight = max(1, readahead_bytes // (batch_size * self.row_bytes))
+        fragment_readahead = max(1, min(scan_options.fragment_readahead, int(batches_in_flight**0.5)))
+        batch_readahead = max(1, min(scan_options.batch_readahead, batches_in_flight // fragment_readahead))
+
+        budget_options = scan_options.replace(
+            batch_size=batch_size, fragment_readahead=fragment_readahead, batch_readahead=batch_readahead
+        )
+
+        if budget_options != scan_options:
+            logger.debug(
+                f"Reduced the scan read ahead to fit the memory budget of {self.max_memory:,} bytes: batch size "
+                f"{batch_size:,}, fragment read ahead {fragment_readahead}, batch read ahead {batch_readahead}."
+            )
+
+        return budget_options
+
+
+def iter_table_chunks(batches: Iterable[pa.RecordBatch], max_bytes: int) -> Iterator[pa.Table]:
+    """
+    Combine record batches into tables of at most a maximum size, splitting batches larger than the maximum, so
+    each table can be converted on its own within a memory budget. Empty batches are skipped.
+
+    Args:
+        batches: Record batches to combine.
+        max_bytes: Maximum size of each table in Arrow bytes.
+
+    Returns:
+        Iterator of tables.
+    """
+    if not isinstance(max_bytes, int) or max_bytes < 1:
+        raise ValueError(f"Invalid chunk size: {max_bytes}. Must be a positive integer.")
+
+    chunk: list[pa.RecordBatch] = []
+    chunk_bytes = 0
+
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+
+        # split a batch too large for a chunk into slices of about the maximum size
+        row_bytes = max(1, batch.nbytes // batch.num_rows)
+        slice_rows = max(1, max_bytes // row_bytes)
+        for offset in range(0, batch.num_rows, slice_rows):
+            piece = batch.slice(offset, slice_rows)
+            piece_bytes = row_bytes * piece.num_rows
+
+            # emit the current chunk if the piece does not fit
+            if chunk and chunk_bytes + piece_bytes > max_bytes:
+                yield pa.Table.from_batches(chunk)
+                chunk, chunk_bytes = [], 0
+
+            chunk.append(piece)
+            chunk_bytes += piece_bytes
+
+    if chunk:
+        yield pa.Table.from_batches(chunk)
@@ -0,0 +1,175 @@
+import queue
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+from ._logging import get_logger
+
+__all__ = ["BatchPrefetcher"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# default number of batches held in the prefetch queue
+DEFAULT_PREFETCH_DEPTH: int = 4
+
+# marker put on the queue when the source is exhausted
+_END = object()
+
+
+class _SourceError:
+    """Wrapper for an exception raised by the source, so it is raised again in the consuming thread."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class BatchPrefetcher:
+    """
+    Iterate a source of record batches on a background thread, keeping a bounded queue of batches ready, so
+    fetching the next batches overlaps with converting and writing the current batch in the consuming thread.
+
+    The queue depth caps the memory used, since the background thread waits once the queue is full. The time each
+    stage spends working and waiting on the other is recorded, showing which stage is the bottleneck.
+
+    ``` python
+    from overture_to_arcgis.utils import BatchPrefetcher, get_record_batches
+
+    prefetcher = BatchPrefetcher(get_record_batches("building", bbox), max_queue=8)
+    for batch in prefetcher:
+        table_to_features(batch, output_features=...)
+
+    print(prefetcher.stats)
+    ```
+
+    Args:
+        source: Iterable of record batches, such as the generator returned by `get_record_batches`.
+        max_queue: Maximum number of batches fetched ahead of the consumer.
+    """
+
+    def __init__(self, source: Iterable[Any], max_queue: int = DEFAULT_PREFETCH_DEPTH):
+        if not isinstance(max_queue, int) or max_queue < 1:
+            raise ValueError(f"Invalid prefetch queue depth: {max_queue}. Must be a positive integer.")
+
+        self.source = source
+        self.max_queue = max_queue
+
+        # stage timings in seconds
+        self.fetch_busy = 0.0
+        self.fetch_idle = 0.0
+        self.consume_busy = 0.0
+        self.consume_idle = 0.0
+
+        # counters
+        self.batches = 0
+        self.rows = 0
+        self.max_depth = 0
+
+        self._queue: Optional[queue.Queue] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._iterated = False
+
+    def __repr__(self) -> str:
+        return f"BatchPrefetcher(max_queue={self.max_queue})"
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Busy and idle seconds for the fetch and consume stages, with the batch and row counts."""
+        return {
+            "fetch_busy": round(self.fetch_busy, 3),
+            "fetch_idle": round(self.fetch_idle, 3),
+            "consume_busy": round(self.consume_busy, 3),
+            "consume_idle": round(self.consume_idle, 3),
+            "batches": self.batches,
+            "rows": self.rows,
+            "max_depth": self.max_depth,
+        }
+
+    def _put(self, item: Any) -> bool:
+        """Put an item on the queue, waiting while full, and return False if the consumer stopped."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                self.max_depth = max(self.max_depth, self._queue.qsize())
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch(self) -> None:
+        """Read the source into the queue, run on the background thread."""
+        try:
+            iterator = iter(self.source)
+            while not self._stop.is_set():
+                # time getting the next batch from the source
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self.fetch_busy += time.perf_counter() - start
+
+                # time waiting for space in the queue
+                start = time.perf_counter()
+                if not self._put(item):
+                    return
+                self.fetch_idle += time.perf_counter() - start
+
+        except BaseException as error:
+            self._put(_SourceError(error))
+            return
+
+        self._put(_END)
+
+    def start(self) -> "BatchPrefetcher":
+        """
+        Start fetching on the background thread before iterating, so batches are ready once the consumer starts.
+        Iterating starts fetching if not already started.
+
+        Returns:
+            The prefetcher, for chaining.
+        """
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._thread = threading.Thread(target=self._fetch, name="overture-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the background thread, such as when the batches are no longer needed."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._iterated:
+            raise RuntimeError("A BatchPrefetcher can only be iterated once.")
+        self._iterated = True
+        self.start()
+
+        try:
+            while True:
+                # time waiting for the next batch
+                start = time.perf_counter()
+                item = self._queue.get()
+                self.consume_idle += time.perf_counter() - start
+
+                if item is _END:
+                    break
+                if isinstance(item, _SourceError):
+                    raise item.error
+
+                self.batches += 1
+                self.rows += getattr(item, "num_rows", 0)
+
+                # time the consumer spends with the batch before asking for the next
+                start = time.perf_counter()
+                yield item
+                self.consume_busy += time.perf_counter() - start
+
+        # stop the background thread if the consumer stops early or fails
+        finally:
+            self.close()
+
+        logger.debug(f"Prefetch pipeline statistics: {self.stats}")
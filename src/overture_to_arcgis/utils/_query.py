@@ -0,0 +1,336 @@
+import re
+from typing import Any, Optional, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._logging import get_logger
+
+__all__ = ["COLUMN_PRESETS", "get_bbox_filter", "get_column_preset", "parse_where", "resolve_columns", "resolve_where"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# named column selections for each overture type, nested struct fields are referenced using dotted paths
+COLUMN_PRESETS: dict[str, dict[str, list[str]]] = {
+    "segment": {
+        "lite": ["id", "subtype", "class", "subclass", "names.primary"],
+    },
+    "connector": {
+        "lite": ["id"],
+    },
+    "building": {
+        "lite": ["id", "subtype", "class", "height", "num_floors", "names.primary"],
+    },
+    "place": {
+        "lite": ["id", "names.primary", "categories.primary", "confidence"],
+    },
+}
+
+# columns always included, since these are needed to convert the data to features
+REQUIRED_COLUMNS: list[str] = ["geometry"]
+
+
+def get_column_preset(overture_type: str, preset: str) -> list[str]:
+    """
+    Get the list of columns for a named column preset.
+
+    Args:
+        overture_type: Overture feature type the preset is defined for.
+        preset: Name of the preset, such as `lite`.
+
+    Returns:
+        List of column names and dotted nested field paths.
+    """
+    type_presets = COLUMN_PRESETS.get(overture_type, {})
+    if preset not in type_presets:
+        raise ValueError(
+            f"Invalid column preset '{preset}' for overture type '{overture_type}'. Available presets are: "
+            f"{list(type_presets.keys())}"
+        )
+    return list(type_presets[preset])
+
+
+def _get_field_type(schema: pa.Schema, path: list[str]) -> Optional[pa.DataType]:
+    """Walk a schema along a nested field path, returning the type of the field, or None if not found."""
+    # get the top level field
+    if path[0] not in schema.names:
+        return None
+    field_type = schema.field(path[0]).type
+
+    # walk into the struct children for each subsequent part of the path
+    for name in path[1:]:
+        if not pa.types.is_struct(field_type) or field_type.get_field_index(name) < 0:
+            return None
+        field_type = field_type.field(name).type
+
+    return field_type
+
+
+def resolve_columns(
+    columns: Union[str, list[str]], schema: pa.Schema, overture_type: Optional[str] = None
+) -> dict[str, pc.Expression]:
+    """
+    Resolve a column selection to the projection passed to the dataset scanner, so only the Parquet column chunks
+    needed are read.
+
+    Columns can be top level column names, such as `class`, or dotted paths to nested struct fields, such as
+    `names.primary`. Nested fields are returned as columns named using the path with underscores, e.g.
+    `names_primary`. The geometry column is always included.
+
+    Args:
+        columns: List of column names and nested field paths, or the name of a column preset for the overture type.
+        schema: Schema of the dataset to validate the columns against.
+        overture_type: Overture feature type, needed to look up a column preset.
+
+    Returns:
+        Dictionary of output column names and field expressions.
+    """
+    # if a preset name, get the columns for the preset
+    if isinstance(columns, str):
+        columns = get_column_preset(overture_type, columns)
+
+    # ensure the required columns are included, without duplicating any requested
+    columns = list(columns) + [col for col in REQUIRED_COLUMNS if col not in columns]
+
+    projection = {}
+    for column in columns:
+        # split the nested field path into parts and validate the field exists
+        path = column.split(".")
+        if _get_field_type(schema, path) is None:
+            raise ValueError(
+                f"Invalid column: '{column}' is not in the schema. Available columns are: {schema.names}"
+            )
+
+        # add the field expression using the path as the name
+        projection["_".join(path)] = pc.field(*path)
+
+    logger.debug(f"Resolved column projection: {list(projection.keys())}")
+
+    return projection
+
+
+def get_bbox_filter(
+    bbox: tuple[float, float, float, float], inclusive: bool = False
+) -> pc.Expression:
+    """
+    Get the filter expression selecting features with a `bbox` intersecting a bounding box.
+
+    Args:
+        bbox: Bounding box (xmin, ymin, xmax, ymax).
+        inclusive: Whether features only touching the edge of the bounding box are included.
+
+    Returns:
+        PyArrow compute expression.
+    """
+    xmin, ymin, xmax, ymax = bbox
+    if inclusive:
+        return (
+            (pc.field("bbox", "xmin") <= xmax)
+            & (pc.field("bbox", "xmax") >= xmin)
+            & (pc.field("bbox", "ymin") <= ymax)
+            & (pc.field("bbox", "ymax") >= ymin)
+        )
+    return (
+        (pc.field("bbox", "xmin") < xmax)
+        & (pc.field("bbox", "xmax") > xmin)
+        & (pc.field("bbox", "ymin") < ymax)
+        & (pc.field("bbox", "ymax") > ymin)
+    )
+
+
+# tokens recognized in where clause strings, in order of precedence when matching
+_WHERE_TOKEN_PATTERN = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>-?\d+\.\d*(?:[eE][-+]?\d+)?|-?\.\d+(?:[eE][-+]?\d+)?|-?\d+(?:[eE][-+]?\d+)?)
+        |(?P<string>'(?:[^']|'')*')
+        |(?P<operator><=|>=|<>|!=|==|=|<|>)
+        |(?P<punctuation>[(),])
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+    )""",
+    re.VERBOSE,
+)
+
+# keywords are matched case insensitively
+_WHERE_KEYWORDS = {"and", "or", "not", "in", "is", "null", "true", "false"}
+
+# comparison operators mapped to the expression building functions
+_WHERE_COMPARISONS = {
+    "=": lambda fld, val: fld == val,
+    "==": lambda fld, val: fld == val,
+    "!=": lambda fld, val: fld != val,
+    "<>": lambda fld, val: fld != val,
+    "<": lambda fld, val: fld < val,
+    "<=": lambda fld, val: fld <= val,
+    ">": lambda fld, val: fld > val,
+    ">=": lambda fld, val: fld >= val,
+}
+
+
+def _tokenize_where(where: str) -> list[tuple[str, str]]:
+    """Split a where clause string into a list of (kind, value) tokens."""
+    tokens = []
+    position = 0
+    where = where.rstrip()
+    while position < len(where):
+        match = _WHERE_TOKEN_PATTERN.match(where, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid where clause, unable to parse at: '{where[position:]}'")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "name" and value.lower() in _WHERE_KEYWORDS:
+            kind, value = "keyword", value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _WhereParser:
+    """
+    Recursive descent parser for the small SQL-like where clause grammar.
+
+        expression := term ("or" term)*
+        term       := factor ("and" factor)*
+        factor     := "not" factor | "(" expression ")" | predicate
+        predicate  := field (comparison literal | ["not"] "in" "(" literal ("," literal)* ")" | "is" ["not"] "null")
+    """
+
+    def __init__(self, where: str):
+        self.where = where
+        self.tokens = _tokenize_where(where)
+        self.position = 0
+
+    def _peek(self) -> tuple[Optional[str], Optional[str]]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def _next(self) -> tuple[Optional[str], Optional[str]]:
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _accept(self, kind: str, value: Optional[str] = None) -> bool:
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: Optional[str] = None) -> str:
+        token_kind, token_value = self._next()
+        if token_kind != kind or (value is not None and token_value != value):
+            raise ValueError(
+                f"Invalid where clause '{self.where}', expected {value or kind} but found '{token_value}'."
+            )
+        return token_value
+
+    def parse(self) -> pc.Expression:
+        expression = self._expression()
+        if self.position < len(self.tokens):
+            raise ValueError(f"Invalid where clause '{self.where}', unexpected '{self._peek()[1]}'.")
+        return expression
+
+    def _expression(self) -> pc.Expression:
+        expression = self._term()
+        while self._accept("keyword", "or"):
+            expression = expression | self._term()
+        return expression
+
+    def _term(self) -> pc.Expression:
+        expression = self._factor()
+        while self._accept("keyword", "and"):
+            expression = expression & self._factor()
+        return expression
+
+    def _factor(self) -> pc.Expression:
+        if self._accept("keyword", "not"):
+            return ~self._factor()
+        if self._accept("punctuation", "("):
+            expression = self._expression()
+            self._expect("punctuation", ")")
+            return expression
+        return self._predicate()
+
+    def _literal(self) -> Any:
+        kind, value = self._next()
+        if kind == "number":
+            return float(value) if any(char in value for char in ".eE") else int(value)
+        if kind == "string":
+            return value[1:-1].replace("''", "'")
+        if kind == "keyword" and value in ("true", "false"):
+            return value == "true"
+        raise ValueError(f"Invalid where clause '{self.where}', expected a literal value but found '{value}'.")
+
+    def _predicate(self) -> pc.Expression:
+        # nested struct fields are referenced using dotted paths
+        field = pc.field(*self._expect("name").split("."))
+
+        kind, value = self._peek()
+
+        # comparison with a single literal value
+        if kind == "operator":
+            self._next()
+            return _WHERE_COMPARISONS[value](field, self._literal())
+
+        # null checks
+        if self._accept("keyword", "is"):
+            negate = self._accept("keyword", "not")
+            self._expect("keyword", "null")
+            return field.is_valid() if negate else field.is_null()
+
+        # membership in a list of literal values
+        negate = self._accept("keyword", "not")
+        self._expect("keyword", "in")
+        self._expect("punctuation", "(")
+        values = [self._literal()]
+        while self._accept("punctuation", ","):
+            values.append(self._literal())
+        self._expect("punctuation", ")")
+
+        # combine equality comparisons rather than using is_in, so nulls follow SQL semantics, even when negated
+        expression = field == values[0]
+        for value in values[1:]:
+            expression = expression | (field == value)
+        return ~expression if negate else expression
+
+
+def parse_where(where: str) -> pc.Expression:
+    """
+    Parse a small SQL-like where clause into a PyArrow compute expression.
+
+    Supported are comparisons (`=`, `!=`, `<>`, `<`, `<=`, `>`, `>=`) against numbers, single quoted strings and
+    `true` or `false`, `in` and `not in` lists, `is null` and `is not null`, combined using `and`, `or`, `not` and
+    parentheses. Nested struct fields are referenced using dotted paths.
+
+    ``` python
+    parse_where("class in ('motorway', 'primary') and names.primary is not null")
+    ```
+
+    Args:
+        where: Where clause string.
+
+    Returns:
+        PyArrow compute expression.
+    """
+    return _WhereParser(where).parse()
+
+
+def resolve_where(where: Union[str, pc.Expression]) -> pc.Expression:
+    """
+    Resolve a where argument to a PyArrow compute expression.
+
+    Args:
+        where: PyArrow compute expression, or a where clause string to parse.
+
+    Returns:
+        PyArrow compute expression.
+    """
+    if isinstance(where, pc.Expression):
+        return where
+    if isinstance(where, str):
+        return parse_where(where)
+    raise ValueError(
+        f"Invalid where argument, must be a PyArrow compute expression or string, not {type(where).__name__}."
+    )
@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._index import FragmentIndex
+from ._logging import get_logger
+
+__all__ = ["Sample"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# name of the helper column holding the feature ids the rows are sampled by, added to the projection
+SAMPLE_ID_COLUMN: str = "__sample_id"
+
+
+@dataclass(frozen=True)
+class Sample:
+    """
+    Reproducible sample of the features in an area, reading only a small share of the data, such as for previewing
+    a type over a large area.
+
+    Row groups are chosen first, in a random order set by the seed, until they hold about the sampled share of the
+    features, so the remaining row groups are never read. If the chosen row groups hold more features than needed,
+    such as when only a few row groups intersect the area, rows are then sampled from these by hashing the feature
+    ids, so the same features are returned however the data is batched.
+
+    Since row groups hold features close to each other, a small sample can be clustered in a few places. To spread
+    the sample over the area, stratify it using a grid, so row groups are taken from each grid cell in turn.
+
+    ``` python
+    from overture_to_arcgis.utils import Sample, get_record_batches
+
+    # 1% of the buildings, spread over a 10 x 10 grid
+    batches = get_record_batches("building", bbox, sample=Sample(0.01, grid=10))
+    ```
+
+    Args:
+        fraction: Share of the features to sample, greater than zero and at most one.
+        seed: Seed making the sample reproducible. The same seed gives the same sample for the same release.
+        grid: Optional number of grid cells along each side of the area to stratify the sample by.
+    """
+
+    fraction: float
+    seed: int = 0
+    grid: Optional[int] = None
+
+    def __post_init__(self):
+        if isinstance(self.fraction, bool) or not isinstance(self.fraction, (int, float)) or not 0 < self.fraction <= 1:
+            raise ValueError(f"Invalid sample fraction: {self.fraction}. Must be greater than zero and at most one.")
+        if not isinstance(self.seed, int):
+            raise ValueError(f"Invalid sample seed: {self.seed}. Must be an integer.")
+        if self.grid is not None and (not isinstance(self.grid, int) or self.grid < 1):
+            raise ValueError(f"Invalid sample grid: {self.grid}. Must be a positive integer.")
+
+    def _get_row_group_keys(self, row_groups: pa.Table) -> np.ndarray:
+        """Get a random key between zero and one for each row group, set by the seed and the row group alone."""
+        return np.array(
+            [
+                int.from_bytes(sha256(f"{self.seed}/{file}/{rg_idx}".encode("utf-8")).digest()[:8], "little") / 2**64
+                for file, rg_idx in zip(row_groups["file"].to_pylist(), row_groups["row_group"].to_pylist())
+            ],
+            dtype=np.float64,
+        )
+
+    def _get_grid_cells(
+        self, row_groups: pa.Table, bbox: tuple[float, float, float, float]
+    ) -> np.ndarray:
+        """Get the grid cell containing the center of each row group extent, clipped to the bounding box."""
+        xmin, ymin, xmax, ymax = bbox
+        x = np.clip((row_groups["xmin"].to_numpy() + row_groups["xmax"].to_numpy()) / 2, xmin, xmax)
+        y = np.clip((row_groups["ymin"].to_numpy() + row_groups["ymax"].to_numpy()) / 2, ymin, ymax)
+        col = np.minimum(self.grid - 1, ((x - xmin) / max(xmax - xmin, 1e-12) * self.grid).astype(np.int64))
+        row = np.minimum(self.grid - 1, ((y - ymin) / max(ymax - ymin, 1e-12) * self.grid).astype(np.int64))
+        return row * self.grid + col
+
+    def select_row_groups(
+        self,
+        index: FragmentIndex,
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        files: Optional[list[str]] = None,
+    ) -> tuple[pa.Table, float]:
+        """
+        Choose the row groups to read for the sample.
+
+        Args:
+            index: Fragment index of the dataset.
+            bbox: Bounding box (xmin, ymin, xmax, ymax) of the area sampled.
+            files: Optional names of the files to limit the row groups to.
+
+        Returns:
+            Index table rows of the chosen row groups, and the share of the rows to sample from these.
+        """
+        matches = index.query(bbox, files=files)
+        if matches.num_rows == 0:
+            return matches, 1.0
+
+        # estimate the features in the area in each row group
+        fractions = index._get_overlap_fractions(matches, bbox)
+        rows = pc.multiply(matches["num_rows"], fractions).to_numpy(zero_copy_only=False).astype(np.float64)
+        target_rows = self.fraction * rows.sum()
+
+        # order the row groups randomly, and if stratified, take the first row group of each cell before the
+        # second of any cell, and so on
+        keys = self._get_row_group_keys(matches)
+        if self.grid is not None:
+            extent = bbox if bbox is not None else (
+                pc.min(matches["xmin"]).as_py(),
+                pc.min(matches["ymin"]).as_py(),
+                pc.max(matches["xmax"]).as_py(),
+                pc.max(matches["ymax"]).as_py(),
+            )
+            cells = self._get_grid_cells(matches, extent)
+            by_cell = np.lexsort((keys, cells))
+            rank = np.empty(len(keys), dtype=np.int64)
+            cell_starts = np.searchsorted(cells[by_cell], cells[by_cell], side="left")
+            rank[by_cell] = np.arange(len(keys)) - cell_starts
+            order = np.lexsort((keys, rank))
+        else:
+            order = np.argsort(keys)
+
+        # take row groups until these hold the features needed, always taking at least one
+        cumulative = np.cumsum(rows[order])
+        count = max(1, int(np.searchsorted(cumulative, target_rows, side="left")) + 1)
+        count = min(count, len(order))
+        chosen = np.sort(order[:count])
+
+        selected_rows = rows[chosen].sum()
+        row_fraction = min(1.0, target_rows / selected_rows) if selected_rows > 0 else 1.0
+
+        logger.debug(
+            f"Sample of {self.fraction:.2%} chose {count:,} of {matches.num_rows:,} row groups, sampling "
+            f"{row_fraction:.2%} of the rows in these."
+        )
+
+        return matches.take(pa.array(chosen)), row_fraction
+
+    def filter_batch(self, batch: pa.RecordBatch, row_fraction: float) -> pa.RecordBatch:
+        """
+        Sample the rows of a record batch by hashing the feature ids, and drop the helper id column added to the
+        projection.
+
+        Args:
+            batch: Record batch including the helper id column.
+            row_fraction: Share of the rows to keep.
+
+        Returns:
+            Record batch with the sampled rows.
+        """
+        # keep the rows with a hash of the id, seeded so different seeds keep different rows, below the fraction
+        if row_fraction < 1.0 and batch.num_rows > 0:
+            ids = batch.column(SAMPLE_ID_COLUMN).to_numpy(zero_copy_only=False)
+            hashes = pd.util.hash_array(ids, hash_key=f"{self.seed % 10**16:016d}", categorize=False)
+            batch = batch.filter(pa.array(hashes / 2.0**64 < row_fraction))
+
+        # remove the helper column
+        return batch.select([name for name in batch.schema.names if name != SAMPLE_ID_COLUMN])
+
+
+def resolve_sample(sample: Union[float, Sample]) -> Sample:
+    """
+    Resolve a sample given as a fraction or a `Sample`.
+
+    Args:
+        sample: Share of the features to sample, or a `Sample`.
+
+    Returns:
+        Sample.
+    """
+    if isinstance(sample, Sample):
+        return sample
+    return Sample(fraction=sample)
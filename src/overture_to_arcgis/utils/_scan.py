@@ -0,0 +1,87 @@
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ._logging import get_logger
+
+__all__ = ["ScanOptions"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+
+@dataclass(frozen=True)
+class ScanOptions:
+    """
+    Settings controlling how the Overture datasets are scanned. The defaults are tuned for high latency object
+    storage such as S3, keeping more files and batches in flight than the PyArrow defaults so throughput is not
+    bound by a few outstanding requests, at the cost of more memory used for read ahead.
+
+    ``` python
+    from overture_to_arcgis.utils import ScanOptions
+
+    # more requests in flight for a fast connection, fewer rows per batch to limit memory
+    scan_options = ScanOptions(fragment_readahead=32, batch_size=65_536)
+    ```
+
+    Args:
+        fragment_readahead: Number of files read ahead concurrently.
+        batch_readahead: Number of batches read ahead within each file.
+        batch_size: Maximum number of rows per record batch.
+        use_threads: Whether to use multiple threads to decode the data.
+        io_thread_count: Optional size of the PyArrow I/O thread pool used for reading, such as `32` for high
+            latency object storage. Since the thread pool is global to PyArrow, this applies to all reads in the
+            process, including those of any host application, so it is only changed if set. If `None`, the
+            default, the thread pool size is not changed.
+        pre_buffer: Whether to coalesce and prefetch the column chunk reads for each row group, which greatly
+            reduces the number of requests to object storage.
+    """
+
+    fragment_readahead: int = 16
+    batch_readahead: int = 32
+    batch_size: int = 131_072
+    use_threads: bool = True
+    io_thread_count: Optional[int] = None
+    pre_buffer: bool = True
+
+    def __post_init__(self):
+        # ensure the integer settings are positive
+        for name in ["fragment_readahead", "batch_readahead", "batch_size", "io_thread_count"]:
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError(f"Invalid scan option {name}: {value}. Must be a positive integer.")
+
+    def replace(self, **changes) -> "ScanOptions":
+        """
+        Create a copy of the scan options with some of the settings changed.
+
+        Args:
+            **changes: Settings to change.
+
+        Returns:
+            Updated scan options.
+        """
+        return replace(self, **changes)
+
+    def apply_io_thread_count(self) -> None:
+        """Resize the PyArrow I/O thread pool, if set and different from the current size."""
+        if self.io_thread_count is not None and pa.io_thread_count() != self.io_thread_count:
+            pa.set_io_thread_count(self.io_thread_count)
+            logger.debug(f"Set the PyArrow I/O thread count to {self.io_thread_count}.")
+
+    def to_scanner_kwargs(self) -> dict[str, Any]:
+        """
+        Get the keyword arguments for creating a PyArrow dataset scanner, e.g. with `Dataset.to_batches`.
+
+        Returns:
+            Dictionary of scanner keyword arguments.
+        """
+        return {
+            "fragment_readahead": self.fragment_readahead,
+            "batch_readahead": self.batch_readahead,
+            "batch_size": self.batch_size,
+            "use_threads": self.use_threads,
+            "fragment_scan_options": ds.ParquetFragmentScanOptions(pre_buffer=self.pre_buffer),
+        }
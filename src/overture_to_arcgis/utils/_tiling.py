@@ -0,0 +1,143 @@
+import math
+from typing import Optional, Union
+
+import numpy as np
+import pyarrow as pa
+
+from ._index import FragmentIndex
+from ._logging import get_logger
+
+__all__ = ["get_tile_size", "split_bbox"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# target number of features in each tile when picking the tile size automatically
+DEFAULT_TILE_ROWS: int = 250_000
+
+# default number of tiles scanned concurrently
+DEFAULT_TILE_WORKERS: int = 4
+
+# number of batches each tile scanned concurrently reads ahead of the tile being yielded
+DEFAULT_TILE_PREFETCH_DEPTH: int = 2
+
+
+def validate_tile_size(tile_size: Optional[Union[float, str]]) -> Optional[Union[float, str]]:
+    """
+    Ensure the tile size is `None`, `auto` or a positive number of decimal degrees.
+
+    Args:
+        tile_size: Tile size to validate.
+
+    Returns:
+        The validated tile size.
+    """
+    if tile_size is None or tile_size == "auto":
+        return tile_size
+    if isinstance(tile_size, bool) or not isinstance(tile_size, (int, float)) or tile_size <= 0:
+        raise ValueError(
+            f"Invalid tile size: {tile_size}. Must be 'auto' or a positive number of decimal degrees."
+        )
+    return float(tile_size)
+
+
+def _get_grid_shape(bbox: tuple[float, float, float, float], tile_size: float) -> tuple[int, int]:
+    """Get the number of columns and rows needed to keep the tiles of a bounding box no larger than the tile size."""
+    tile_size = validate_tile_size(tile_size)
+    xmin, ymin, xmax, ymax = bbox
+    return max(1, math.ceil((xmax - xmin) / tile_size)), max(1, math.ceil((ymax - ymin) / tile_size))
+
+
+def split_bbox(
+    bbox: tuple[float, float, float, float], tile_size: float
+) -> list[tuple[float, float, float, float]]:
+    """
+    Split a bounding box into a grid of tiles no larger than the tile size. The tiles evenly divide the bounding
+    box, and neighboring tiles share exactly the same edge coordinates, so together they cover the bounding box
+    without gaps.
+
+    Args:
+        bbox: Bounding box (xmin, ymin, xmax, ymax) to split.
+        tile_size: Maximum width and height of each tile in decimal degrees.
+
+    Returns:
+        List of tile bounding boxes, ordered by row from the bottom left.
+    """
+    xmin, ymin, xmax, ymax = bbox
+    col_count, row_count = _get_grid_shape(bbox, tile_size)
+
+    # calculate the edges once, so neighboring tiles use identical coordinates, using the bounding box for the outside
+    x_edges = [xmin + (xmax - xmin) * idx / col_count for idx in range(col_count)] + [xmax]
+    y_edges = [ymin + (ymax - ymin) * idx / row_count for idx in range(row_count)] + [ymax]
+
+    return [
+        (x_edges[col], y_edges[row], x_edges[col + 1], y_edges[row + 1])
+        for row in range(row_count)
+        for col in range(col_count)
+    ]
+
+
+def get_tile_size(
+    index: FragmentIndex,
+    bbox: tuple[float, float, float, float],
+    target_rows: int = DEFAULT_TILE_ROWS,
+) -> Optional[float]:
+    """
+    Pick a tile size so each tile has roughly the target number of features, using the feature density estimated
+    from the fragment index.
+
+    Args:
+        index: Fragment index of the dataset.
+        bbox: Bounding box (xmin, ymin, xmax, ymax) to be tiled.
+        target_rows: Target number of features in each tile.
+
+    Returns:
+        Tile size in decimal degrees, or `None` if the bounding box does not need to be tiled.
+    """
+    estimate = index.estimate_rows(bbox)
+    tile_count = math.ceil(estimate / target_rows)
+
+    # if the whole area fits in a single tile, tiling only adds overhead
+    if tile_count <= 1:
+        logger.debug(f"Estimated {estimate:,} features in {bbox}, not tiling.")
+        return None
+
+    # use square tiles dividing the area into the number of tiles needed
+    xmin, ymin, xmax, ymax = bbox
+    tile_size = math.sqrt((xmax - xmin) * (ymax - ymin) / tile_count)
+
+    logger.debug(f"Estimated {estimate:,} features in {bbox}, using a tile size of {tile_size:.6f} degrees.")
+
+    return tile_size
+
+
+def assign_row_groups_to_tiles(
+    row_groups: pa.Table, bbox: tuple[float, float, float, float], tile_size: float
+) -> list[pa.Table]:
+    """
+    Assign each row group to exactly one of the tiles `split_bbox` splits a bounding box into, the tile containing
+    the center of the row group extent, clamped to the bounding box. Row groups often span several tiles, so this
+    ensures each row group is only read and decoded once however many tiles it overlaps.
+
+    Args:
+        row_groups: Fragment index rows with the extent of each row group, such as those returned by `query`.
+        bbox: Bounding box (xmin, ymin, xmax, ymax) split into tiles.
+        tile_size: Maximum width and height of each tile in decimal degrees.
+
+    Returns:
+        Index rows of the row groups assigned to each tile with any, in the order of the tiles.
+    """
+    xmin, ymin, xmax, ymax = bbox
+    col_count, row_count = _get_grid_shape(bbox, tile_size)
+
+    # get the column and row of the tile containing the center of each row group
+    x = (row_groups["xmin"].to_numpy() + row_groups["xmax"].to_numpy()) / 2
+    y = (row_groups["ymin"].to_numpy() + row_groups["ymax"].to_numpy()) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols = np.floor((x - xmin) / (xmax - xmin) * col_count)
+        rows = np.floor((y - ymin) / (ymax - ymin) * row_count)
+    cols = np.clip(np.nan_to_num(cols), 0, col_count - 1).astype(np.int64)
+    rows = np.clip(np.nan_to_num(rows), 0, row_count - 1).astype(np.int64)
+    tile_ids = rows * col_count + cols
+
+    return [row_groups.take(np.nonzero(tile_ids == tile_id)[0]) for tile_id in np.unique(tile_ids)]
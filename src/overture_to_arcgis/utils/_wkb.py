@@ -0,0 +1,567 @@
+from dataclasses import dataclass
+import struct
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+
+from ._logging import get_logger
+
+__all__ = ["WkbCoordinates", "read_wkb_coordinates", "write_wkb_coordinates"]
+
+# configure module logging
+logger = get_logger(logger_name=__name__, level="DEBUG", add_stream_handler=False)
+
+# kinds of coordinate parts
+PART_POINT: int = 1
+PART_LINESTRING: int = 2
+PART_RING: int = 3
+
+# WKB geometry type codes
+WKB_POINT: int = 1
+WKB_LINESTRING: int = 2
+WKB_POLYGON: int = 3
+WKB_MULTIPOINT: int = 4
+WKB_MULTILINESTRING: int = 5
+WKB_MULTIPOLYGON: int = 6
+WKB_GEOMETRYCOLLECTION: int = 7
+
+# extended WKB flags for geometries with z or m values, or a spatial reference
+EWKB_Z_FLAG: int = 0x80000000
+EWKB_M_FLAG: int = 0x40000000
+EWKB_SRID_FLAG: int = 0x20000000
+
+# sizes in bytes of the WKB header, made up of the byte order and type code, and of a count and a 2D coordinate
+HEADER_SIZE: int = 5
+COUNT_SIZE: int = 4
+COORD_SIZE: int = 16
+
+
+@dataclass
+class WkbCoordinates:
+    """
+    Coordinates of a sequence of WKB geometries as flat NumPy arrays.
+
+    Each geometry is made up of parts, which are points, linestrings or polygon rings. The coordinates of part `p`
+    are `coords[part_offsets[p]:part_offsets[p + 1]]`, and the parts of geometry `g` are
+    `part_offsets[geometry_offsets[g]:geometry_offsets[g + 1]]`.
+
+    Args:
+        coords: Array of x and y coordinates with shape (vertices, 2).
+        part_offsets: Offsets into the coordinates for each part.
+        part_kinds: Kind of each part, one of `PART_POINT`, `PART_LINESTRING` or `PART_RING`.
+        geometry_offsets: Offsets into the parts for each geometry.
+        valid: Whether each geometry was read successfully. Null and malformed geometries have no parts.
+        null: Whether each geometry is null.
+        geometry_types: WKB geometry type code of each geometry, such as `WKB_POLYGON`, or zero if not valid.
+        exterior: Whether each part is the exterior ring of a polygon.
+    """
+
+    coords: np.ndarray
+    part_offsets: np.ndarray
+    part_kinds: np.ndarray
+    geometry_offsets: np.ndarray
+    valid: np.ndarray
+    null: Optional[np.ndarray] = None
+    geometry_types: Optional[np.ndarray] = None
+    exterior: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @property
+    def vertex_offsets(self) -> np.ndarray:
+        """Offsets into the coordinates for each geometry."""
+        return self.part_offsets[self.geometry_offsets]
+
+    @property
+    def malformed(self) -> np.ndarray:
+        """Whether each geometry is not null, but could not be read."""
+        null = self.null if self.null is not None else np.zeros(len(self.valid), dtype=bool)
+        return ~self.valid & ~null
+
+    @property
+    def malformed_count(self) -> int:
+        """Number of geometries which are not null, but could not be read."""
+        return int(self.malformed.sum())
+
+    def _get_clockwise(self) -> np.ndarray:
+        """Whether each part is clockwise, using the same test as the ArcGIS API for Python."""
+        clockwise = np.zeros(len(self.part_kinds), dtype=bool)
+        starts, counts = self.part_offsets[:-1], np.diff(self.part_offsets)
+        filled = counts > 0
+        if not filled.any():
+            return clockwise
+
+        # the next vertex of each vertex, wrapping around to the first vertex of the part to close the ring
+        following = np.arange(1, len(self.coords) + 1)
+        following[self.part_offsets[1:][filled] - 1] = starts[filled]
+
+        # sum the edge terms of each part
+        x, y = self.coords[:, 0], self.coords[:, 1]
+        terms = (x[following] - x) * (y[following] + y)
+        clockwise[filled] = np.add.reduceat(terms, starts[filled]) >= 0
+        return clockwise
+
+    def iter_esri_json(self, spatial_reference: Optional[dict[str, Any]] = None) -> Iterator[Optional[dict]]:
+        """
+        Build the Esri JSON of each geometry, only when requested, so the coordinates stay in NumPy arrays until
+        then. Polygon exterior rings are oriented clockwise and holes counterclockwise as Esri JSON requires.
+
+        Args:
+            spatial_reference: Optional spatial reference to add, such as `{"wkid": 4326}`.
+
+        Yields:
+            Esri JSON dictionary of each geometry, or `None` for null, malformed, empty and unsupported geometries,
+            such as geometry collections.
+        """
+        exterior = self.exterior if self.exterior is not None else np.zeros(len(self.part_kinds), dtype=bool)
+        geometry_types = (
+            self.geometry_types if self.geometry_types is not None else np.zeros(len(self.valid), dtype=np.int8)
+        )
+
+        # reverse the rings with the wrong orientation
+        reverse = ((self.part_kinds == PART_RING) & (exterior != self._get_clockwise())).tolist()
+
+        # convert the arrays to lists once, since slicing lists is much faster than slicing arrays for each part
+        coords = self.coords.tolist()
+        part_offsets = self.part_offsets.tolist()
+        part_kinds = self.part_kinds.tolist()
+        geometry_offsets = self.geometry_offsets.tolist()
+
+        for geom_idx, geometry_type in enumerate(geometry_types.tolist()):
+            first_part, last_part = geometry_offsets[geom_idx], geometry_offsets[geom_idx + 1]
+            if first_part == last_part or geometry_type == WKB_GEOMETRYCOLLECTION:
+                yield None
+                continue
+
+            parts = []
+            for part_idx in range(first_part, last_part):
+                part = coords[part_offsets[part_idx]:part_offsets[part_idx + 1]]
+                if reverse[part_idx]:
+                    part.reverse()
+                if part_kinds[part_idx] == PART_RING and part[0] != part[-1]:
+                    part.append(part[0])
+                parts.append(part)
+
+            if geometry_type == WKB_POINT:
+                esri_json = {"x": parts[0][0][0], "y": parts[0][0][1]}
+            elif geometry_type == WKB_MULTIPOINT:
+                esri_json = {"points": [part[0] for part in parts]}
+            elif geometry_type in (WKB_LINESTRING, WKB_MULTILINESTRING):
+                esri_json = {"paths": parts}
+            else:
+                esri_json = {"rings": parts}
+
+            if spatial_reference is not None:
+                esri_json["spatialReference"] = spatial_reference
+
+            yield esri_json
+
+
+def _read_geometry(
+    buffer: bytes, offset: int, coords: list[np.ndarray], kinds: list[int], exterior: list[bool]
+) -> int:
+    """Read a WKB geometry starting at the offset, adding its parts to the lists, and return the end offset."""
+    endian = "<" if buffer[offset] == 1 else ">"
+    (type_code,) = struct.unpack_from(f"{endian}I", buffer, offset + 1)
+    offset += 5
+
+    # get the dimensions from the extended WKB flags or the ISO type code
+    dims = 2 + bool(type_code & EWKB_Z_FLAG) + bool(type_code & EWKB_M_FLAG)
+    if type_code & EWKB_SRID_FLAG:
+        offset += 4
+    type_code &= 0x0FFFFFFF
+    base_type, iso_dims = type_code % 1000, type_code // 1000
+    dims += {0: 0, 1: 1, 2: 1, 3: 2}.get(iso_dims, 0)
+
+    dtype = np.dtype(f"{endian}f8")
+
+    def read_coords(count: int) -> np.ndarray:
+        values = np.frombuffer(buffer, dtype=dtype, count=count * dims, offset=offset)
+        return values.reshape(count, dims)[:, :2].astype(np.float64)
+
+    # point, skipping empty points with nan coordinates
+    if base_type == WKB_POINT:
+        point = read_coords(1)
+        if not np.isnan(point).any():
+            coords.append(point)
+            kinds.append(PART_POINT)
+            exterior.append(False)
+        return offset + 8 * dims
+
+    # linestring
+    if base_type == WKB_LINESTRING:
+        (count,) = struct.unpack_from(f"{endian}I", buffer, offset)
+        offset += 4
+        coords.append(read_coords(count))
+        kinds.append(PART_LINESTRING)
+        exterior.append(False)
+        return offset + 8 * dims * count
+
+    # polygon, with each ring as a part
+    if base_type == WKB_POLYGON:
+        (ring_count,) = struct.unpack_from(f"{endian}I", buffer, offset)
+        offset += 4
+        for ring_idx in range(ring_count):
+            (count,) = struct.unpack_from(f"{endian}I", buffer, offset)
+            offset += 4
+            coords.append(read_coords(count))
+            kinds.append(PART_RING)
+            exterior.append(ring_idx == 0)
+            offset += 8 * dims * count
+        return offset
+
+    # multipart geometries and collections are a sequence of complete geometries
+    if base_type in (WKB_MULTIPOINT, WKB_MULTILINESTRING, WKB_MULTIPOLYGON, WKB_GEOMETRYCOLLECTION):
+        (count,) = struct.unpack_from(f"{endian}I", buffer, offset)
+        offset += 4
+        for _ in range(count):
+            offset = _read_geometry(buffer, offset, coords, kinds, exterior)
+        return offset
+
+    raise ValueError(f"Unsupported WKB geometry type: {type_code}")
+
+
+class _WkbParser:
+    """
+    Parse the structure of many little endian 2D WKB geometries at once, with one cursor into the WKB buffer for
+    each geometry. Nested parts, such as the rings of polygons, are read in steps, each reading the next part of
+    every geometry with one remaining, so the number of steps is set by the most complex geometry rather than the
+    number of geometries.
+
+    Geometries using other encodings, such as big endian or with z values, are flagged to be read one at a time.
+    Geometries with counts running past the end of their value are flagged as malformed.
+    """
+
+    def __init__(self, data: np.ndarray, ends: np.ndarray):
+        self.data = data
+        self.ends = ends
+
+        # unaligned views reading a little endian integer or double starting at any byte
+        self.uint32 = np.ndarray(shape=(max(len(data) - 3, 0),), dtype="<u4", buffer=data, strides=(1,))
+        self.float64 = np.ndarray(shape=(max(len(data) - 7, 0),), dtype="<f8", buffer=data, strides=(1,))
+
+        count = len(ends)
+        self.bad = np.zeros(count, dtype=bool)
+        self.fallback = np.zeros(count, dtype=bool)
+        self.types = np.zeros(count, dtype=np.int8)
+        self.sequence = np.zeros(count, dtype=np.int64)
+        self.parts: list[tuple[np.ndarray, ...]] = []
+
+    def _fits(self, gid: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Check reading up to the end positions stays within each value, flagging the geometries if not."""
+        fits = end <= self.ends[gid]
+        self.bad[gid[~fits]] = True
+        return fits
+
+    def _active(self, gid: np.ndarray) -> np.ndarray:
+        return ~(self.bad[gid] | self.fallback[gid])
+
+    def _read_count(self, gid: np.ndarray, pos: np.ndarray, min_item_size: int) -> np.ndarray:
+        """Read counts, flagging geometries where the items could not fit in the value, with a count of zero."""
+        counts = np.zeros(len(pos), dtype=np.int64)
+        fits = self._fits(gid, pos + COUNT_SIZE)
+        counts[fits] = self.uint32[pos[fits]]
+        fits &= self._fits(gid, pos + COUNT_SIZE + counts * min_item_size)
+        counts[~fits] = 0
+        return counts
+
+    def _emit(self, gid: np.ndarray, start: np.ndarray, count: np.ndarray, kind: int, exterior: bool) -> None:
+        """Record parts, each of a different geometry, in the order read for each geometry."""
+        sequence = self.sequence[gid]
+        self.sequence[gid] += 1
+        self.parts.append(
+            (gid, sequence, start, count, np.full(len(gid), kind, dtype=np.int8), np.full(len(gid), exterior))
+        )
+
+    def _parse_rings(self, pos: np.ndarray, gid: np.ndarray) -> np.ndarray:
+        """Parse polygons, with the ring count at the cursor, returning the end of each polygon."""
+        ring_counts = self._read_count(gid, pos, COUNT_SIZE)
+        pos = pos + COUNT_SIZE
+
+        for ring_idx in range(int(ring_counts.max(initial=0))):
+            active = np.nonzero((ring_counts > ring_idx) & self._active(gid))[0]
+            counts = self._read_count(gid[active], pos[active], COORD_SIZE)
+            fits = self._active(gid[active])
+            self._emit(gid[active][fits], pos[active][fits] + COUNT_SIZE, counts[fits], PART_RING, ring_idx == 0)
+            pos[active] += COUNT_SIZE + COORD_SIZE * counts
+
+        return pos
+
+    def parse(self, pos: np.ndarray, gid: np.ndarray, top_level: bool = False) -> np.ndarray:
+        """Parse the geometries starting at the cursors, returning the end of each geometry."""
+        end = pos.copy()
+        fits = self._fits(gid, pos + HEADER_SIZE)
+        byte_orders = np.zeros(len(pos), dtype=np.uint8)
+        byte_orders[fits] = self.data[pos[fits]]
+        codes = np.zeros(len(pos), dtype=np.int64)
+        codes[fits] = self.uint32[pos[fits] + 1]
+
+        # geometries not little endian with a plain 2D type code are read one at a time
+        simple = fits & (byte_orders == 1) & (codes >= 1) & (codes <= 7)
+        self.fallback[gid[fits & ~simple]] = True
+        if top_level:
+            self.types[gid[simple]] = codes[simple]
+
+        body = pos + HEADER_SIZE
+        for code in np.unique(codes[simple]):
+            mask = simple & (codes == code)
+            g, p = gid[mask], body[mask]
+
+            if code == WKB_POINT:
+                point_fits = self._fits(g, p + COORD_SIZE)
+                self._emit(g[point_fits], p[point_fits], np.ones(point_fits.sum(), dtype=np.int64), PART_POINT, False)
+                end[mask] = p + COORD_SIZE
+
+            elif code == WKB_LINESTRING:
+                counts = self._read_count(g, p, COORD_SIZE)
+                keep = self._active(g)
+                self._emit(g[keep], p[keep] + COUNT_SIZE, counts[keep], PART_LINESTRING, False)
+                end[mask] = p + COUNT_SIZE + COORD_SIZE * counts
+
+            elif code == WKB_POLYGON:
+                end[mask] = self._parse_rings(p, g)
+
+            # multipart geometries and collections are a sequence of complete geometries
+            else:
+                counts = self._read_count(g, p, HEADER_SIZE)
+                sub = p + COUNT_SIZE
+                for sub_idx in range(int(counts.max(initial=0))):
+                    active = np.nonzero((counts > sub_idx) & self._active(g))[0]
+                    sub[active] = self.parse(sub[active], g[active])
+                end[mask] = sub
+
+        return end
+
+
+def _get_ranges(starts: np.ndarray, lengths: np.ndarray, step: int = 1) -> np.ndarray:
+    """Get the positions of consecutive ranges, each from the start up to the start plus the length, by the step."""
+    lengths = lengths // step
+    positions = np.arange(int(lengths.sum()), dtype=np.int64) * step
+    return positions + np.repeat(starts - (np.cumsum(lengths) - lengths) * step, lengths)
+
+
+def _get_binary_array(values: Union[pa.Array, pa.ChunkedArray, Iterable[Optional[bytes]]]) -> pa.Array:
+    """Get WKB values as a binary array."""
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks() if values.num_chunks > 0 else pa.array([], pa.binary())
+    if not isinstance(values, pa.Array):
+        values = pa.array(list(values), pa.binary())
+    if pa.types.is_large_binary(values.type) or pa.types.is_binary(values.type):
+        return values
+    return values.cast(pa.binary())
+
+
+def read_wkb_coordinates(
+    values: Union[pa.Array, pa.ChunkedArray, Iterable[Optional[bytes]]],
+) -> WkbCoordinates:
+    """
+    Read the coordinates of WKB geometries into flat NumPy arrays, ignoring any z and m values.
+
+    The WKB is read directly from the Arrow buffer, parsing the structure of all the geometries at once with NumPy,
+    and gathering all the coordinates in a single step, so no Python objects are created for each geometry. The
+    rare geometries using other encodings, such as big endian or with z values, are read one at a time.
+
+    Args:
+        values: WKB geometries as a PyArrow binary array, or any sequence of bytes. Null values are allowed.
+
+    Returns:
+        Coordinates, parts and offsets of the geometries, with malformed geometries flagged as not valid.
+    """
+    array = _get_binary_array(values)
+    count = len(array)
+    null = np.asarray(array.is_null().to_numpy(zero_copy_only=False), dtype=bool)
+
+    # get the value offsets and data buffer, accounting for any slice offset
+    _, offsets_buffer, data_buffer = array.buffers()
+    offset_type = np.int64 if pa.types.is_large_binary(array.type) else np.int32
+    offsets = np.frombuffer(offsets_buffer, dtype=offset_type)[array.offset:array.offset + count + 1].astype(np.int64)
+    data = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None else np.zeros(0, dtype=np.uint8)
+
+    # parse the structure of the non null geometries
+    parser = _WkbParser(data, offsets[1:])
+    rows = np.nonzero(~null)[0]
+    parser.parse(offsets[:-1][rows], rows, top_level=True)
+
+    # keep the parts of the geometries read successfully
+    if parser.parts:
+        part_columns = [np.concatenate(column) for column in zip(*parser.parts)]
+        keep = ~(parser.bad[part_columns[0]] | parser.fallback[part_columns[0]])
+        gid, sequence, starts, counts, kinds, exterior = (column[keep] for column in part_columns)
+    else:
+        gid, sequence, starts, counts = (np.zeros(0, dtype=np.int64) for _ in range(4))
+        kinds, exterior = np.zeros(0, dtype=np.int8), np.zeros(0, dtype=bool)
+
+    # skip empty points, with nan coordinates
+    empty = kinds == PART_POINT
+    empty[empty] = np.isnan(parser.float64[starts[empty]]) | np.isnan(parser.float64[starts[empty] + 8])
+    gid, sequence, starts, counts, kinds, exterior = (
+        column[~empty] for column in (gid, sequence, starts, counts, kinds, exterior)
+    )
+
+    # gather the coordinates of all the parts at once
+    coord_starts = _get_ranges(starts, counts * COORD_SIZE, step=COORD_SIZE)
+    coords = [np.column_stack([parser.float64[coord_starts], parser.float64[coord_starts + 8]])]
+
+    # read the geometries using other encodings one at a time
+    types = parser.types.copy()
+    fallback_parts = []
+    for row in np.nonzero(parser.fallback & ~parser.bad)[0]:
+        value = data[offsets[row]:offsets[row + 1]].tobytes()
+        row_coords, row_kinds, row_exterior = [], [], []
+        try:
+            _read_geometry(value, 0, row_coords, row_kinds, row_exterior)
+        except (struct.error, ValueError):
+            parser.bad[row] = True
+            continue
+        (type_code,) = struct.unpack_from("<I" if value[0] == 1 else ">I", value, 1)
+        types[row] = (type_code & 0x0FFFFFFF) % 1000
+        fallback_parts.extend(zip([row] * len(row_kinds), range(len(row_kinds)), row_kinds, row_exterior))
+        coords.extend(row_coords)
+
+    if fallback_parts:
+        fallback_gid, fallback_sequence, fallback_kinds, fallback_exterior = zip(*fallback_parts)
+        fallback_counts = [len(part) for part in coords[1:]]
+        gid = np.concatenate([gid, np.asarray(fallback_gid, dtype=np.int64)])
+        sequence = np.concatenate([sequence, np.asarray(fallback_sequence, dtype=np.int64)])
+        counts = np.concatenate([counts, np.asarray(fallback_counts, dtype=np.int64)])
+        kinds = np.concatenate([kinds, np.asarray(fallback_kinds, dtype=np.int8)])
+        exterior = np.concatenate([exterior, np.asarray(fallback_exterior, dtype=bool)])
+    coords = np.concatenate(coords) if len(coords) > 1 else coords[0]
+
+    # order the parts by geometry, then in the order read within each geometry, since nested parts are read in
+    # steps across all the geometries
+    order = np.lexsort((sequence, gid))
+    if not np.array_equal(order, np.arange(len(order))):
+        coord_offsets = np.cumsum(counts) - counts
+        coords = coords[_get_ranges(coord_offsets[order], counts[order])]
+        gid, counts, kinds, exterior = gid[order], counts[order], kinds[order], exterior[order]
+
+    part_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=part_offsets[1:])
+    geometry_offsets = np.searchsorted(gid, np.arange(count + 1), side="left").astype(np.int64)
+
+    valid = ~null & ~parser.bad
+    types[~valid] = 0
+
+    return WkbCoordinates(
+        coords=coords.reshape(-1, 2).astype(np.float64, copy=False),
+        part_offsets=part_offsets,
+        part_kinds=kinds,
+        geometry_offsets=geometry_offsets,
+        valid=valid,
+        null=null,
+        geometry_types=types,
+        exterior=exterior,
+    )
+
+
+def write_wkb_coordinates(coordinates: WkbCoordinates) -> pa.Array:
+    """
+    Write the coordinates of geometries back to little endian 2D WKB, the reverse of `read_wkb_coordinates`, so
+    coordinates processed as flat NumPy arrays can be written back to Arrow.
+
+    All the headers, counts and coordinates are written into a single buffer at offsets computed for all the
+    geometries at once, so no Python objects are created for each geometry.
+
+    Args:
+        coordinates: Coordinates of the geometries, as read by `read_wkb_coordinates`.
+
+    Returns:
+        WKB geometries as a PyArrow binary array, with null values for geometries which are not valid, have no
+        parts, or are geometry collections.
+    """
+    geometry_count = len(coordinates)
+    part_counts = np.diff(coordinates.geometry_offsets)
+    geometry_types = (
+        coordinates.geometry_types.astype(np.int64)
+        if coordinates.geometry_types is not None
+        else np.zeros(geometry_count, dtype=np.int64)
+    )
+    written = (
+        coordinates.valid & (part_counts > 0) & (geometry_types >= WKB_POINT) & (geometry_types <= WKB_MULTIPOLYGON)
+    )
+
+    # the geometry of each part, and the parts of the geometries written
+    part_gid = np.repeat(np.arange(geometry_count), part_counts)
+    part_keep = written[part_gid]
+    part_gid = part_gid[part_keep]
+    part_types = geometry_types[part_gid]
+    vertex_counts = np.diff(coordinates.part_offsets)[part_keep]
+    exterior = (
+        coordinates.exterior[part_keep]
+        if coordinates.exterior is not None
+        else np.zeros(len(part_gid), dtype=bool)
+    )
+    first = np.ones(len(part_gid), dtype=bool)
+    first[1:] = part_gid[1:] != part_gid[:-1]
+
+    # the count following the geometry header, being the rings of a polygon, the polygons of a multipolygon, or the
+    # parts of other multipart geometries, with linestrings using the vertex count of the part
+    polygon_counts = np.bincount(part_gid[exterior], minlength=geometry_count)
+    geometry_counts = np.where(geometry_types == WKB_MULTIPOLYGON, polygon_counts, part_counts)
+    has_geometry_count = first & (part_types >= WKB_POLYGON)
+
+    # the rings of each polygon of a multipolygon, counted from each exterior ring
+    polygon_start = (part_types == WKB_MULTIPOLYGON) & exterior
+    polygon_ids = np.cumsum(polygon_start) - 1
+    rings_per_polygon = np.bincount(polygon_ids[part_types == WKB_MULTIPOLYGON], minlength=int(polygon_start.sum()))
+
+    # each part writes its fields in order: the geometry header and count if first, the polygon header and ring
+    # count if starting a polygon of a multipolygon, the point or linestring header if in a multipart geometry, the
+    # vertex count unless a point, then the coordinates
+    has_part_header = np.isin(part_types, [WKB_MULTIPOINT, WKB_MULTILINESTRING])
+    has_vertex_count = ~np.isin(part_types, [WKB_POINT, WKB_MULTIPOINT])
+    sizes = (
+        first * HEADER_SIZE
+        + has_geometry_count * COUNT_SIZE
+        + polygon_start * (HEADER_SIZE + COUNT_SIZE)
+        + has_part_header * HEADER_SIZE
+        + has_vertex_count * COUNT_SIZE
+        + vertex_counts * COORD_SIZE
+    )
+    part_positions = np.cumsum(sizes) - sizes
+
+    # value offsets, with the geometries not written empty
+    geometry_sizes = np.zeros(geometry_count, dtype=np.int64)
+    np.add.at(geometry_sizes, part_gid, sizes)
+    value_offsets = np.zeros(geometry_count + 1, dtype=np.int64)
+    np.cumsum(geometry_sizes, out=value_offsets[1:])
+
+    # writable views of the buffer at any byte
+    data = np.zeros(int(value_offsets[-1]), dtype=np.uint8)
+    uint32 = np.ndarray(shape=(max(len(data) - 3, 0),), dtype="<u4", buffer=data, strides=(1,))
+    float64 = np.ndarray(shape=(max(len(data) - 7, 0),), dtype="<f8", buffer=data, strides=(1,))
+
+    def write_header(positions: np.ndarray, type_codes: np.ndarray) -> None:
+        data[positions] = 1
+        uint32[positions + 1] = type_codes
+
+    # write the fields of all the parts, advancing a cursor for each part
+    cursor = part_positions.copy()
+    write_header(cursor[first], part_types[first])
+    cursor[first] += HEADER_SIZE
+    uint32[cursor[has_geometry_count]] = geometry_counts[part_gid[has_geometry_count]]
+    cursor[has_geometry_count] += COUNT_SIZE
+    write_header(cursor[polygon_start], np.full(int(polygon_start.sum()), WKB_POLYGON))
+    uint32[cursor[polygon_start] + HEADER_SIZE] = rings_per_polygon
+    cursor[polygon_start] += HEADER_SIZE + COUNT_SIZE
+    write_header(cursor[has_part_header], part_types[has_part_header] - 3)
+    cursor[has_part_header] += HEADER_SIZE
+    uint32[cursor[has_vertex_count]] = vertex_counts[has_vertex_count]
+    cursor[has_vertex_count] += COUNT_SIZE
+
+    # write all the coordinates at once
+    part_coords = coordinates.coords[_get_ranges(coordinates.part_offsets[:-1][part_keep], vertex_counts)]
+    float64[_get_ranges(cursor, vertex_counts * COORD_SIZE, step=8)] = part_coords.ravel()
+
+    # use large binary if the offsets do not fit in 32 bit integers
+    large = value_offsets[-1] > np.iinfo(np.int32).max
+    value_offsets = value_offsets if large else value_offsets.astype(np.int32)
+    return pa.Array.from_buffers(
+        pa.large_binary() if large else pa.binary(),
+        geometry_count,
+        [pa.py_buffer(np.packbits(written, bitorder="little")), pa.py_buffer(value_offsets), pa.py_buffer(data)],
+        null_count=int((~written).sum()),
+    )
@@ -4,10 +4,14 @@ Pytest configuration file for arcgis-overture tests.
 It is used to set up fixtures and configurations for running tests, 
 especially when tests are spread acrsoss multiple files.
 """
+import json
 import shutil
+import struct
 import tempfile
 from pathlib import Path
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
 
@@ -60,3 +64,114 @@ def features_small(tmp_gdb: Path, extent_small: tuple[float, float, float, float
 
     # remove using arcpy to avoid schema locks
     arcpy.Delete_management(fc_pth)
+
+
+@pytest.fixture(scope="function")
+def release_tree(tmp_dir: Path) -> Path:
+    """Create a local directory tree mimicking the Overture release layout with two complete releases and one still loading."""
+    type_theme_map = {
+        "address": "addresses",
+        "building": "buildings",
+        "building_part": "buildings",
+        "place": "places",
+        "connector": "transportation",
+        "segment": "transportation",
+        "water": "base",
+    }
+    base_dir = tmp_dir / "release"
+    for release in ["2025-01-22.0", "2025-02-19.0"]:
+        for overture_type, theme in type_theme_map.items():
+            (base_dir / release / f"theme={theme}" / f"type={overture_type}").mkdir(parents=True)
+
+    # a release still being loaded only has a single theme
+    (base_dir / "2025-03-19.0" / "theme=places" / "type=place").mkdir(parents=True)
+
+    yield base_dir
+
+
+def dumps_wkb(geometry: dict, big_endian: bool = False) -> bytes:
+    """Encode a 2D GeoJSON geometry as WKB."""
+    order = ">" if big_endian else "<"
+
+    def pack_count(count: int) -> bytes:
+        return struct.pack(f"{order}I", count)
+
+    def pack_points(points: list) -> bytes:
+        return pack_count(len(points)) + b"".join(struct.pack(f"{order}2d", *point[:2]) for point in points)
+
+    def pack_geometry(geometry_type: str, coordinates: list) -> bytes:
+        codes = ["Point", "LineString", "Polygon", "MultiPoint", "MultiLineString", "MultiPolygon"]
+        header = struct.pack(f"{order}BI", 0 if big_endian else 1, codes.index(geometry_type) + 1)
+        if geometry_type == "Point":
+            return header + struct.pack(f"{order}2d", *coordinates[:2])
+        if geometry_type == "LineString":
+            return header + pack_points(coordinates)
+        if geometry_type == "Polygon":
+            return header + pack_count(len(coordinates)) + b"".join(pack_points(ring) for ring in coordinates)
+        part_type = geometry_type[len("Multi"):]
+        return header + pack_count(len(coordinates)) + b"".join(pack_geometry(part_type, part) for part in coordinates)
+
+    if geometry["type"] == "GeometryCollection":
+        header = struct.pack(f"{order}BI", 0 if big_endian else 1, 7)
+        return header + pack_count(len(geometry["geometries"])) + b"".join(
+            dumps_wkb(part, big_endian) for part in geometry["geometries"]
+        )
+    return pack_geometry(geometry["type"], geometry["coordinates"])
+
+
+def make_overture_table(xmin: float, ymin: float, count: int = 100, step: float = 0.001, id_prefix: str = "") -> pa.Table:
+    """Create a table resembling Overture point data with GeoParquet metadata, with features along a diagonal."""
+    xs = [xmin + idx * step for idx in range(count)]
+    ys = [ymin + idx * step for idx in range(count)]
+    table = pa.table(
+        {
+            "id": [f"{id_prefix}{idx:08d}" for idx in range(count)],
+            "geometry": [struct.pack("<bIdd", 1, 1, x, y) for x, y in zip(xs, ys)],
+            "bbox": pa.array(
+                [{"xmin": x, "xmax": x, "ymin": y, "ymax": y} for x, y in zip(xs, ys)],
+                type=pa.struct([(k, pa.float32()) for k in ["xmin", "xmax", "ymin", "ymax"]]),
+            ),
+            "version": pa.array([0] * count, type=pa.int32()),
+            "names": pa.array(
+                [{"primary": f"name {idx}", "common": None} for idx in range(count)],
+                type=pa.struct([("primary", pa.string()), ("common", pa.map_(pa.string(), pa.string()))]),
+            ),
+            "class": [["primary", "secondary", "residential", "footway"][idx % 4] for idx in range(count)],
+            "confidence": [idx / count for idx in range(count)],
+        }
+    )
+    geo = {"version": "1.1.0", "primary_column": "geometry", "columns": {"geometry": {"encoding": "WKB"}}}
+    return table.replace_schema_metadata({b"geo": json.dumps(geo).encode("utf-8")})
+
+
+@pytest.fixture(scope="function")
+def overture_tree(release_tree: Path) -> Path:
+    """Add GeoParquet data for the place type to the local release tree, split over two files in different areas."""
+    for release in ["2025-01-22.0", "2025-02-19.0"]:
+        type_dir = release_tree / release / "theme=places" / "type=place"
+        pq.write_table(make_overture_table(-123.0, 47.0), type_dir / "part-00000.parquet", row_group_size=25)
+        pq.write_table(make_overture_table(-100.0, 30.0, id_prefix="b"), type_dir / "part-00001.parquet", row_group_size=25)
+
+    yield release_tree
+
+
+@pytest.fixture(scope="function")
+def local_client(overture_tree: Path, tmp_dir: Path):
+    """Provide an Overture client reading from the local release tree."""
+    import pyarrow.fs as fs
+
+    from overture_to_arcgis.utils import OvertureClient, ReleaseCatalog
+
+    catalog = ReleaseCatalog(fs.LocalFileSystem(), base_dir=str(overture_tree), cache_dir=tmp_dir / "cache")
+    yield OvertureClient(filesystem=fs.LocalFileSystem(), catalog=catalog)
+
+
+def make_cached_client(overture_tree: Path, tmp_dir: Path, max_bytes: int = 10 * 1024**2):
+    """Create an Overture client reading from the local release tree through a row group cache."""
+    import pyarrow.fs as fs
+
+    from overture_to_arcgis.utils import OvertureClient, ReleaseCatalog, RowGroupCache
+
+    catalog = ReleaseCatalog(fs.LocalFileSystem(), base_dir=str(overture_tree), cache_dir=tmp_dir / "cache")
+    cache = RowGroupCache(tmp_dir / "row_groups", max_bytes=max_bytes)
+    return OvertureClient(filesystem=fs.LocalFileSystem(), catalog=catalog, row_group_cache=cache)
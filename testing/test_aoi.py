@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from overture_to_arcgis.utils import AreaOfInterest, get_record_batches
+
+from conftest import dumps_wkb
+
+
+def square(xmin, ymin, xmax, ymax) -> list[list[float]]:
+    return [[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]]
+
+
+@pytest.fixture(scope="module")
+def unit_square_with_hole():
+    return AreaOfInterest.from_geojson(
+        {"type": "Polygon", "coordinates": [square(0, 0, 1, 1), square(0.4, 0.4, 0.6, 0.6)]}
+    )
+
+
+def test_contains_points(unit_square_with_hole):
+    x = np.array([0.2, 1.0, 1.5, 0.5, 0.4])
+    y = np.array([0.2, 0.5, 0.5, 0.5, 0.5])
+
+    # inside, on the boundary, outside, inside the hole, and on the boundary of the hole
+    assert unit_square_with_hole.contains_points(x, y).tolist() == [True, True, False, False, True]
+    assert unit_square_with_hole.bbox == (0.0, 0.0, 1.0, 1.0)
+
+
+def test_intersects_wkb(unit_square_with_hole):
+    values = [
+        # line crossing the square without any vertex inside
+        dumps_wkb({"type": "LineString", "coordinates": [[-1, 0.2], [2, 0.2]]}),
+        # polygon containing the whole square
+        dumps_wkb({"type": "Polygon", "coordinates": [square(-1, -1, 2, 2)]}),
+        # line outside the square
+        dumps_wkb({"type": "LineString", "coordinates": [[-1, 2], [2, 2]]}),
+        # point in the hole
+        dumps_wkb({"type": "Point", "coordinates": [0.5, 0.5]}),
+        # multipoint with one point inside
+        dumps_wkb({"type": "MultiPoint", "coordinates": [[5, 5], [0.1, 0.1]]}),
+        None,
+        b"\x01\x02",
+    ]
+    assert unit_square_with_hole.intersects_wkb(values).tolist() == [True, True, False, False, True, False, False]
+
+
+def test_intersects_wkb_contains_area(unit_square_with_hole):
+    values = [
+        # polygon with the square inside its hole
+        dumps_wkb({"type": "Polygon", "coordinates": [square(-2, -2, 3, 3), square(-1, -1, 2, 2)]}),
+        # multipolygon with the second polygon containing the square
+        dumps_wkb({"type": "MultiPolygon", "coordinates": [[square(5, 5, 6, 6)], [square(-1, -1, 2, 2)]]}),
+        # several lines crossing the square without any vertex inside, and a line beside it
+        dumps_wkb({"type": "MultiLineString", "coordinates": [[[-1, 1.5], [2, 1.5]], [[0.5, -1], [0.5, 2]]]}),
+        dumps_wkb({"type": "LineString", "coordinates": [[-1, -1], [2, 2]]}),
+        dumps_wkb({"type": "LineString", "coordinates": [[1.1, -1], [1.1, 2]]}),
+    ]
+    assert unit_square_with_hole.intersects_wkb(values).tolist() == [False, True, True, True, False]
+
+
+def test_invalid_aoi():
+    with pytest.raises(ValueError):
+        AreaOfInterest.from_geojson({"type": "LineString", "coordinates": [[0, 0], [1, 1]]})
+    with pytest.raises(ValueError):
+        AreaOfInterest([np.array([[0, 0], [1, 0], [1, 1]])])
+
+
+def test_get_record_batches_aoi(local_client):
+    # two squares around the 10th to 19th and 60th to 69th features along the diagonal, with an extent covering
+    # the 10th to the 69th features
+    aoi = {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [square(-122.9905, 47.0095, -122.9805, 47.0195)],
+            [square(-122.9405, 47.0595, -122.9305, 47.0695)],
+        ],
+    }
+    expected = [f"{idx:08d}" for idx in list(range(10, 20)) + list(range(60, 70))]
+
+    batches = list(get_record_batches("place", client=local_client, aoi=aoi, columns=["names.primary"]))
+    assert "__aoi_bbox" not in batches[0].schema.names
+    assert sum(batch.num_rows for batch in batches) == 20
+
+    batches = get_record_batches("place", client=local_client, aoi=dumps_wkb(aoi), tile_size=0.02)
+    assert sorted(id_ for batch in batches for id_ in batch["id"].to_pylist()) == expected
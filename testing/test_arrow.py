@@ -0,0 +1,41 @@
+import json
+
+import pyarrow as pa
+import pytest
+
+from overture_to_arcgis import get_arrow_table, get_record_batch_reader
+
+
+def test_get_arrow_table(local_client):
+    table = get_arrow_table("place", (-123.0, 47.0, -122.9, 47.1), client=local_client)
+
+    assert table.num_rows > 0
+    assert pa.types.is_binary(table.schema.field("geometry").type)
+    assert pa.types.is_struct(table.schema.field("names").type)
+
+    # the geometry field carries the geoarrow extension metadata, and the schema the geoparquet metadata
+    assert table.schema.field("geometry").metadata[b"ARROW:extension:name"] == b"geoarrow.wkb"
+    assert json.loads(table.schema.metadata[b"geo"])["primary_column"] == "geometry"
+
+
+def test_get_record_batch_reader_streams(local_client):
+    reader = get_record_batch_reader(
+        "place", (-123.0, 47.0, -122.9, 47.1), client=local_client, columns=["id"], use_index=True
+    )
+
+    assert reader.schema.names == ["id", "geometry"]
+    batches = list(reader)
+    assert len(batches) > 1
+    assert all(batch.schema.equals(reader.schema, check_metadata=True) for batch in batches)
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_get_arrow_table_no_data(local_client, use_index):
+    with pytest.warns(UserWarning, match="No 'place' data found"):
+        table = get_arrow_table(
+            "place", (10.0, 10.0, 10.1, 10.1), client=local_client, columns=["id"], use_index=use_index
+        )
+
+    assert table.num_rows == 0
+    assert table.schema.names == ["id", "geometry"]
+    assert table.schema.field("geometry").metadata[b"ARROW:extension:name"] == b"geoarrow.wkb"
@@ -0,0 +1,90 @@
+import pyarrow as pa
+
+from overture_to_arcgis.utils import RowGroupCache, get_record_batches
+
+from conftest import make_cached_client
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_row_group_cache_hits_on_repeat(overture_tree, tmp_dir):
+    client = make_cached_client(overture_tree, tmp_dir)
+    cache = client.row_group_cache
+
+    first = list(get_record_batches("place", extent_place, client=client))
+    assert cache.hits == 0 and cache.misses == 4
+
+    # a smaller area inside the first is served from the cache
+    second = list(get_record_batches("place", (-123.0, 47.0, -122.95, 47.05), client=client))
+    assert cache.hits == 2 and cache.misses == 4
+
+    assert sum(batch.num_rows for batch in first) == 100
+    assert sum(batch.num_rows for batch in second) == 49
+
+
+def test_row_group_cache_matches_uncached(local_client, overture_tree, tmp_dir):
+    client = make_cached_client(overture_tree, tmp_dir)
+    where = "class = 'primary'"
+    columns = ["id", "names.primary"]
+
+    cached = list(get_record_batches("place", extent_place, client=client, columns=columns, where=where))
+    uncached = list(get_record_batches("place", extent_place, client=local_client, columns=columns, where=where))
+
+    assert cached[0].schema.names == uncached[0].schema.names
+    assert sorted(id_ for b in cached for id_ in b["id"].to_pylist()) == sorted(
+        id_ for b in uncached for id_ in b["id"].to_pylist()
+    )
+    assert cached[0].schema.metadata[b"geo"]
+
+
+def test_row_group_cache_eviction(overture_tree, tmp_dir):
+    client = make_cached_client(overture_tree, tmp_dir)
+    cache = client.row_group_cache
+    list(get_record_batches("place", extent_place, client=client))
+
+    # limit the cache to two of the four row groups read
+    sizes = sorted(path.stat().st_size for path in cache.cache_dir.glob("*/*.arrow"))
+    assert len(sizes) == 4
+    cache.max_bytes = sizes[-1] + sizes[-2]
+
+    assert cache.evict() == 2
+    assert cache.evictions == 2
+    assert len(list(cache.cache_dir.glob("*/*.arrow"))) == 2
+
+    # evicted row groups are read again as misses
+    list(get_record_batches("place", extent_place, client=client))
+    assert cache.hits + cache.misses == 8
+    assert cache.misses >= 6
+
+
+def test_row_group_cache_missing_file_is_miss(tmp_dir):
+    cache = RowGroupCache(tmp_dir / "row_groups")
+    key = cache.get_key("root", "2025-01-22.0", "part-0.parquet", 0)
+
+    assert cache.get(key) is None
+    assert cache.misses == 1
+
+    cache.put(key, pa.table({"id": ["a", "b"]}))
+    assert cache.get(key)["id"].to_pylist() == ["a", "b"]
+    assert cache.hits == 1
+
+
+def test_row_group_cache_reads_projected_columns(overture_tree, tmp_dir):
+    client = make_cached_client(overture_tree, tmp_dir)
+    cache = client.row_group_cache
+    columns = ["id", "names.primary"]
+    where = "class = 'primary'"
+
+    batches = list(get_record_batches("place", extent_place, client=client, columns=columns, where=where))
+    assert sum(batch.num_rows for batch in batches) > 0
+
+    # only the columns the projection and filter reference are cached, not the confidence or version
+    cached = [pa.ipc.open_file(str(path)).read_all() for path in cache.cache_dir.glob("*/*.arrow")]
+    assert cached
+    for table in cached:
+        assert "confidence" not in table.schema.names and "version" not in table.schema.names
+        assert {"id", "names", "class", "bbox"} <= set(table.schema.names)
+
+    # a different projection of the same row groups is cached separately
+    list(get_record_batches("place", extent_place, client=client))
+    assert cache.hits == 0
@@ -0,0 +1,156 @@
+import pyarrow.fs as fs
+import pytest
+
+from overture_to_arcgis.utils._catalog import ReleaseCatalog
+
+
+class CountingHandler(fs.FileSystemHandler):
+    """Filesystem handler delegating to the local filesystem, while counting directory listings."""
+
+    def __init__(self):
+        self.local = fs.LocalFileSystem()
+        self.list_count = 0
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def get_type_name(self):
+        return "counting"
+
+    def normalize_path(self, path):
+        return path
+
+    def get_file_info(self, paths):
+        return self.local.get_file_info(paths)
+
+    def get_file_info_selector(self, selector):
+        self.list_count += 1
+        return self.local.get_file_info(selector)
+
+    def create_dir(self, path, recursive):
+        self.local.create_dir(path, recursive=recursive)
+
+    def delete_dir(self, path):
+        self.local.delete_dir(path)
+
+    def delete_dir_contents(self, path, missing_dir_ok=False):
+        self.local.delete_dir_contents(path, missing_dir_ok=missing_dir_ok)
+
+    def delete_root_dir_contents(self):
+        raise NotImplementedError
+
+    def delete_file(self, path):
+        self.local.delete_file(path)
+
+    def move(self, src, dest):
+        self.local.move(src, dest)
+
+    def copy_file(self, src, dest):
+        self.local.copy_file(src, dest)
+
+    def open_input_stream(self, path):
+        return self.local.open_input_stream(path)
+
+    def open_input_file(self, path):
+        return self.local.open_input_file(path)
+
+    def open_output_stream(self, path, metadata):
+        return self.local.open_output_stream(path, metadata=metadata)
+
+    def open_append_stream(self, path, metadata):
+        return self.local.open_append_stream(path, metadata=metadata)
+
+
+@pytest.fixture(scope="function")
+def counting_handler():
+    return CountingHandler()
+
+
+def test_release_catalog_skips_incomplete_release(release_tree, tmp_dir, counting_handler):
+    catalog = ReleaseCatalog(
+        filesystem=fs.PyFileSystem(counting_handler), base_dir=str(release_tree), cache_dir=tmp_dir / "cache"
+    )
+
+    assert sorted(catalog.get_release_list()) == ["2025-01-22.0", "2025-02-19.0"]
+    assert catalog.get_current_release() == "2025-02-19.0"
+
+
+def test_release_catalog_type_theme_map(release_tree, tmp_dir, counting_handler):
+    catalog = ReleaseCatalog(
+        filesystem=fs.PyFileSystem(counting_handler), base_dir=str(release_tree), cache_dir=tmp_dir / "cache"
+    )
+
+    type_theme_map = catalog.get_type_theme_map("2025-02-19.0")
+
+    assert type_theme_map["segment"] == "transportation"
+    assert type_theme_map["building_part"] == "buildings"
+    assert len(type_theme_map) == 7
+
+
+def test_release_catalog_caches_listings(release_tree, tmp_dir, counting_handler):
+    catalog = ReleaseCatalog(
+        filesystem=fs.PyFileSystem(counting_handler), base_dir=str(release_tree), cache_dir=tmp_dir / "cache"
+    )
+
+    release = catalog.get_current_release()
+    catalog.get_type_theme_map(release)
+    list_count = counting_handler.list_count
+
+    # repeated discovery is served from memory
+    for _ in range(5):
+        release = catalog.get_current_release()
+        catalog.get_type_theme_map(release)
+    assert counting_handler.list_count == list_count
+
+
+def test_release_catalog_current_release_ttl(release_tree, tmp_dir, counting_handler):
+    catalog = ReleaseCatalog(
+        filesystem=fs.PyFileSystem(counting_handler),
+        base_dir=str(release_tree),
+        cache_dir=tmp_dir / "cache",
+        current_release_ttl=0,
+    )
+    catalog.get_current_release()
+    list_count = counting_handler.list_count
+
+    # a new release is published
+    (release_tree / "2025-03-19.0" / "theme=buildings" / "type=building").mkdir(parents=True)
+    for theme in ["addresses", "base", "divisions", "transportation"]:
+        (release_tree / "2025-03-19.0" / f"theme={theme}").mkdir()
+
+    assert catalog.get_current_release() == "2025-03-19.0"
+
+    # only the release list and the new release are listed again, the immutable releases are not
+    assert counting_handler.list_count == list_count + 2
+
+
+def test_release_catalog_offline_snapshot(release_tree, tmp_dir, counting_handler):
+    online = ReleaseCatalog(
+        filesystem=fs.PyFileSystem(counting_handler), base_dir=str(release_tree), cache_dir=tmp_dir / "cache"
+    )
+    release = online.get_current_release()
+    type_theme_map = online.get_type_theme_map(release)
+
+    offline = ReleaseCatalog(
+        filesystem=fs.PyFileSystem(CountingHandler()), base_dir=str(release_tree), cache_dir=tmp_dir / "cache", offline=True
+    )
+
+    assert offline.get_current_release() == release
+    assert offline.get_type_theme_map(release) == type_theme_map
+
+    # anything not in the snapshot cannot be retrieved while offline
+    with pytest.raises(RuntimeError, match="offline"):
+        offline.get_themes("2024-12-18.0")
+
+
+def test_release_catalog_concurrent_matches_serial(release_tree, tmp_dir):
+    local = fs.LocalFileSystem()
+    serial = ReleaseCatalog(local, base_dir=str(release_tree), cache_dir=tmp_dir / "serial", max_workers=1)
+    concurrent = ReleaseCatalog(local, base_dir=str(release_tree), cache_dir=tmp_dir / "concurrent", max_workers=8)
+
+    assert sorted(serial.get_release_list()) == sorted(concurrent.get_release_list())
+    for release in serial.get_release_list():
+        assert serial.get_type_theme_map(release) == concurrent.get_type_theme_map(release)
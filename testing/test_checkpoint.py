@@ -0,0 +1,117 @@
+from pathlib import Path
+import types
+
+import pytest
+
+import overture_to_arcgis.__main__ as main_module
+import overture_to_arcgis.utils._checkpoint as checkpoint_module
+from overture_to_arcgis import get_features
+from overture_to_arcgis.utils import CheckpointJournal, retry_with_backoff
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+extent_both = (-124.0, 29.0, -99.0, 48.0)
+
+
+@pytest.fixture(scope="function")
+def delays(monkeypatch):
+    """Record the backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(checkpoint_module.time, "sleep", delays.append)
+    yield delays
+
+
+@pytest.fixture(scope="function")
+def fake_arcpy(monkeypatch):
+    """Track the feature classes written, merged and deleted instead of using arcpy."""
+    state = types.SimpleNamespace(existing=set(), written=[], merged=None)
+
+    def write(batch, output_features):
+        state.existing.add(str(output_features))
+        state.written.append(str(output_features))
+
+    def merge(inputs, output):
+        state.merged = (list(inputs), output)
+
+    management = types.SimpleNamespace(
+        CreateFileGDB=lambda folder, name: state.existing.add(str(Path(folder) / name)),
+        Delete=lambda path: state.existing.discard(str(path)),
+        Merge=merge,
+    )
+    monkeypatch.setattr(main_module, "table_to_features", write)
+    monkeypatch.setattr(
+        main_module, "arcpy", types.SimpleNamespace(Exists=lambda path: str(path) in state.existing, management=management)
+    )
+    yield state
+
+
+def test_retry_with_backoff(delays):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 4:
+            raise TimeoutError("timed out")
+        return "done"
+
+    assert retry_with_backoff(flaky, max_retries=5, base_delay=1.0, max_delay=3.0) == "done"
+    assert delays == [1.0, 2.0, 3.0]
+
+    # errors which are not transient are not retried
+    with pytest.raises(KeyError):
+        retry_with_backoff(lambda: {}["missing"])
+
+    # transient errors are raised once out of retries
+    with pytest.raises(ConnectionError):
+        retry_with_backoff(lambda: (_ for _ in ()).throw(ConnectionError("reset")), max_retries=2)
+
+
+def test_checkpoint_journal(tmp_dir):
+    journal = CheckpointJournal.for_extract(tmp_dir, release="2025-02-19.0", overture_type="place", bbox=extent_place)
+    journal.record("part-00000.parquet", ["fc_0", "fc_1"], rows=10)
+
+    # simulate the process being killed while writing an entry
+    with open(journal.path, "a") as file:
+        file.write('{"piece": "part-000')
+
+    resumed = CheckpointJournal.for_extract(tmp_dir, release="2025-02-19.0", overture_type="place", bbox=extent_place)
+    assert resumed.path == journal.path
+    assert resumed.is_complete("part-00000.parquet")
+    assert resumed.outputs == ["fc_0", "fc_1"]
+
+    # a different extract uses a different journal
+    other = CheckpointJournal.for_extract(tmp_dir, release="2025-02-19.0", overture_type="place", bbox=extent_both)
+    assert other.path != journal.path
+    assert not other.completed
+
+
+def test_get_features_resumes(local_client, tmp_dir, fake_arcpy, delays, monkeypatch):
+    checkpoint_dir = tmp_dir / "checkpoints"
+    get_record_batches = main_module.get_record_batches
+    calls = []
+
+    # the second file always times out during the first run
+    def failing_get_record_batches(*args, files=None, **kwargs):
+        calls.append(files[0])
+        if files == ["part-00001.parquet"]:
+            raise TimeoutError("timed out")
+        return get_record_batches(*args, files=files, **kwargs)
+
+    monkeypatch.setattr(main_module, "get_record_batches", failing_get_record_batches)
+    with pytest.raises(RuntimeError, match="1 of 2 pieces"):
+        get_features("out_fc", "place", extent_both, client=local_client, checkpoint_dir=checkpoint_dir, max_retries=2)
+    assert calls == ["part-00000.parquet"] + ["part-00001.parquet"] * 3
+    assert delays == [1.0, 2.0]
+    assert fake_arcpy.merged is None
+
+    # running again only extracts the failed piece, then merges everything
+    calls.clear()
+    monkeypatch.setattr(main_module, "get_record_batches", lambda *args, files=None, **kwargs: (
+        calls.append(files[0]) or get_record_batches(*args, files=files, **kwargs)
+    ))
+    get_features("out_fc", "place", extent_both, client=local_client, checkpoint_dir=checkpoint_dir, max_retries=2)
+    assert calls == ["part-00001.parquet"]
+    assert fake_arcpy.merged[0] == fake_arcpy.written
+    assert fake_arcpy.merged[1] == "out_fc"
+
+    # the checkpoint is removed once complete
+    assert list(checkpoint_dir.glob("*.jsonl")) == []
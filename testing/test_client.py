@@ -0,0 +1,67 @@
+import pyarrow.fs as fs
+import pytest
+
+from overture_to_arcgis.utils import OvertureClient, ReleaseCatalog, get_current_release, get_record_batches
+from overture_to_arcgis.utils import _catalog as catalog_module
+
+
+def test_client_pins_current_release(local_client):
+    assert local_client.release == "2025-02-19.0"
+    assert "place" in local_client.overture_types
+
+
+def test_client_pins_requested_release(overture_tree, tmp_dir):
+    catalog = ReleaseCatalog(fs.LocalFileSystem(), base_dir=str(overture_tree), cache_dir=tmp_dir / "cache")
+    client = OvertureClient(release="2025-01-22.0", filesystem=fs.LocalFileSystem(), catalog=catalog)
+    assert client.get_dataset_path("place").endswith("2025-01-22.0/theme=places/type=place")
+
+
+def test_client_invalid_release(overture_tree, tmp_dir):
+    catalog = ReleaseCatalog(fs.LocalFileSystem(), base_dir=str(overture_tree), cache_dir=tmp_dir / "cache")
+    with pytest.raises(ValueError, match="Invalid release"):
+        OvertureClient(release="1999-01-01.0", filesystem=fs.LocalFileSystem(), catalog=catalog)
+
+
+def test_client_invalid_type(local_client):
+    with pytest.raises(ValueError, match="Invalid overture type"):
+        local_client.get_dataset("not_a_type")
+
+
+def test_client_reuses_dataset(local_client):
+    assert local_client.get_dataset("place") is local_client.get_dataset("place")
+    assert "bbox" in local_client.get_schema("place").names
+
+
+def test_get_record_batches_with_client(local_client):
+    batches = get_record_batches("place", (-123.5, 46.5, -122.5, 47.5), client=local_client)
+    assert sum(batch.num_rows for batch in batches) == 100
+
+
+def test_client_from_uri(overture_tree):
+    client = OvertureClient.from_uri(overture_tree.as_uri())
+    assert client.release == "2025-02-19.0"
+    assert client.get_dataset("place").count_rows() == 200
+
+
+def test_client_sub_tree_filesystem(overture_tree):
+    sub_tree = fs.SubTreeFileSystem(str(overture_tree), fs.LocalFileSystem())
+    client = OvertureClient(filesystem=sub_tree, base_path="")
+    assert client.get_dataset_path("place") == "2025-02-19.0/theme=places/type=place"
+    assert client.get_dataset("place").count_rows() == 200
+
+
+def test_client_timeouts_apply_after_discovery(tmp_dir, monkeypatch):
+    # default root catalog with a current release list, so nothing is listed
+    catalog = ReleaseCatalog(cache_dir=tmp_dir / "cache", offline=True)
+    catalog._releases = ["2025-01-22.0"]
+    monkeypatch.setattr(catalog_module, "_catalog", catalog)
+
+    # module level discovery creates the catalog filesystem
+    assert get_current_release() == "2025-01-22.0"
+    assert catalog.filesystem is not None
+    assert catalog.is_default_root
+
+    client = OvertureClient(connect_timeout=3, request_timeout=7)
+    assert client.filesystem is not catalog.filesystem
+    options = client.filesystem.__reduce__()[1][0]
+    assert options["connect_timeout"] == 3 and options["request_timeout"] == 7
@@ -0,0 +1,114 @@
+import types
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+import overture_to_arcgis.__main__ as main_module
+from overture_to_arcgis import update_features
+from overture_to_arcgis.utils import diff_releases, get_record_batches
+
+from conftest import make_overture_table
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+@pytest.fixture(scope="function")
+def changed_client(local_client, overture_tree):
+    """Change the first file of the current release: delete the first five features, bump the version of the next
+    five, rename five more without bumping the version, and add five new features."""
+    table = make_overture_table(-123.0, 47.0)
+    bumped = pc.is_in(table["id"], pa.array([f"{idx:08d}" for idx in range(5, 10)]))
+    version = pc.if_else(bumped, 1, 0).cast(pa.int32())
+    table = table.set_column(table.schema.get_field_index("version"), "version", version)
+    names = table["names"].to_pylist()
+    for idx in range(10, 15):
+        names[idx] = {"primary": f"renamed {idx}", "common": None}
+    table = table.set_column(
+        table.schema.get_field_index("names"), "names", pa.array(names, type=table.schema.field("names").type)
+    )
+    added = make_overture_table(-122.95, 47.05, count=5, id_prefix="c")
+    table = pa.concat_tables([table.slice(5), added])
+
+    type_dir = overture_tree / "2025-02-19.0" / "theme=places" / "type=place"
+    pq.write_table(table, type_dir / "part-00000.parquet", row_group_size=25)
+
+    yield local_client
+
+
+def test_diff_releases(changed_client):
+    diff = diff_releases("place", extent_place, client=changed_client)
+    assert diff.base_release == "2025-01-22.0"
+    assert diff.release == "2025-02-19.0"
+    assert sorted(diff.added) == [f"c{idx:08d}" for idx in range(5)]
+    assert sorted(diff.deleted) == [f"{idx:08d}" for idx in range(5)]
+    assert sorted(diff.changed) == [f"{idx:08d}" for idx in range(5, 10)]
+    assert diff.unchanged == 90
+    assert "5 added, 5 deleted, 5 changed" in str(diff)
+
+    # hashing the name detects the renamed features instead
+    by_name = diff_releases("place", extent_place, client=changed_client, fingerprint="names.primary")
+    assert sorted(by_name.changed) == [f"{idx:08d}" for idx in range(10, 15)]
+
+    # only the added and changed features are fetched
+    batches = get_record_batches("place", extent_place, client=changed_client, where=diff.get_filter())
+    fetched = [value for batch in batches for value in batch["id"].to_pylist()]
+    assert sorted(fetched) == sorted(diff.updated_ids)
+
+
+def test_diff_identical_releases(local_client):
+    diff = diff_releases("place", extent_place, client=local_client)
+    assert diff.is_empty
+    assert diff.unchanged == 100
+
+    with pytest.raises(ValueError):
+        diff_releases("place", extent_place, base_release="2025-02-19.0", client=local_client)
+
+
+def test_update_features(changed_client, monkeypatch, tmp_dir):
+    rows = [[f"{idx:08d}"] for idx in range(100)]
+    appended = []
+
+    class UpdateCursor:
+        def __init__(self, feature_class, fields):
+            self.current = None
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def __iter__(self):
+            for row in list(rows):
+                self.current = row
+                yield row
+
+        def deleteRow(self):
+            rows.remove(self.current)
+
+    def write_batches(batches, output_feature_class, overture_type, bbox, tmp_gdb):
+        appended.extend(value for batch in batches for value in batch["id"].to_pylist())
+        return True
+
+    monkeypatch.setattr(
+        main_module,
+        "arcpy",
+        types.SimpleNamespace(
+            Exists=lambda path: True,
+            da=types.SimpleNamespace(UpdateCursor=UpdateCursor),
+            management=types.SimpleNamespace(Append=lambda *args, **kwargs: None, Delete=lambda *args: None),
+        ),
+    )
+    monkeypatch.setattr(main_module, "_write_batches_to_features", write_batches)
+    monkeypatch.setattr(main_module, "get_temp_gdb", lambda: tmp_dir / "tmp_data.gdb")
+
+    diff = update_features(tmp_dir / "place", "place", extent_place, client=changed_client)
+
+    # the deleted and changed features are removed, and the added and changed features appended
+    assert len(rows) == 90
+    assert sorted(appended) == sorted(diff.updated_ids)
+    assert sorted([row[0] for row in rows] + appended) == sorted(
+        [f"{idx:08d}" for idx in range(5, 100)] + [f"c{idx:08d}" for idx in range(5)]
+    )
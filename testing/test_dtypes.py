@@ -0,0 +1,60 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from overture_to_arcgis import get_spatially_enabled_dataframe
+from overture_to_arcgis.utils import table_to_spatially_enabled_dataframe
+from overture_to_arcgis.utils.__main__ import encode_low_cardinality_columns
+
+from conftest import make_overture_table
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def make_segment_table() -> pa.Table:
+    """Overture place table with low cardinality segment-like columns added."""
+    table = make_overture_table(-123.0, 47.0)
+    subtypes = ["road", "rail", "water", "road"] * 25
+    table = table.append_column("subtype", pa.array(subtypes))
+    return table.append_column("subclass", pa.array([None if idx % 10 == 0 else "sidewalk" for idx in range(100)]))
+
+
+def test_encode_low_cardinality_columns():
+    table = encode_low_cardinality_columns(make_segment_table(), 0.05, exclude=["subclass"])
+
+    assert pa.types.is_dictionary(table.schema.field("subtype").type)
+    assert pa.types.is_dictionary(table.schema.field("class").type)
+    assert pa.types.is_string(table.schema.field("subclass").type)
+    assert pa.types.is_string(table.schema.field("id").type)
+    assert table.column("subtype").to_pylist() == make_segment_table().column("subtype").to_pylist()
+
+    for threshold in [0, 1.5, True, "low"]:
+        with pytest.raises(ValueError):
+            encode_low_cardinality_columns(table, threshold)
+
+
+def test_table_to_spatially_enabled_dataframe_dtypes():
+    df = table_to_spatially_enabled_dataframe(make_segment_table(), arrow_dtypes=True, categorical_threshold=0.05)
+
+    assert isinstance(df["subtype"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["subclass"].dtype, pd.CategoricalDtype)
+    assert df["subclass"].isna().sum() == 10
+    assert isinstance(df["id"].dtype, pd.ArrowDtype)
+    assert df.columns.tolist() == make_segment_table().column_names
+    assert df.spatial.name == "geometry"
+
+
+def test_get_spatially_enabled_dataframe_categoricals_with_budget(local_client):
+    df = get_spatially_enabled_dataframe(
+        "place",
+        extent_place,
+        client=local_client,
+        columns=["id"],
+        flatten={"primary_name": "names.primary"},
+        max_memory="10KB",
+        categorical_threshold=1,
+    )
+
+    # the categories of the chunks are combined, so the columns stay categorical
+    assert isinstance(df["primary_name"].dtype, pd.CategoricalDtype)
+    assert df["primary_name"].nunique() == 100
@@ -0,0 +1,83 @@
+import types
+
+import pyarrow.parquet as pq
+
+import overture_to_arcgis.__main__ as main_module
+import overture_to_arcgis.utils.__main__ as utils_main
+from overture_to_arcgis import estimate_extract, get_features
+from overture_to_arcgis.utils import get_record_batches
+
+from conftest import make_cached_client
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_estimate_extract(local_client):
+    estimate = estimate_extract("place", extent_place, client=local_client)
+    assert estimate.files == 1
+    assert estimate.row_groups == 4
+    assert estimate.rows == 100
+    assert estimate.compressed_bytes > 0
+    assert estimate.output_bytes > 0
+    assert estimate.tile_size is None
+    assert "100 'place' features" in str(estimate)
+
+    # half of the features along the diagonal are in the lower left half of the extent of the file
+    half = estimate_extract("place", (-123.5, 46.5, -122.9505, 47.0495), client=local_client)
+    assert 45 <= half.rows <= 55
+    assert half.output_bytes < estimate.output_bytes
+
+
+def test_estimate_recommends_tiling(local_client):
+    estimate = estimate_extract("place", extent_place, client=local_client, target_tile_rows=10)
+    assert estimate.tile_size is not None
+    assert estimate.tile_workers == 8
+
+
+def test_get_features_default_reads_row_groups_once(overture_tree, tmp_dir, monkeypatch):
+    client = make_cached_client(overture_tree, tmp_dir)
+    written = []
+    tile_counts = []
+
+    def write_batches(batches, output_feature_class, overture_type, bbox, tmp_gdb):
+        written.extend(batch for batch in batches if batch.num_rows > 0)
+
+    def assign_row_groups_to_tiles(*args):
+        tiles = assign_row_groups(*args)
+        tile_counts.append(len(tiles))
+        return tiles
+
+    assign_row_groups = utils_main.assign_row_groups_to_tiles
+    monkeypatch.setattr(utils_main, "assign_row_groups_to_tiles", assign_row_groups_to_tiles)
+
+    # recommend tiling the small extract, and capture the batches written instead of using arcpy
+    monkeypatch.setattr(
+        main_module,
+        "estimate_extract",
+        lambda overture_type, bbox, client: estimate_extract(overture_type, bbox, client=client, target_tile_rows=10),
+    )
+    monkeypatch.setattr(main_module, "_write_batches_to_features", write_batches)
+    monkeypatch.setattr(main_module, "get_temp_gdb", lambda: tmp_dir / "tmp_data.gdb")
+    monkeypatch.setattr(main_module, "arcpy", types.SimpleNamespace(management=types.SimpleNamespace(Delete=lambda *args: None)))
+
+    # the default tiled extract reads each row group only once, and returns each feature only once
+    bbox = (-123.0, 47.0, -122.9, 47.1)
+    get_features(tmp_dir / "place", "place", bbox, client=client)
+    assert tile_counts[0] > 1
+    assert (client.row_group_cache.misses, client.row_group_cache.hits) == (4, 0)
+    ids = sorted(id_ for batch in written for id_ in batch["id"].to_pylist())
+    untiled = get_record_batches("place", bbox, client=client, tile_size=None)
+    assert ids == sorted(id_ for batch in untiled for id_ in batch["id"].to_pylist())
+
+
+def test_outdated_index_rebuilt(local_client):
+    index = local_client.get_fragment_index("place")
+    index_path = local_client.get_fragment_index_path("place")
+
+    # save an index without the uncompressed bytes, as saved by an earlier version
+    pq.write_table(index.table.drop_columns(["uncompressed_bytes"]), index_path)
+
+    from overture_to_arcgis.utils import OvertureClient
+
+    client = OvertureClient(filesystem=local_client.filesystem, catalog=local_client.catalog)
+    assert client.get_fragment_index("place").table.equals(index.table)
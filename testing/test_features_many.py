@@ -0,0 +1,85 @@
+from pathlib import Path
+import types
+
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import make_overture_table
+
+import overture_to_arcgis.__main__ as main_module
+from overture_to_arcgis import get_features_many
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+@pytest.fixture(scope="function")
+def written(monkeypatch, tmp_dir):
+    """Capture the batches written for each type instead of creating feature classes with arcpy."""
+    written = {}
+
+    def write_batches(batches, output_feature_class, overture_type, bbox, tmp_gdb):
+        batches = [batch for batch in batches if batch.num_rows > 0]
+        written[overture_type] = (Path(output_feature_class), sum(batch.num_rows for batch in batches))
+        return len(batches) > 0
+
+    monkeypatch.setattr(main_module, "_write_batches_to_features", write_batches)
+    monkeypatch.setattr(main_module, "get_temp_gdb", lambda: tmp_dir / "tmp_data.gdb")
+    monkeypatch.setattr(main_module, "arcpy", types.SimpleNamespace(management=types.SimpleNamespace(Delete=lambda *args: None)))
+    yield written
+
+
+def test_get_features_many(local_client, overture_tree, written, tmp_dir):
+    # add building data in the same area as the places
+    for release in ["2025-01-22.0", "2025-02-19.0"]:
+        type_dir = overture_tree / release / "theme=buildings" / "type=building"
+        pq.write_table(make_overture_table(-123.0, 47.0, count=40, id_prefix="bldg"), type_dir / "part-00000.parquet")
+
+    output_gdb = tmp_dir / "basemap.gdb"
+    feature_classes = get_features_many(
+        ["place", "building"],
+        extent_place,
+        output_gdb,
+        client=local_client,
+        where={"place": "class = 'primary'"},
+    )
+
+    assert feature_classes == {"place": output_gdb / "place", "building": output_gdb / "building"}
+    assert written["place"][1] == 25
+    assert written["building"][1] == 40
+
+
+def test_get_features_many_validates_types_first(local_client, written, tmp_dir):
+    with pytest.raises(ValueError, match="Invalid overture type"):
+        get_features_many(["place", "roads"], extent_place, tmp_dir / "basemap.gdb", client=local_client)
+    assert written == {}
+
+
+def test_get_features_many_streams_types(local_client, monkeypatch, tmp_dir):
+    import time
+
+    produced = {"place": 0, "building": 0}
+    read_ahead = {}
+
+    def get_batches(overture_type, bbox, **kwargs):
+        for batch in make_overture_table(-123.0, 47.0).to_batches(max_chunksize=5):
+            produced[overture_type] += 1
+            yield batch
+
+    def write_batches(batches, output_feature_class, overture_type, bbox, tmp_gdb):
+        # while the first type is written, the other type only reads ahead until its queue is full
+        time.sleep(0.2)
+        read_ahead[overture_type] = dict(produced)
+        return sum(batch.num_rows for batch in batches) > 0
+
+    monkeypatch.setattr(main_module, "get_record_batches", get_batches)
+    monkeypatch.setattr(main_module, "_write_batches_to_features", write_batches)
+    monkeypatch.setattr(main_module, "get_temp_gdb", lambda: tmp_dir / "tmp_data.gdb")
+    monkeypatch.setattr(main_module, "arcpy", types.SimpleNamespace(management=types.SimpleNamespace(Delete=lambda *args: None)))
+
+    feature_classes = get_features_many(
+        ["place", "building"], extent_place, tmp_dir / "basemap.gdb", client=local_client, prefetch_depth=2
+    )
+
+    assert set(feature_classes) == {"place", "building"}
+    assert read_ahead["place"]["building"] <= 4
+    assert produced == {"place": 20, "building": 20}
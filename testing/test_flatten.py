@@ -0,0 +1,98 @@
+import pyarrow as pa
+import pytest
+
+from overture_to_arcgis.utils import FlattenField, get_record_batches
+from overture_to_arcgis.utils._flatten import FLATTEN_COLUMN_PREFIX, flatten_batch, resolve_flatten
+
+CATEGORIES = pa.struct([("primary", pa.string()), ("alternate", pa.list_(pa.string()))])
+
+
+@pytest.fixture
+def place_batch() -> pa.RecordBatch:
+    """Record batch with the helper columns for the Overture flatten spec, as read by the scanner."""
+    return pa.RecordBatch.from_pydict(
+        {
+            "id": ["a", "b", "c", "d"],
+            f"{FLATTEN_COLUMN_PREFIX}primary_name": ["Cafe", None, "", "Park"],
+            f"{FLATTEN_COLUMN_PREFIX}primary_category": ["cafe", None, "park", ""],
+            f"{FLATTEN_COLUMN_PREFIX}alternate_category": pa.array(
+                [["coffee_shop", "bakery"], None, [], ["playground"]], pa.list_(pa.string())
+            ),
+            f"{FLATTEN_COLUMN_PREFIX}website": pa.array(
+                [["https://a.example"], [], None, ["https://" + "d" * 300, "https://d.example"]],
+                pa.list_(pa.string()),
+            ),
+        }
+    )
+
+
+def test_flatten_field_paths():
+    assert FlattenField("names.primary").field_path == ["names", "primary"]
+    assert FlattenField("websites[0]").steps == ["websites", 0]
+    assert FlattenField("sources[-1].dataset").steps == ["sources", -1, "dataset"]
+    assert FlattenField("categories.alternate[*]").field_path == ["categories", "alternate"]
+
+    for path in ["websites[*].url", "names..primary", "websites[a]"]:
+        with pytest.raises(ValueError):
+            FlattenField(path)
+
+
+def test_resolve_flatten_skips_missing_columns():
+    schema = pa.schema([("id", pa.string()), ("names", pa.struct([("primary", pa.string())]))])
+
+    flatten = resolve_flatten(True, schema)
+
+    assert list(flatten) == ["primary_name"]
+    assert resolve_flatten({"name": "names.primary"}, schema) == {"name": FlattenField("names.primary")}
+
+
+def test_flatten_batch(place_batch):
+    schema = pa.schema(
+        [
+            ("names", pa.struct([("primary", pa.string())])),
+            ("categories", CATEGORIES),
+            ("websites", pa.list_(pa.string())),
+        ]
+    )
+
+    batch = flatten_batch(place_batch, resolve_flatten(True, schema))
+
+    assert batch.schema.names == ["id", "primary_name", "primary_category", "alternate_category", "website"]
+    assert batch.column("primary_name").to_pylist() == ["Cafe", None, None, "Park"]
+    assert batch.column("primary_category").to_pylist() == ["cafe", None, "park", None]
+    assert batch.column("alternate_category").to_pylist() == ["coffee_shop, bakery", None, None, "playground"]
+    assert batch.column("website").to_pylist() == ["https://a.example", None, None, None]
+
+
+def test_flatten_batch_nested_path():
+    sources = pa.list_(pa.struct([("dataset", pa.string()), ("confidence", pa.float64())]))
+    batch = pa.RecordBatch.from_pydict(
+        {
+            f"{FLATTEN_COLUMN_PREFIX}last_source": pa.array(
+                [[{"dataset": "meta", "confidence": 0.5}, {"dataset": "msft", "confidence": 0.9}], [], None],
+                sources,
+            )
+        }
+    ).slice(0, 3)
+
+    flatten = resolve_flatten({"last_source": "sources[-1].dataset"}, pa.schema([("sources", sources)]))
+    result = flatten_batch(batch, flatten)
+
+    assert result.column("last_source").to_pylist() == ["msft", None, None]
+
+
+def test_get_record_batches_flatten(local_client):
+    batches = list(
+        get_record_batches(
+            "place",
+            (-123.0, 47.0, -122.99, 47.01),
+            client=local_client,
+            columns=["id"],
+            flatten={"primary_name": "names.primary", "category": "categories.primary"},
+        )
+    )
+    table = pa.Table.from_batches(batches)
+
+    assert table.schema.names == ["id", "geometry", "primary_name"]
+    assert table.num_rows > 0
+    assert table.column("primary_name").to_pylist() == [f"name {int(idx)}" for idx in table.column("id").to_pylist()]
@@ -0,0 +1,98 @@
+import struct
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from overture_to_arcgis.utils import GeometryProcessing, get_record_batches
+from overture_to_arcgis.utils._geometry import process_wkb
+from overture_to_arcgis.utils._wkb import read_wkb_coordinates
+
+from conftest import dumps_wkb
+
+
+def to_wkb(geometries: list) -> pa.Array:
+    """Encode GeoJSON geometries as little endian WKB."""
+    return pa.array([None if geometry is None else dumps_wkb(geometry, big_endian=False) for geometry in geometries])
+
+
+def read_parts(value: bytes) -> list:
+    """Decode the coordinates of each part of a WKB geometry."""
+    geometries = read_wkb_coordinates([value])
+    offsets = geometries.part_offsets
+    return [geometries.coords[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def test_geometry_processing_validation():
+    assert GeometryProcessing(precision=0.0001).decimals == 4
+    assert GeometryProcessing(precision=0.0005).decimals is None
+
+    for kwargs in [{}, {"precision": 0}, {"tolerance": -1}, {"tolerance": 2}, {"precision": True}]:
+        with pytest.raises(ValueError):
+            GeometryProcessing(**kwargs)
+
+
+def test_process_wkb_simplify():
+    # a circle, and a straight line with a spike in the middle
+    angles = np.linspace(0, 2 * np.pi, 200)
+    ring = (np.column_stack([np.cos(angles), np.sin(angles)]) * 0.01).tolist()
+    ring[-1] = ring[0]
+    line = np.column_stack([np.linspace(0, 1, 101), np.zeros(101)])
+    line[50, 1] = 0.1
+    values = to_wkb(
+        [
+            {"type": "Polygon", "coordinates": [ring]},
+            {"type": "LineString", "coordinates": line.tolist()},
+            None,
+            {"type": "Point", "coordinates": [1.0, 2.0]},
+        ]
+    )
+
+    processed, before_count, after_count = process_wkb(values, GeometryProcessing(tolerance=0.001))
+    polygon, linestring, null, point = [None if value is None else read_parts(value) for value in processed.to_pylist()]
+
+    assert before_count == 302
+    assert after_count < 30
+    assert 4 <= len(polygon[0]) < 20
+    assert polygon[0][0] == polygon[0][-1]
+    assert linestring == [[[0.0, 0.0], [0.49, 0.0], [0.5, 0.1], [0.51, 0.0], [1.0, 0.0]]]
+    assert null is None
+    assert point == [[[1.0, 2.0]]]
+
+
+def test_process_wkb_snap():
+    values = to_wkb(
+        [
+            {"type": "LineString", "coordinates": [[0.1234567, 0.0], [0.1234568, 0.0], [0.2, 0.0000004]]},
+            {"type": "Polygon", "coordinates": [[[0, 0], [0, 1e-7], [1e-7, 1e-7], [0, 0]]]},
+            {"type": "GeometryCollection", "geometries": [{"type": "Point", "coordinates": [1, 2]}]},
+        ]
+    )
+
+    processed, before_count, after_count = process_wkb(values, GeometryProcessing(precision=0.000001))
+    linestring, polygon, collection = processed.to_pylist()
+
+    # repeated vertices are dropped, while a ring collapsing onto the grid keeps its vertices to stay valid
+    assert read_parts(linestring) == [[[0.123457, 0.0], [0.2, 0.0]]]
+    assert len(read_parts(polygon)[0]) == 4
+    assert (before_count, after_count) == (8, 7)
+
+    # geometries which cannot be processed are kept as they are
+    assert collection == values[2].as_py()
+
+
+def test_get_record_batches_geometry_processing(local_client):
+    batches = get_record_batches(
+        "place",
+        (-123.0, 47.0, -122.9, 47.1),
+        client=local_client,
+        columns=["id"],
+        geometry_processing={"precision": 0.01},
+    )
+    table = pa.Table.from_batches(batches)
+
+    assert table.num_rows > 0
+    assert table.schema.field("geometry").metadata[b"ARROW:extension:name"] == b"geoarrow.wkb"
+    for value in table.column("geometry").to_pylist():
+        x, y = struct.unpack_from("<dd", value, 5)
+        assert (round(x, 2), round(y, 2)) == (x, y)
@@ -0,0 +1,116 @@
+import pyarrow.fs as fs
+
+from overture_to_arcgis.utils import FragmentIndex, get_record_batches
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_fragment_index_build(local_client):
+    index = FragmentIndex.build(local_client.get_dataset("place"), local_client.get_dataset_path("place"))
+    assert index.file_count == 2
+    assert index.table.num_rows == 8
+    assert index.table["num_rows"].to_pylist() == [25] * 8
+
+
+def test_fragment_index_query(local_client):
+    index = local_client.get_fragment_index("place")
+
+    # only the first file, and only the first row group of it, intersects
+    matches = index.query((-123.01, 46.99, -122.99, 47.01))
+    assert matches["file"].to_pylist() == ["part-00000.parquet"]
+    assert matches["row_group"].to_pylist() == [0]
+
+    dataset = index.get_dataset(local_client.filesystem, (-123.5, 46.5, -122.5, 47.5))
+    assert len(dataset.files) == 1
+    assert dataset.to_table().num_rows == 100
+
+
+def test_fragment_index_saved_and_loaded(local_client):
+    index = local_client.get_fragment_index("place")
+    index_path = local_client.get_fragment_index_path("place")
+    assert index_path.exists()
+
+    loaded = FragmentIndex.load(index_path, local_client.get_dataset_path("place"))
+    assert loaded.table.equals(index.table)
+    assert loaded.schema.equals(index.schema)
+
+
+def test_get_record_batches_index_matches_full_scan(local_client):
+    bbox = (-123.0, 47.0, -122.95, 47.05)
+    indexed = get_record_batches("place", bbox, client=local_client, use_index=True)
+    full = get_record_batches("place", bbox, client=local_client, use_index=False)
+    indexed_ids = sorted(id_ for batch in indexed for id_ in batch["id"].to_pylist())
+    full_ids = sorted(id_ for batch in full for id_ in batch["id"].to_pylist())
+    assert indexed_ids == full_ids
+    assert len(indexed_ids) == 49
+
+
+def test_fragment_index_sub_tree(overture_tree, tmp_dir):
+    from overture_to_arcgis.utils import OvertureClient, ReleaseCatalog
+
+    sub_tree = fs.SubTreeFileSystem(str(overture_tree), fs.LocalFileSystem())
+    catalog = ReleaseCatalog(sub_tree, base_dir="", cache_dir=tmp_dir / "cache")
+    client = OvertureClient(filesystem=sub_tree, catalog=catalog)
+    assert client.get_indexed_dataset("place", extent_place).to_table().num_rows == 100
+
+
+def test_fragment_indices_build_concurrently(local_client, monkeypatch):
+    import threading
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    import overture_to_arcgis.utils._client as client_module
+
+    built = Counter()
+    barrier = threading.Barrier(2, timeout=5)
+
+    class FakeIndex:
+        def save(self, path):
+            pass
+
+    def build(dataset, dataset_path):
+        # both types must be building at the same time to pass the barrier
+        built[dataset_path.rsplit("type=", 1)[-1]] += 1
+        barrier.wait()
+        return FakeIndex()
+
+    monkeypatch.setattr(client_module.FragmentIndex, "build", staticmethod(build))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        indices = list(executor.map(local_client.get_fragment_index, ["place", "segment", "place", "segment"]))
+
+    # each type is only built once, and the types are built concurrently rather than one after another
+    assert built == {"place": 1, "segment": 1}
+    assert indices[0] is indices[2] and indices[1] is indices[3]
+
+
+def test_fragment_indices_discover_concurrently(local_client, monkeypatch):
+    import threading
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    import overture_to_arcgis.utils._client as client_module
+
+    discovered = Counter()
+    barrier = threading.Barrier(2, timeout=5)
+    dataset = client_module.ds.dataset
+
+    class FakeIndex:
+        def save(self, path):
+            pass
+
+    def discover(path, **kwargs):
+        # both types must be discovering the files at the same time to pass the barrier
+        discovered[path.rsplit("type=", 1)[-1]] += 1
+        barrier.wait()
+        return dataset(path, **kwargs)
+
+    monkeypatch.setattr(client_module.ds, "dataset", discover)
+    monkeypatch.setattr(client_module.FragmentIndex, "build", staticmethod(lambda dataset, path: FakeIndex()))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        indices = list(executor.map(local_client.get_fragment_index, ["place", "segment", "place", "segment"]))
+
+    # the files of each type are only discovered once, and the types are discovered concurrently
+    assert discovered == {"place": 1, "segment": 1}
+    assert indices[0] is indices[2] and indices[1] is indices[3]
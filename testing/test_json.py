@@ -0,0 +1,189 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from overture_to_arcgis.utils.__main__ import convert_complex_columns_to_strings
+from overture_to_arcgis.utils._json import encode_json_strings
+
+# nested types from the Overture schemas
+NAMES = pa.struct(
+    [
+        ("primary", pa.string()),
+        ("common", pa.map_(pa.string(), pa.string())),
+        (
+            "rules",
+            pa.list_(
+                pa.struct(
+                    [
+                        ("variant", pa.string()),
+                        ("language", pa.string()),
+                        ("value", pa.string()),
+                        ("between", pa.list_(pa.float64())),
+                        ("side", pa.string()),
+                    ]
+                )
+            ),
+        ),
+    ]
+)
+SOURCES = pa.list_(
+    pa.struct(
+        [
+            ("property", pa.string()),
+            ("dataset", pa.string()),
+            ("record_id", pa.string()),
+            ("update_time", pa.string()),
+            ("confidence", pa.float64()),
+        ]
+    )
+)
+CATEGORIES = pa.struct([("primary", pa.string()), ("alternate", pa.list_(pa.string()))])
+BBOX = pa.struct([(name, pa.float32()) for name in ["xmin", "xmax", "ymin", "ymax"]])
+ROAD_FLAGS = pa.list_(pa.struct([("values", pa.list_(pa.string())), ("between", pa.list_(pa.float64()))]))
+SPEED_LIMITS = pa.list_(
+    pa.struct(
+        [
+            ("max_speed", pa.struct([("value", pa.int32()), ("unit", pa.string())])),
+            ("is_max_speed_variable", pa.bool_()),
+            ("when", pa.struct([("heading", pa.string()), ("mode", pa.list_(pa.string()))])),
+        ]
+    )
+)
+ADDRESSES = pa.list_(pa.struct([("freeform", pa.string()), ("locality", pa.string()), ("postcode", pa.string())]))
+
+
+def reference(column) -> list[str]:
+    """JSON strings as produced by converting each value to Python."""
+    return [json.dumps(value.as_py()) for value in column]
+
+
+def make_corpus() -> pa.Table:
+    names = [
+        {"primary": "Café \"Zoë\"", "common": [("fr", "Café"), ("ja", "カフェ")], "rules": None},
+        {"primary": "back\\slash\ttab\nline", "common": None, "rules": [
+            {"variant": "short", "language": None, "value": "Ave", "between": [0.0, 0.5], "side": None},
+            {"variant": "alternate", "language": "en", "value": "😀", "between": None, "side": "left"},
+        ]},
+        None,
+        {"primary": None, "common": [], "rules": []},
+        {"primary": "\x00\x1f", "common": [("en", None)], "rules": [None]},
+    ]
+    sources = [
+        [{"property": "", "dataset": "meta", "record_id": "123", "update_time": "2024-01-01", "confidence": 0.1}],
+        [],
+        None,
+        [None, {"property": "/names", "dataset": "osm", "record_id": None, "update_time": None,
+                "confidence": float("nan")}],
+        [{"property": "", "dataset": "msft", "record_id": "x", "update_time": None, "confidence": 1e-7},
+         {"property": "", "dataset": "esri", "record_id": "y", "update_time": None, "confidence": 1e16}],
+    ]
+    categories = [
+        {"primary": "cafe", "alternate": ["coffee_shop", "bakery"]},
+        {"primary": "park", "alternate": None},
+        None,
+        {"primary": None, "alternate": []},
+        {"primary": "bar", "alternate": [None, "pub"]},
+    ]
+    bbox = [
+        {"xmin": -122.5, "xmax": -122.4, "ymin": 47.1, "ymax": 47.2},
+        {"xmin": 0.0, "xmax": 1.0, "ymin": float("inf"), "ymax": float("-inf")},
+        None,
+        {"xmin": None, "xmax": 3.14159, "ymin": 1e-30, "ymax": 123456789.0},
+        {"xmin": -0.0, "xmax": 2.5, "ymin": 0.1, "ymax": 0.2},
+    ]
+    road_flags = [
+        [{"values": ["is_bridge", "is_covered"], "between": [0.1, 0.9]}],
+        None,
+        [],
+        [{"values": [], "between": None}],
+        [{"values": None, "between": [0.0, 1.0]}, None],
+    ]
+    speed_limits = [
+        [{"max_speed": {"value": 50, "unit": "km/h"}, "is_max_speed_variable": False, "when": None}],
+        [{"max_speed": None, "is_max_speed_variable": True, "when": {"heading": "forward", "mode": ["hgv"]}}],
+        None,
+        [{"max_speed": {"value": None, "unit": None}, "is_max_speed_variable": None, "when": {"heading": None, "mode": []}}],
+        [],
+    ]
+    addresses = [
+        [{"freeform": "1 Main St", "locality": "Olympia", "postcode": "98501"}],
+        None,
+        [],
+        [{"freeform": None, "locality": None, "postcode": None}],
+        [{"freeform": "Straße 5", "locality": "Köln", "postcode": "50667"}],
+    ]
+    return pa.table(
+        {
+            "id": ["a", "b", "c", "d", "e"],
+            "names": pa.array(names, NAMES),
+            "sources": pa.array(sources, SOURCES),
+            "categories": pa.array(categories, CATEGORIES),
+            "bbox": pa.array(bbox, BBOX),
+            "road_flags": pa.array(road_flags, ROAD_FLAGS),
+            "speed_limits": pa.array(speed_limits, SPEED_LIMITS),
+            "addresses": pa.array(addresses, ADDRESSES),
+            "websites": pa.array([["https://a.example"], None, [], ["x", None], ["é"]], pa.list_(pa.string())),
+            "heights": pa.array([[1, -2], None, [2**62], [], [0]], pa.large_list(pa.int64())),
+            "tags": pa.array([[("k", 1)], [], None, [("ü", None)], [("a", 2), ("b", 3)]], pa.map_(pa.string(), pa.int16())),
+            "level": pa.array([1, None, 3, 4, 5], pa.int32()),
+        }
+    )
+
+
+def test_encode_matches_json_dumps():
+    table = make_corpus()
+    for name in table.column_names[1:]:
+        column = table[name].combine_chunks()
+        assert encode_json_strings(column).to_pylist() == reference(column), name
+
+        # slices of the arrays, with offsets into the child arrays
+        for start, length in [(1, 3), (2, 2), (4, 1), (0, 0)]:
+            sliced = column.slice(start, length)
+            assert encode_json_strings(sliced).to_pylist() == reference(sliced), name
+
+
+def test_encode_float_formatting():
+    # values either side of the range formatted using the Arrow string cast
+    values = [0.0, -0.0, 1.0, -3.0, 1e-4, 9.99e-5, 0.1, 1 / 3, 1e10 - 0.5, 1e10, 1e16, 1e22, 5e-324, float("nan")]
+    for data_type in [pa.float64(), pa.float32()]:
+        array = pa.array([values, [None, 2.5]], pa.list_(data_type))
+        assert encode_json_strings(array).to_pylist() == reference(array)
+
+    # the Arrow string cast produces the same digits as Python, so a wider sample matches
+    rng = np.random.default_rng(0)
+    sample = pa.array([(10 ** rng.uniform(-6, 12, 5000) * rng.choice([-1, 1], 5000)).tolist()], pa.list_(pa.float64()))
+    assert encode_json_strings(sample).to_pylist() == reference(sample)
+
+
+def test_encode_chunked_and_dictionary():
+    column = make_corpus()["names"]
+    chunked = pa.chunked_array([column.combine_chunks().slice(0, 2), column.combine_chunks().slice(2)])
+    encoded = encode_json_strings(chunked)
+    assert isinstance(encoded, pa.ChunkedArray)
+    assert encoded.to_pylist() == reference(chunked)
+
+    values = pa.array([["a", "b"], None, ["a"]], pa.list_(pa.dictionary(pa.int8(), pa.string())))
+    assert encode_json_strings(values).to_pylist() == reference(values)
+
+
+def test_encode_unsupported_type_falls_back():
+    values = pa.array([[1.5], None], pa.list_(pa.float16()))
+    with pytest.raises(TypeError):
+        encode_json_strings(pa.array([[b"x"]], pa.list_(pa.binary())))
+    assert encode_json_strings(pa.array([["x"]], pa.list_(pa.string()))).to_pylist() == ['["x"]']
+    assert encode_json_strings(values).to_pylist() == reference(values)
+
+
+def test_convert_complex_columns_matches_reference():
+    table = make_corpus()
+    converted = convert_complex_columns_to_strings(table)
+    assert converted.column_names == table.column_names
+    for name in ["names", "sources", "bbox", "tags"]:
+        assert converted[name].to_pylist() == reference(table[name])
+    assert converted["level"].equals(table["level"])
+
+    # duplicate column values are converted using their own field
+    batch = pa.record_batch([pa.array([1, 2]), pa.array([1, 2])], names=["a", "b"])
+    assert convert_complex_columns_to_strings(batch).column_names == ["a", "b"]
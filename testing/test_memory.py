@@ -0,0 +1,90 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import overture_to_arcgis.__main__ as main_module
+from overture_to_arcgis import iter_spatially_enabled_dataframes
+from overture_to_arcgis.utils import MemoryBudget, ScanOptions, iter_table_chunks
+from overture_to_arcgis.utils._memory import parse_memory_size
+
+from conftest import make_overture_table
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_parse_memory_size():
+    assert parse_memory_size(1024) == 1024
+    assert parse_memory_size("512MB") == 512 * 1024**2
+    assert parse_memory_size("1.5 GiB") == int(1.5 * 1024**3)
+    assert parse_memory_size("2kb") == 2048
+
+    for value in ["lots", "-1GB", 0, True]:
+        with pytest.raises(ValueError):
+            parse_memory_size(value)
+
+
+def test_budget_reduces_read_ahead():
+    defaults = ScanOptions()
+    options = MemoryBudget("64MB", row_bytes=500).get_scan_options(defaults)
+
+    # the batches in flight fit the read ahead share of the budget
+    in_flight = options.fragment_readahead * options.batch_readahead * options.batch_size * 500
+    assert in_flight <= MemoryBudget("64MB").readahead_bytes
+    assert options.batch_size < defaults.batch_size
+
+    # concurrent scans share the read ahead
+    shared = MemoryBudget("64MB", row_bytes=500).get_scan_options(defaults, streams=4)
+    assert shared.fragment_readahead * shared.batch_readahead <= options.fragment_readahead * options.batch_readahead
+
+    # a generous budget keeps the settings
+    assert MemoryBudget("1TB", row_bytes=500).get_scan_options(defaults) == defaults
+
+
+def test_iter_table_chunks():
+    table = make_overture_table(-123.0, 47.0)
+    batches = table.to_batches(max_chunksize=10)
+    max_bytes = table.nbytes // 4
+
+    chunks = list(iter_table_chunks(batches, max_bytes))
+    assert len(chunks) >= 4
+    assert sum(chunk.num_rows for chunk in chunks) == 100
+    assert pa.concat_tables(chunks).equals(table)
+    assert all(chunk.nbytes <= max_bytes * 1.1 for chunk in chunks)
+
+    # a batch larger than the chunk size is split
+    assert len(list(iter_table_chunks([table.to_batches()[0]], max_bytes))) >= 4
+
+
+def test_iter_spatially_enabled_dataframes(local_client, monkeypatch):
+    converted = []
+
+    def to_dataframe(table, **kwargs):
+        converted.append(table.num_rows)
+        return table.to_pandas()
+
+    monkeypatch.setattr(main_module, "table_to_spatially_enabled_dataframe", to_dataframe)
+
+    frames = list(
+        iter_spatially_enabled_dataframes("place", extent_place, max_memory="10KB", client=local_client, columns=["id"])
+    )
+    assert len(frames) > 1
+    assert len(converted) == len(frames)
+    ids = pd.concat(frames)["id"].tolist()
+    assert sorted(ids) == [f"{idx:08d}" for idx in range(100)]
+
+
+def test_get_spatially_enabled_dataframe_converts_once(local_client, monkeypatch):
+    converted = []
+
+    def to_dataframe(table, **kwargs):
+        converted.append(table.num_rows)
+        return table.to_pandas()
+
+    monkeypatch.setattr(main_module, "table_to_spatially_enabled_dataframe", to_dataframe)
+
+    # the batches are combined before converting, so the data is converted to pandas once
+    df = main_module.get_spatially_enabled_dataframe(
+        "place", extent_place, client=local_client, columns=["id"], scan_options=ScanOptions(batch_size=10)
+    )
+    assert converted == [100]
+    assert sorted(df["id"].tolist()) == [f"{idx:08d}" for idx in range(100)]
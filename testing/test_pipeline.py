@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from overture_to_arcgis.utils import BatchPrefetcher, get_record_batches
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_prefetcher_matches_source(local_client):
+    direct = list(get_record_batches("place", extent_place, client=local_client))
+    prefetcher = BatchPrefetcher(get_record_batches("place", extent_place, client=local_client), max_queue=2)
+    prefetched = list(prefetcher)
+
+    assert [batch["id"].to_pylist() for batch in prefetched] == [batch["id"].to_pylist() for batch in direct]
+    assert prefetcher.stats["batches"] == len(direct)
+    assert prefetcher.stats["rows"] == 100
+
+
+def test_prefetcher_bounded_queue():
+    produced = []
+
+    def source():
+        for idx in range(20):
+            produced.append(idx)
+            yield idx
+
+    prefetcher = BatchPrefetcher(source(), max_queue=3)
+    iterator = iter(prefetcher)
+    assert next(iterator) == 0
+
+    # the background thread only runs ahead until the queue is full
+    time.sleep(0.2)
+    assert len(produced) <= 5
+    assert prefetcher.max_depth <= 3
+
+    # stopping early stops the background thread
+    iterator.close()
+    assert not prefetcher._thread.is_alive()
+
+
+def test_prefetcher_stage_times():
+    def slow_source():
+        for idx in range(3):
+            time.sleep(0.05)
+            yield idx
+
+    prefetcher = BatchPrefetcher(slow_source(), max_queue=2)
+    for _ in prefetcher:
+        pass
+
+    # the consumer does no work, so waits on the slow source
+    assert prefetcher.fetch_busy >= 0.14
+    assert prefetcher.consume_idle >= 0.1
+
+
+def test_prefetcher_raises_source_error():
+    def failing_source():
+        yield 1
+        raise ConnectionError("timeout")
+
+    with pytest.raises(ConnectionError):
+        list(BatchPrefetcher(failing_source()))
+
+    with pytest.raises(ValueError):
+        BatchPrefetcher([], max_queue=0)
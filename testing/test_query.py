@@ -0,0 +1,69 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+
+from overture_to_arcgis.utils import get_record_batches, parse_where
+from overture_to_arcgis.utils._query import resolve_columns
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_resolve_columns_nested_paths(local_client):
+    schema = local_client.get_schema("place")
+    projection = resolve_columns(["id", "names.primary"], schema)
+    assert list(projection.keys()) == ["id", "names_primary", "geometry"]
+
+
+def test_resolve_columns_preset(local_client):
+    schema = local_client.get_schema("place").append(
+        pa.field("categories", pa.struct([("primary", pa.string()), ("alternate", pa.list_(pa.string()))]))
+    )
+    projection = resolve_columns("lite", schema, "place")
+    assert list(projection.keys()) == ["id", "names_primary", "categories_primary", "confidence", "geometry"]
+
+
+def test_resolve_columns_invalid_column(local_client):
+    with pytest.raises(ValueError, match="Invalid column"):
+        resolve_columns(["names.not_a_field"], local_client.get_schema("place"))
+
+
+def test_resolve_columns_invalid_preset(local_client):
+    with pytest.raises(ValueError, match="Invalid column preset"):
+        resolve_columns("not_a_preset", local_client.get_schema("place"), "place")
+
+
+def test_get_record_batches_columns(local_client):
+    batches = list(get_record_batches("place", extent_place, client=local_client, columns=["id", "names.primary"]))
+    assert batches[0].schema.names == ["id", "names_primary", "geometry"]
+    assert sum(batch.num_rows for batch in batches) == 100
+    assert batches[0].schema.metadata[b"geo"]
+
+
+def test_parse_where_matches_expression():
+    table = pa.table(
+        {
+            "class": ["motorway", "primary", "footway", None],
+            "confidence": [0.9, 0.5, 0.8, 0.95],
+            "names": [{"primary": "a"}, None, {"primary": "it's"}, {"primary": None}],
+        }
+    )
+    assert table.filter(parse_where("class in ('motorway', 'primary')")).num_rows == 2
+    assert table.filter(parse_where("class NOT IN ('motorway') and confidence > 0.7")).num_rows == 1
+    assert table.filter(parse_where("names.primary = 'it''s' or class is null")).num_rows == 2
+    assert table.filter(parse_where("not (confidence >= 0.8)")).num_rows == 1
+
+
+def test_parse_where_invalid():
+    with pytest.raises(ValueError, match="Invalid where clause"):
+        parse_where("class in ('motorway'")
+    with pytest.raises(ValueError, match="Invalid where clause"):
+        parse_where("confidence > other_column")
+
+
+def test_get_record_batches_where(local_client):
+    batches = get_record_batches("place", extent_place, client=local_client, where="class = 'primary'")
+    assert sum(batch.num_rows for batch in batches) == 25
+
+    where = pc.field("confidence") >= 0.5
+    batches = get_record_batches("place", extent_place, client=local_client, where=where)
+    assert sum(batch.num_rows for batch in batches) == 50
@@ -0,0 +1,54 @@
+import pytest
+
+from overture_to_arcgis.utils import Sample, get_record_batches
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+extent_both = (-124.0, 29.0, -99.0, 48.0)
+
+
+def get_ids(**kwargs) -> list[str]:
+    return [value for batch in get_record_batches("place", **kwargs) for value in batch["id"].to_pylist()]
+
+
+def test_sample_row_groups(local_client):
+    index = local_client.get_fragment_index("place")
+    row_groups, row_fraction = Sample(0.25).select_row_groups(index, extent_both)
+    assert row_groups.num_rows == 2
+    assert row_fraction == pytest.approx(1.0)
+
+    # only the chosen row groups are read, in full
+    ids = get_ids(bbox=extent_both, client=local_client, sample=0.25)
+    assert len(ids) == 50
+
+    # the same seed gives the same sample, and a different seed a different one
+    assert get_ids(bbox=extent_both, client=local_client, sample=Sample(0.25)) == ids
+    assert get_ids(bbox=extent_both, client=local_client, sample=Sample(0.25, seed=7)) != ids
+
+
+def test_sample_rows(local_client):
+    # a single row group holds more than needed, so the rows are sampled too
+    ids = get_ids(bbox=extent_place, client=local_client, sample=0.1)
+    assert 0 < len(ids) < 25
+    assert get_ids(bbox=extent_place, client=local_client, sample=0.1) == ids
+
+    # the rows are sampled by id even if the ids are not requested
+    batches = list(get_record_batches("place", extent_place, client=local_client, sample=0.1, columns=["class"]))
+    assert batches[0].schema.names == ["class", "geometry"]
+    assert sum(batch.num_rows for batch in batches) == len(ids)
+
+
+def test_sample_stratified(local_client):
+    # without a grid, the row groups may all come from one area, while with a grid each cell is sampled
+    ids = get_ids(bbox=extent_both, client=local_client, sample=Sample(0.25, grid=2))
+    assert len(ids) == 50
+    assert {value[0] for value in ids} == {"0", "b"}
+
+
+def test_sample_invalid(local_client):
+    for value in [0, 1.5, True]:
+        with pytest.raises(ValueError):
+            Sample(value)
+    with pytest.raises(ValueError):
+        Sample(0.1, grid=0)
+    with pytest.raises(ValueError):
+        get_ids(bbox=extent_place, client=local_client, sample=0.1, tile_size=0.1)
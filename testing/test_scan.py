@@ -0,0 +1,23 @@
+import pytest
+
+from overture_to_arcgis.utils import ScanOptions, get_record_batches
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def test_scan_options_invalid():
+    with pytest.raises(ValueError, match="Invalid scan option batch_size"):
+        ScanOptions(batch_size=0)
+
+
+def test_scan_options_replace():
+    scan_options = ScanOptions().replace(fragment_readahead=2)
+    assert scan_options.fragment_readahead == 2
+    assert scan_options.to_scanner_kwargs()["fragment_readahead"] == 2
+
+
+def test_get_record_batches_batch_size(local_client):
+    scan_options = ScanOptions(batch_size=10, io_thread_count=None)
+    batches = list(get_record_batches("place", extent_place, client=local_client, scan_options=scan_options))
+    assert max(batch.num_rows for batch in batches) <= 10
+    assert sum(batch.num_rows for batch in batches) == 100
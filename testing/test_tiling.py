@@ -0,0 +1,121 @@
+import time
+
+import pyarrow as pa
+import pytest
+
+import overture_to_arcgis.utils.__main__ as utils_main
+from overture_to_arcgis.utils import get_record_batches, split_bbox
+from overture_to_arcgis.utils._tiling import assign_row_groups_to_tiles, get_tile_size
+
+from conftest import make_cached_client
+
+extent_place = (-123.5, 46.5, -122.5, 47.5)
+
+
+def get_ids(batches) -> list[str]:
+    return sorted(id_ for batch in batches for id_ in batch["id"].to_pylist())
+
+
+def test_split_bbox():
+    tiles = split_bbox((0.0, 0.0, 1.0, 0.5), 0.3)
+    assert len(tiles) == 8
+    assert tiles[0] == (0.0, 0.0, 0.25, 0.25)
+    assert tiles[-1] == (0.75, 0.25, 1.0, 0.5)
+
+    # neighboring tiles share the same edge coordinates
+    assert tiles[0][2] == tiles[1][0]
+    assert tiles[0][3] == tiles[4][1]
+
+    with pytest.raises(ValueError):
+        split_bbox((0.0, 0.0, 1.0, 1.0), 0)
+
+
+def test_tiled_matches_single_bbox(local_client):
+    # tile edges fall exactly on feature coordinates, but each feature is still only returned once
+    bbox = (-123.0, 47.0, -122.92, 47.08)
+    single = get_ids(get_record_batches("place", bbox, client=local_client))
+    tiled_batches = list(get_record_batches("place", bbox, client=local_client, tile_size=0.01, tile_workers=3))
+
+    assert get_ids(tiled_batches) == single
+    assert len(single) == 79
+    assert tiled_batches[0].schema.names == next(iter(get_record_batches("place", bbox, client=local_client))).schema.names
+
+
+def test_assign_row_groups_to_tiles():
+    row_groups = pa.table(
+        {
+            "row_group": [0, 1, 2, 3],
+            "xmin": [0.0, 0.1, -5.0, 0.6],
+            "ymin": [0.0, 0.1, -5.0, 0.6],
+            "xmax": [0.2, 0.2, 0.2, 0.9],
+            "ymax": [0.2, 0.2, 0.2, 0.9],
+        }
+    )
+
+    # row groups are assigned to the tile holding their center, clamped to the bounding box, and empty tiles skipped
+    tiles = assign_row_groups_to_tiles(row_groups, (0.0, 0.0, 1.0, 1.0), 0.5)
+    assert [tile["row_group"].to_pylist() for tile in tiles] == [[0, 1, 2], [3]]
+
+
+def test_tiled_reads_each_row_group_once(overture_tree, tmp_dir):
+    client = make_cached_client(overture_tree, tmp_dir)
+    cache = client.row_group_cache
+    bbox = (-123.0, 47.0, -122.92, 47.08)
+
+    # the row groups span several tiles, but each is only read once
+    batches = list(get_record_batches("place", bbox, client=client, tile_size=0.01, tile_workers=3))
+    row_groups = client.get_fragment_index("place").query(bbox)
+    assert row_groups.num_rows == 4
+    assert (cache.misses, cache.hits) == (4, 0)
+    assert len(get_ids(batches)) == 79
+
+
+def test_tiled_streams_tiles(local_client, monkeypatch):
+    produced = []
+
+    def scan_row_groups(client, index, row_groups, dataset_filter, columns, scan_options):
+        tile = row_groups["row_group"][0].as_py()
+        for _ in range(20):
+            produced.append(tile)
+            yield pa.record_batch({"id": [f"{tile}"]})
+
+    monkeypatch.setattr(utils_main, "_scan_row_groups", scan_row_groups)
+
+    # while the first tile is consumed slowly, the other tiles only read ahead until their queues are full
+    bbox = (-123.0, 47.0, -122.92, 47.08)
+    batches = utils_main._scan_tiled_record_batches(
+        local_client, "place", bbox, None, None, local_client.scan_options, True, 0.01, 4
+    )
+    for _ in range(10):
+        next(batches)
+        time.sleep(0.01)
+    batches.close()
+
+    assert produced.count(0) >= 10
+    assert all(produced.count(tile) <= 4 for tile in set(produced) - {0})
+
+
+def test_tiled_with_columns_and_where(local_client):
+    columns = ["names.primary"]
+    where = "class = 'primary'"
+    single = list(get_record_batches("place", extent_place, client=local_client, columns=columns, where=where))
+    tiled = list(
+        get_record_batches("place", extent_place, client=local_client, columns=columns, where=where, tile_size=0.1)
+    )
+    assert tiled[0].schema.names == single[0].schema.names
+    assert sorted(n for b in tiled for n in b["names_primary"].to_pylist()) == sorted(
+        n for b in single for n in b["names_primary"].to_pylist()
+    )
+
+
+def test_auto_tile_size(local_client):
+    index = local_client.get_fragment_index("place")
+    assert index.estimate_rows(extent_place) == 100
+
+    # the estimated density is used to pick the tile size
+    assert get_tile_size(index, extent_place) is None
+    tile_size = get_tile_size(index, extent_place, target_rows=25)
+    assert 0 < tile_size < 1.0
+
+    batches = get_record_batches("place", extent_place, client=local_client, tile_size="auto")
+    assert len(get_ids(batches)) == 100
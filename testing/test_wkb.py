@@ -0,0 +1,167 @@
+import struct
+
+import numpy as np
+import pyarrow as pa
+
+from overture_to_arcgis.utils._wkb import (
+    EWKB_SRID_FLAG,
+    EWKB_Z_FLAG,
+    PART_LINESTRING,
+    PART_POINT,
+    PART_RING,
+    WKB_POLYGON,
+    _read_geometry,
+    read_wkb_coordinates,
+    write_wkb_coordinates,
+)
+
+from conftest import dumps_wkb
+
+GEOMETRIES = [
+    {"type": "Point", "coordinates": [1.0, 2.0]},
+    {"type": "LineString", "coordinates": [[0, 0], [1, 1], [2, 0]]},
+    {
+        "type": "Polygon",
+        "coordinates": [
+            [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]],
+            [[0.2, 0.2], [0.2, 0.8], [0.8, 0.8], [0.2, 0.2]],
+        ],
+    },
+    {"type": "MultiPoint", "coordinates": [[1, 1], [2, 2]]},
+    {"type": "MultiLineString", "coordinates": [[[0, 0], [1, 1]], [[2, 2], [3, 3], [4, 4]]]},
+    {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [[[0, 0], [1, 0], [1, 1], [0, 0]]],
+            [[[5, 5], [6, 5], [6, 6], [5, 5]], [[5.1, 5.1], [5.2, 5.2], [5.2, 5.1], [5.1, 5.1]]],
+        ],
+    },
+    {"type": "GeometryCollection", "geometries": [{"type": "Point", "coordinates": [9, 9]}]},
+]
+
+
+def read_scalar(value: bytes) -> tuple[list, list]:
+    """Read a WKB value one part at a time, for comparison."""
+    coords, kinds, exterior = [], [], []
+    _read_geometry(value, 0, coords, kinds, exterior)
+    return [part.tolist() for part in coords], kinds
+
+
+def get_parts(geometries, geom_idx: int) -> tuple[list, list]:
+    """Get the parts of a decoded geometry."""
+    first_part, last_part = geometries.geometry_offsets[geom_idx], geometries.geometry_offsets[geom_idx + 1]
+    parts = [
+        geometries.coords[geometries.part_offsets[idx]:geometries.part_offsets[idx + 1]].tolist()
+        for idx in range(first_part, last_part)
+    ]
+    return parts, geometries.part_kinds[first_part:last_part].tolist()
+
+
+def test_read_wkb_coordinates_matches_scalar():
+    # random polygons with holes and multipolygons, mixed with the other types
+    rng = np.random.default_rng(0)
+    values = [dumps_wkb(geometry, big_endian=False) for geometry in GEOMETRIES]
+    for _ in range(50):
+        parts = rng.integers(1, 4)
+        polygons = []
+        for _ in range(parts):
+            rings = []
+            for _ in range(rng.integers(1, 4)):
+                ring = rng.random((rng.integers(3, 8), 2)).tolist()
+                rings.append(ring + [ring[0]])
+            polygons.append(rings)
+        values.append(dumps_wkb({"type": "MultiPolygon", "coordinates": polygons}, big_endian=False))
+
+    geometries = read_wkb_coordinates(pa.array(values, pa.binary()))
+
+    assert geometries.valid.all()
+    assert geometries.malformed_count == 0
+    for geom_idx, value in enumerate(values):
+        assert get_parts(geometries, geom_idx) == read_scalar(value)
+
+
+def test_read_wkb_coordinates_malformed():
+    polygon = dumps_wkb(GEOMETRIES[2], big_endian=False)
+    values = [
+        polygon,
+        None,
+        b"",
+        polygon[:-8],
+        b"\x01\x03\x00\x00\x00\xff\xff\xff\x7f",
+        b"\x01\x63\x00\x00\x00",
+        polygon,
+    ]
+
+    geometries = read_wkb_coordinates(pa.array(values, pa.binary()))
+
+    assert geometries.valid.tolist() == [True, False, False, False, False, False, True]
+    assert geometries.null.tolist() == [False, True, False, False, False, False, False]
+    assert geometries.malformed.tolist() == [False, False, True, True, True, True, False]
+    assert geometries.malformed_count == 4
+    assert np.diff(geometries.geometry_offsets).tolist() == [2, 0, 0, 0, 0, 0, 2]
+
+
+def test_read_wkb_coordinates_fallback():
+    # big endian, extended WKB with a z value and spatial reference, and ISO WKB with z values
+    big_endian = dumps_wkb(GEOMETRIES[2], big_endian=True)
+    ewkb = struct.pack("<BIIddd", 1, 1 | EWKB_Z_FLAG | EWKB_SRID_FLAG, 4326, 3.0, 4.0, 5.0)
+    iso = struct.pack("<BII", 1, 1002, 2) + struct.pack("<6d", 0, 0, 1, 1, 1, 2)
+    empty_point = dumps_wkb(GEOMETRIES[0], big_endian=False)[:5] + struct.pack("<2d", np.nan, np.nan)
+
+    geometries = read_wkb_coordinates([big_endian, ewkb, iso, empty_point])
+
+    assert geometries.valid.tolist() == [True, True, True, True]
+    assert get_parts(geometries, 0) == read_scalar(dumps_wkb(GEOMETRIES[2], big_endian=False))
+    assert get_parts(geometries, 1) == ([[[3.0, 4.0]]], [PART_POINT])
+    assert get_parts(geometries, 2) == ([[[0.0, 0.0], [1.0, 1.0]]], [PART_LINESTRING])
+    assert get_parts(geometries, 3) == ([], [])
+    assert geometries.geometry_types.tolist() == [WKB_POLYGON, 1, 2, 1]
+
+
+def test_read_wkb_coordinates_sliced():
+    values = pa.array([dumps_wkb(geometry, big_endian=False) for geometry in GEOMETRIES], pa.large_binary())
+
+    geometries = read_wkb_coordinates(values.slice(2, 2))
+
+    assert len(geometries) == 2
+    assert get_parts(geometries, 0) == read_scalar(values[2].as_py())
+    assert get_parts(geometries, 1) == read_scalar(values[3].as_py())
+
+
+def test_iter_esri_json():
+    values = [dumps_wkb(geometry, big_endian=False) for geometry in GEOMETRIES] + [None]
+
+    esri_json = list(read_wkb_coordinates(values).iter_esri_json(spatial_reference={"wkid": 4326}))
+
+    assert esri_json[0] == {"x": 1.0, "y": 2.0, "spatialReference": {"wkid": 4326}}
+    assert esri_json[1]["paths"] == [[[0.0, 0.0], [1.0, 1.0], [2.0, 0.0]]]
+    assert esri_json[3]["points"] == [[1.0, 1.0], [2.0, 2.0]]
+    assert len(esri_json[4]["paths"]) == 2
+    assert esri_json[6] is None
+    assert esri_json[7] is None
+
+    # exterior rings are reversed to clockwise and holes to counterclockwise
+    exterior, hole = esri_json[2]["rings"]
+    assert exterior == [[0.0, 0.0], [0.0, 1.0], [1.0, 1.0], [1.0, 0.0], [0.0, 0.0]]
+    assert hole == [[0.2, 0.2], [0.8, 0.8], [0.2, 0.8], [0.2, 0.2]]
+    assert len(esri_json[5]["rings"]) == 3
+
+
+def test_iter_esri_json_closes_rings():
+    value = struct.pack("<BIII", 1, 3, 1, 3) + struct.pack("<6d", 0, 0, 0, 1, 1, 1)
+
+    geometries = read_wkb_coordinates([value])
+    (esri_json,) = geometries.iter_esri_json()
+
+    assert geometries.part_kinds.tolist() == [PART_RING]
+    assert esri_json == {"rings": [[[0.0, 0.0], [0.0, 1.0], [1.0, 1.0], [0.0, 0.0]]]}
+
+
+def test_write_wkb_coordinates_round_trip():
+    values = [dumps_wkb(geometry, big_endian=False) for geometry in GEOMETRIES] + [None]
+
+    written = write_wkb_coordinates(read_wkb_coordinates(values)).to_pylist()
+
+    # every type but the geometry collection is written back identically, and null stays null
+    assert written[:-2] == values[:-2]
+    assert written[-2:] == [None, None]